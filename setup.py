@@ -32,6 +32,9 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/Bignichok/Python-ContactsAssistant",
     install_requires=requirements,
+    extras_require={
+        'fast': ['numpy'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
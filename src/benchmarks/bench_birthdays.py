@@ -0,0 +1,74 @@
+"""
+Benchmark comparing the vectorized birthday engine with the scalar implementation.
+
+Builds a contacts book where every contact has a birthday and reports the best time of
+the upcoming birthdays query and of the birthday statistics, computed per contact in pure
+Python and over the birthday column with NumPy, for a regular and a columnar book.
+
+Usage:
+    python src/benchmarks/bench_birthdays.py --size 1000000 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_snapshot import best_time
+from contacts_assistant.birthday_engine import BirthdayEngine
+from contacts_assistant.columnar_contacts_book import ColumnarContactsBook
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.record import Record
+
+
+def build_book(size, seed=1):
+    """Build a contacts book with a birthday for every contact."""
+    rnd = random.Random(seed)
+    first, last = date(1940, 1, 1).toordinal(), date(2010, 12, 31).toordinal()
+    book = ContactsBook()
+    for index in range(size):
+        record = Record(f"Contact {index}")
+        record.add_birthday(
+            date.fromordinal(rnd.randint(first, last)).strftime("%d.%m.%Y")
+        )
+        book.data[record.name.value] = record
+    return book
+
+
+def statistics(book):
+    """Compute every birthday report of a book."""
+    _, ordinals = book.birthday_column()
+    today = date.today()
+    BirthdayEngine.per_month(ordinals)
+    BirthdayEngine.per_weekday(ordinals, today.year)
+    BirthdayEngine.age_distribution(ordinals, today)
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not BirthdayEngine.vectorized:
+        sys.exit("NumPy is required for this benchmark")
+
+    book = build_book(args.size)
+    columnar = ColumnarContactsBook.from_records(book.data.values())
+    print(f"{args.size} contacts")
+    for label, vectorized in (("scalar", False), ("vectorized", True)):
+        BirthdayEngine.vectorized = vectorized
+        for book_label, target in (("book", book), ("columnar", columnar)):
+            upcoming = best_time(lambda: target.get_upcoming_birthdays(7), args.repeat)
+            stats = best_time(lambda: statistics(target), args.repeat)
+            print(
+                f"  {label:<10} {book_label:<8} upcoming: {upcoming * 1000:9.1f} ms"
+                f"  statistics: {stats * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark reporting the memory used per contact and per note.
+
+Builds contacts and notes with every field set and measures the traced allocations with
+tracemalloc, so the numbers include the model objects and their values.
+
+Usage:
+    python src/benchmarks/bench_memory.py --sizes 100000 1000000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.address import AddressType
+from contacts_assistant.columnar_contacts_book import ColumnarContactsBook
+from contacts_assistant.note import Note
+from contacts_assistant.record import Record
+
+TAGS = ["work", "home", "urgent", "family", "travel"]
+
+
+def build_contacts(size):
+    """Build contacts with two phones, an email, a birthday and a home address."""
+    contacts = {}
+    for index in range(size):
+        record = Record(f"Contact {index}")
+        record.add_phone(f"{index:010d}")
+        record.add_phone(f"{size + index:010d}")
+        record.add_email(f"user{index}@example.com")
+        record.add_birthday(f"{index % 28 + 1:02d}.{index % 12 + 1:02d}.1990")
+        record.add_address(
+            AddressType.HOME, "Main street 1", "Kyiv", "01001", "Ukraine"
+        )
+        contacts[record.name.value] = record
+    return contacts
+
+
+def build_columnar_contacts(size):
+    """Build the same contacts in a columnar book."""
+    return ColumnarContactsBook.from_records(build_contacts(size).values())
+
+
+def build_notes(size):
+    """Build notes with a title, a short content, two tags and a due date."""
+    return [
+        Note.from_dict(
+            {
+                "title": f"Note {index}",
+                "content": f"Remember to call contact {index} about the invoice",
+                "tags": [TAGS[index % 5], TAGS[index % 3]],
+                "due_date": f"{index % 28 + 1:02d}.{index % 12 + 1:02d}.2030",
+                "created_at": "01.01.2024",
+            }
+        )
+        for index in range(size)
+    ]
+
+
+def measure(build, size):
+    """Return the traced bytes per item allocated by a builder."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build(size)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / size
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(f"{size:>9} contacts: {measure(build_contacts, size):8.1f} bytes/contact")
+        print(
+            f"{size:>9} columnar: {measure(build_columnar_contacts, size):8.1f} bytes/contact"
+        )
+        print(f"{size:>9} notes:    {measure(build_notes, size):8.1f} bytes/note")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of the parallel note search across worker counts.
+
+Builds a seeded notebook with the data generator and times substring and regular
+expression searches in the calling thread and with a ParallelScanner of each worker
+count. Each search is repeated and the best time is reported, with the speedup over the
+serial search. The first search after a change, which copies the packed notes to shared
+memory again, is timed separately.
+
+Usage:
+    python src/benchmarks/bench_parallel_search.py --notes 200000 --workers 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.datagen import DataGenerator
+from contacts_assistant.note import Note
+from contacts_assistant.parallel_search import ParallelScanner
+
+QUERIES = {"substring": "dentist weekend", "regex": r"/(invoice|repair) (bank|keys)/i"}
+
+
+def best_time(func, repeat):
+    """Return the best wall time of several calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_searches(notebook, scanner, repeat):
+    """Return the best time of each query and of a search after a change."""
+    notebook.scanner = scanner
+    results = {}
+    for kind, query in QUERIES.items():
+        # The first call starts the workers and packs the notes
+        notebook.query(query)
+        results[kind] = best_time(lambda: notebook.query(query), repeat)
+
+    def changed_search():
+        notebook.add(Note("Benchmark", "changed"), True)
+        notebook.query(QUERIES["substring"])
+
+    results["after change"] = best_time(changed_search, repeat)
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--notes", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    notebook = DataGenerator(args.seed, date(2025, 6, 1)).notebook(args.notes)
+    rows = [("serial", time_searches(notebook, None, args.repeat))]
+    for workers in args.workers:
+        scanner = ParallelScanner(workers, threshold=0)
+        try:
+            rows.append(
+                (f"{workers} workers", time_searches(notebook, scanner, args.repeat))
+            )
+        finally:
+            scanner.close()
+
+    serial = rows[0][1]
+    print(f"notes: {args.notes}, cpus: {os.cpu_count()}")
+    print(f"{'':12}" + "".join(f"{kind:>24}" for kind in serial))
+    for label, results in rows:
+        cells = "".join(
+            f"{results[kind] * 1000:>12.2f} ms ({serial[kind] / results[kind]:4.1f}x)"
+            for kind in serial
+        )
+        print(f"{label:12}{cells}")
+
+
+if __name__ == "__main__":
+    main()
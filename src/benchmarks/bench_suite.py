@@ -0,0 +1,301 @@
+"""
+Benchmark suite covering the contacts book, the notebook, persistence and rendering.
+
+Builds seeded datasets with the data generator at each size and times lookups, birthday
+queries, rendering, note queries, saving and loading of both stores and the dispatch
+overhead of Handler.execute. Each case is calibrated to run for a minimum time and repeated,
+and the best and median time per call are reported, so runs on the same machine compare.
+
+Results can be written as JSON and compared with a stored baseline, cases slower than the
+threshold are flagged as regressions and make the script exit with status 1.
+
+Usage:
+    python src/benchmarks/bench_suite.py --sizes 1000 100000 --output baseline.json
+    python src/benchmarks/bench_suite.py --sizes 1000 100000 --baseline baseline.json
+    python src/benchmarks/bench_suite.py --compare baseline.json current.json
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.birthday_engine import np
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.datagen import TAG_WORDS, DataGenerator
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.notebook import Notebook
+
+# The data generator spreads due dates around this day, so results do not change with the date
+TODAY = date(2025, 6, 1)
+QUERY_COUNT = 100
+
+
+def build_cases(size, seed, directory):
+    """
+    Build the datasets of a size and return the cases to time.
+
+    Args:
+        size (int): The number of contacts and of notes.
+        seed (int): The seed of the data generator.
+        directory (str): A directory for the files written by the persistence cases.
+
+    Returns:
+        list: (name, function) pairs.
+    """
+    generator = DataGenerator(seed, TODAY)
+    book = generator.contacts_book(size)
+    notebook = generator.notebook(size)
+
+    randomizer = random.Random(seed)
+    records = randomizer.sample(list(book.data.values()), min(QUERY_COUNT, size))
+    names = [record.name.value for record in records]
+    phones = [record.phones[0].value for record in records]
+    emails = [record.email.value for record in records if record.email]
+    words = [note.title.split()[1] for note in randomizer.sample(notebook.notes, 10)]
+    tags = TAG_WORDS[:5] + ["project-100", "project-400"]
+
+    def cycle(values, query):
+        """Call a query with the next value each time."""
+        state = {"index": 0}
+
+        def run():
+            state["index"] = (state["index"] + 1) % len(values)
+            return query(values[state["index"]])
+
+        return run
+
+    # The handler is created in the empty directory, so it does not load the user's data
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        handler = Handler()
+    finally:
+        os.chdir(cwd)
+    handler.contact_book = book
+    contacts_path = os.path.join(directory, "contacts_book.bin")
+    notebook_path = os.path.join(directory, "notebook.json")
+    book.save_to_file(contacts_path)
+    notebook.save_to_file(notebook_path)
+
+    handler.notebook = notebook
+    find_args = [Namespace(name=name) for name in names]
+
+    return [
+        ("contacts.find_by_name", cycle(names, book.find_by_name)),
+        ("contacts.find_by_phone", cycle(phones, book.find_by_phone)),
+        ("contacts.find_by_email", cycle(emails, book.find_by_email)),
+        ("contacts.upcoming_birthdays", lambda: book.get_upcoming_birthdays(7)),
+        ("contacts.format_book", book.__str__),
+        ("contacts.save", lambda: book.save_to_file(contacts_path)),
+        ("contacts.load", lambda: ContactsBook.load_from_file(contacts_path)),
+        ("notes.search", cycle(words, notebook.search)),
+        ("notes.filter_by_tag", cycle(tags, notebook.filter_by_tag)),
+        ("notes.due_in_days", lambda: notebook.notes_due_in_days(30)),
+        ("notes.save", lambda: notebook.save_to_file(notebook_path)),
+        ("notes.load", lambda: Notebook.load_from_file(notebook_path)),
+        ("handler.direct", cycle(find_args, handler.get_contact_by_name)),
+        (
+            "handler.execute",
+            cycle(
+                find_args,
+                lambda args: handler.execute(Menu.FIND_CONTACT_BY_NAME, args),
+            ),
+        ),
+    ]
+
+
+def measure(func, repeat, min_time):
+    """
+    Time a function.
+
+    The number of calls per sample is doubled until a sample takes min_time, then the
+    samples are repeated.
+
+    Args:
+        func (callable): The function to time.
+        repeat (int): The number of samples.
+        min_time (float): The minimum duration of a sample in seconds.
+
+    Returns:
+        dict: The best and median seconds per call and the calls per sample.
+    """
+
+    def sample(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return (time.perf_counter() - start) / number
+
+    number = 1
+    first = sample(number)
+    while first * number < min_time:
+        number *= 2
+        first = sample(number)
+    samples = [first] + [sample(number) for _ in range(repeat - 1)]
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(sizes, seed, repeat, min_time, only):
+    """
+    Run the cases of every size.
+
+    Args:
+        sizes (list): The dataset sizes.
+        seed (int): The seed of the data generator.
+        repeat (int): The number of samples of each case.
+        min_time (float): The minimum duration of a sample in seconds.
+        only (list): Patterns of the case names to run, all cases if empty.
+
+    Returns:
+        dict: The environment and the results by case name.
+    """
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            for name, func in build_cases(size, seed, directory):
+                key = f"{name}/{size}"
+                if only and not any(fnmatch.fnmatch(key, pattern) for pattern in only):
+                    continue
+                results[key] = measure(func, repeat, min_time)
+                print(f"{key:<36}{format_time(results[key]['min']):>12}", flush=True)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "numpy": np.__version__ if np is not None else None,
+            "seed": seed,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare results with a baseline.
+
+    Args:
+        baseline (dict): The baseline results.
+        current (dict): The new results.
+        threshold (float): The relative slowdown of the best time flagged as a regression.
+
+    Returns:
+        list: (name, baseline seconds, current seconds, ratio, status) rows, the status is
+            "regression", "faster", "ok", "new" or "missing".
+    """
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in list(old) + [name for name in new if name not in old]:
+        if name not in new:
+            rows.append((name, old[name]["min"], None, None, "missing"))
+            continue
+        if name not in old:
+            rows.append((name, None, new[name]["min"], None, "new"))
+            continue
+        ratio = new[name]["min"] / old[name]["min"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, old[name]["min"], new[name]["min"], ratio, status))
+    return rows
+
+
+def format_time(seconds):
+    """Format a duration with a readable unit."""
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def print_comparison(rows, threshold):
+    """Print the comparison rows and return True if there are regressions."""
+    print(f"\n{'Case':<36}{'Baseline':>12}{'Current':>12}{'Ratio':>8}  Status")
+    for name, old, new, ratio, status in rows:
+        ratio = f"{ratio:.2f}" if ratio is not None else "-"
+        print(
+            f"{name:<36}{format_time(old):>12}{format_time(new):>12}{ratio:>8}  {status}"
+        )
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} case(s) are more than {threshold:.0%} slower.")
+    return bool(regressions)
+
+
+def main():
+    """Run the benchmark, save and compare the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    parser.add_argument(
+        "--only", nargs="+", default=[], help="Case name patterns, e.g. 'notes.*'"
+    )
+    parser.add_argument("--output", help="Write the results to a JSON file")
+    parser.add_argument("--baseline", help="Compare the results with a JSON file")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="Compare two JSON files without running the benchmark",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown flagged as a regression (default 0.1)",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            current = json.load(file)
+    else:
+        current = run(args.sizes, args.seed, args.repeat, args.min_time, args.only)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(current, file, indent=4)
+        if not args.baseline:
+            return
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if args.only:
+            baseline["results"] = {
+                name: result
+                for name, result in baseline["results"].items()
+                if any(fnmatch.fnmatch(name, pattern) for pattern in args.only)
+            }
+
+    rows = compare(baseline, current, args.threshold)
+    if print_comparison(rows, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
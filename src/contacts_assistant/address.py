@@ -3,7 +3,8 @@ Module containing classes to represent addresses and related enums.
 """
 
 from enum import Enum
-from contacts_assistant.field import Field
+from contacts_assistant.field import Field, field_value
+from contacts_assistant.slotted import Slotted
 
 
 class AddressType(Enum):
@@ -21,30 +22,40 @@ class City(Field):
     Class to represent the city field of an address.
     """
 
+    __slots__ = ()
+
 
 class Country(Field):
     """
     Class to represent the country field of an address.
     """
 
+    __slots__ = ()
+
 
 class Street(Field):
     """
     Class to represent the street field of an address.
     """
 
+    __slots__ = ()
+
 
 class PostalCode(Field):
     """
     Class to represent the postal code field of an address.
     """
 
+    __slots__ = ()
 
-class Address:
+
+class Address(Slotted):
     """
     Class to represent an address.
     """
 
+    __slots__ = ("street", "city", "postal_code", "country")
+
     def __init__(
         self,
         street=None,
@@ -80,13 +91,9 @@ class Address:
 
         :return: A string representation of the address.
         """
-        address_parts = []
-        if self.street:
-            address_parts.append(self.street.value)
-        if self.city:
-            address_parts.append(self.city.value)
-        if self.postal_code:
-            address_parts.append(self.postal_code.value)
-        if self.country:
-            address_parts.append(self.country.value)
+        address_parts = [
+            field_value(part)
+            for part in (self.street, self.city, self.postal_code, self.country)
+            if part
+        ]
         return ", ".join(address_parts)
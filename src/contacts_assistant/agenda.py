@@ -0,0 +1,123 @@
+"""
+A module containing the agenda, a single timeline of birthdays and note due dates.
+
+Each source yields its events in date order from a lazy iterator, and the iterators are
+merged with heapq.merge. Taking the first items of the merged timeline consumes only as
+much of each source as needed, so a limit stops the work early.
+
+Classes:
+    AgendaItem: A named tuple for one event of the agenda.
+    Agenda: A class for building the agenda of a contacts book and a notebook.
+"""
+
+import calendar
+import heapq
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import islice
+
+from contacts_assistant.constants import DATE_FORMAT
+
+AgendaItem = namedtuple("AgendaItem", ["date", "kind", "title"])
+
+
+class Agenda:
+    """
+    A class for building the agenda of a contacts book and a notebook.
+
+    Methods:
+        birthdays(book, start, end): Yields the birthdays of a window in date order.
+        notes_due(notebook, start, end): Yields the notes due in a window in date order.
+        items(book, notebook, start, end, limit): Returns the merged events of a window.
+        format_item(item): Formats an event as a line of text.
+    """
+
+    @staticmethod
+    def birthdays(book, start: date, end: date):
+        """
+        Yield the birthdays of a window in date order.
+
+        Contacts are grouped by (month, day) once, then the window is walked one day at a
+        time, so a window spanning several years yields every yearly occurrence. A birthday
+        on February 29 is listed on March 1 in common years.
+
+        Args:
+            book (ContactsBook): The contacts book.
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+
+        Yields:
+            AgendaItem: The birthdays in date order.
+        """
+        names, ordinals = book.birthday_column()
+        by_day = {}
+        for row, ordinal in enumerate(ordinals):
+            if ordinal:
+                birthday = date.fromordinal(ordinal)
+                by_day.setdefault((birthday.month, birthday.day), []).append(row)
+        if not by_day:
+            return
+
+        leap_day_rows = by_day.get((2, 29), [])
+        day = start
+        while day <= end:
+            rows = by_day.get((day.month, day.day), [])
+            if day.month == 3 and day.day == 1 and not calendar.isleap(day.year):
+                rows = leap_day_rows + rows
+            for row in rows:
+                yield AgendaItem(day, "Birthday", names[row])
+            day += timedelta(1)
+
+    @staticmethod
+    def notes_due(notebook, start: date, end: date):
+        """
+        Yield the notes due in a window in date order.
+
+        The occurrences of the notes are merged lazily, so taking the first few never
+        computes the rest of the window.
+
+        Args:
+            notebook (Notebook): The notebook.
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+
+        Yields:
+            AgendaItem: The due notes in date order.
+        """
+        for due_date, note in notebook.occurrences_between(start, end):
+            yield AgendaItem(due_date.date(), "Due", note.title)
+
+    @staticmethod
+    def items(book, notebook, start: date, end: date, limit=None):
+        """
+        Return the merged events of a window.
+
+        Args:
+            book (ContactsBook): The contacts book.
+            notebook (Notebook): The notebook.
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+            limit (int, optional): The maximum number of events.
+
+        Returns:
+            iterator: AgendaItem events in date order, birthdays first on the same day.
+        """
+        merged = heapq.merge(
+            Agenda.birthdays(book, start, end),
+            Agenda.notes_due(notebook, start, end),
+            key=lambda item: item.date,
+        )
+        return islice(merged, limit)
+
+    @staticmethod
+    def format_item(item):
+        """
+        Format an event as a line of text.
+
+        Args:
+            item (AgendaItem): The event.
+
+        Returns:
+            str: The date, weekday, kind and title of the event.
+        """
+        return f"{item.date.strftime(DATE_FORMAT)} {item.date.strftime('%a')}  {item.kind}: {item.title}"
@@ -5,10 +5,9 @@ Classes:
     Birthday: A class to represent and validate a birthday.
 """
 
-from datetime import datetime
-
 from contacts_assistant.field import Field
 from contacts_assistant.constants import DATE_FORMAT
+from contacts_assistant.date_helpers import DateHelper
 
 
 class Birthday(Field):
@@ -25,6 +24,8 @@ class Birthday(Field):
         __str__(): Returns a string representation of the birthday.
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         """
         Initializes the Birthday instance by validating the provided date string.
@@ -36,7 +37,7 @@ class Birthday(Field):
             ValueError: If the date string is not in the correct format.
         """
         try:
-            self.value = datetime.strptime(value, DATE_FORMAT)
+            self.value = DateHelper.parse_date(value)
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
 
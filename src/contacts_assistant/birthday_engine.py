@@ -0,0 +1,223 @@
+"""
+A module containing birthday computations over a whole column of birthdays at once.
+
+Birthdays are passed as a column of date ordinals with 0 for contacts without a birthday,
+e.g. the birthdays array of a ColumnarContactsBook. When NumPy is installed every report is
+computed in a few vectorized passes over the column, otherwise the DateHelper functions are
+applied to each birthday.
+
+Classes:
+    BirthdayEngine: A class for computing upcoming birthdays and birthday statistics.
+"""
+
+from array import array
+from datetime import date
+
+from contacts_assistant.date_helpers import DateHelper
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Ordinal of 1970-01-01, the day 719468 of the proleptic calendar counted from 0000-03-01
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class BirthdayEngine:
+    """
+    A class for computing upcoming birthdays and birthday statistics.
+
+    A birthday on February 29 is celebrated on March 1 in common years, and a congratulation
+    that falls on a weekend is moved to the next Monday, as in DateHelper.
+
+    Attributes:
+        vectorized (bool): Whether the NumPy implementation is used.
+
+    Methods:
+        upcoming(ordinals, today, days): Returns the rows with a birthday in the next days.
+        per_month(ordinals): Counts birthdays per month.
+        per_weekday(ordinals, year): Counts the weekdays birthdays fall on in a year.
+        age_distribution(ordinals, today, bucket_size): Counts ages in buckets.
+    """
+
+    vectorized = np is not None
+
+    @staticmethod
+    def _column(ordinals):
+        """Return the rows with a birthday and their birthday ordinals as NumPy arrays."""
+        if isinstance(ordinals, array):
+            values = np.frombuffer(ordinals, dtype=np.dtype(f"i{ordinals.itemsize}"))
+        else:
+            values = np.asarray(ordinals, dtype=np.int64)
+        rows = np.flatnonzero(values)
+        return rows, values[rows].astype(np.int64)
+
+    @staticmethod
+    def _parts(birthdays):
+        """Split birthday ordinals into years, month indexes and day offsets."""
+        # Integer version of the civil calendar conversion, counting years from March so
+        # that the leap day is the last day of a year. It is several times faster than
+        # converting through datetime64 units.
+        days = birthdays - EPOCH_ORDINAL + 719468
+        eras = days // 146097
+        day_of_era = days - eras * 146097
+        year_of_era = (
+            day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+        ) // 365
+        day_of_year = day_of_era - (
+            365 * year_of_era + year_of_era // 4 - year_of_era // 100
+        )
+        march_months = (5 * day_of_year + 2) // 153
+        day_offsets = day_of_year - (153 * march_months + 2) // 5
+        month_indexes = np.where(march_months < 10, march_months + 2, march_months - 10)
+        years = year_of_era + eras * 400 + (month_indexes <= 1)
+        return years, month_indexes, day_offsets
+
+    @staticmethod
+    def _occurrence(year, month_indexes, day_offsets):
+        """Return the ordinals of the birthdays in a year."""
+        # Adding 28 days to February 1st of a common year gives March 1st, which is
+        # exactly how a February 29 birthday is celebrated in such a year.
+        month_starts = np.array(
+            [date(year, month, 1).toordinal() for month in range(1, 13)]
+        )
+        return month_starts[month_indexes] + day_offsets
+
+    @staticmethod
+    def _workday(ordinals):
+        """Move ordinals that fall on a weekend to the next Monday."""
+        weekdays = (ordinals - 1) % 7
+        return ordinals + np.where(weekdays >= 5, 7 - weekdays, 0)
+
+    @staticmethod
+    def upcoming(ordinals, today: date, days=7):
+        """
+        Return the rows with a birthday in the next days.
+
+        Args:
+            ordinals (sequence): Birthday ordinals by row, 0 for no birthday.
+            today (date): The first day of the window.
+            days (int): The number of days in the window. Defaults to 7.
+
+        Returns:
+            list: (row, congratulation date) pairs in row order, weekend dates are moved
+                to the next Monday.
+        """
+        today_ordinal = today.toordinal()
+        if not BirthdayEngine.vectorized:
+            calendar = DateHelper.calendar(today)
+            result = []
+            for row, ordinal in enumerate(ordinals):
+                if not ordinal:
+                    continue
+                birthday = date.fromordinal(ordinal)
+                if calendar.next_birthday(birthday).toordinal() - today_ordinal < days:
+                    result.append((row, calendar.congratulation_date(birthday)))
+            return result
+
+        rows, birthdays = BirthdayEngine._column(ordinals)
+        _, month_indexes, day_offsets = BirthdayEngine._parts(birthdays)
+        this_year = BirthdayEngine._occurrence(today.year, month_indexes, day_offsets)
+        next_birthdays = np.where(
+            this_year < today_ordinal,
+            BirthdayEngine._occurrence(today.year + 1, month_indexes, day_offsets),
+            this_year,
+        )
+        selected = (next_birthdays - today_ordinal) < days
+        congratulations = BirthdayEngine._workday(next_birthdays[selected])
+        return [
+            (row, date.fromordinal(ordinal))
+            for row, ordinal in zip(rows[selected].tolist(), congratulations.tolist())
+        ]
+
+    @staticmethod
+    def per_month(ordinals):
+        """
+        Count birthdays per month.
+
+        Args:
+            ordinals (sequence): Birthday ordinals by row, 0 for no birthday.
+
+        Returns:
+            list: Twelve counts, from January to December.
+        """
+        if not BirthdayEngine.vectorized:
+            counts = [0] * 12
+            for ordinal in ordinals:
+                if ordinal:
+                    counts[date.fromordinal(ordinal).month - 1] += 1
+            return counts
+        _, birthdays = BirthdayEngine._column(ordinals)
+        _, month_indexes, _ = BirthdayEngine._parts(birthdays)
+        return np.bincount(month_indexes, minlength=12).tolist()
+
+    @staticmethod
+    def per_weekday(ordinals, year):
+        """
+        Count the weekdays birthdays fall on in a year.
+
+        Args:
+            ordinals (sequence): Birthday ordinals by row, 0 for no birthday.
+            year (int): The year of the birthdays.
+
+        Returns:
+            list: Seven counts, from Monday to Sunday.
+        """
+        if not BirthdayEngine.vectorized:
+            counts = [0] * 7
+            for ordinal in ordinals:
+                if ordinal:
+                    counts[
+                        DateHelper.get_next_birthday(
+                            date.fromordinal(ordinal), date(year, 1, 1)
+                        ).weekday()
+                    ] += 1
+            return counts
+        _, birthdays = BirthdayEngine._column(ordinals)
+        _, month_indexes, day_offsets = BirthdayEngine._parts(birthdays)
+        occurrences = BirthdayEngine._occurrence(year, month_indexes, day_offsets)
+        return np.bincount((occurrences - 1) % 7, minlength=7).tolist()
+
+    @staticmethod
+    def age_distribution(ordinals, today: date, bucket_size=10):
+        """
+        Count ages in buckets.
+
+        Args:
+            ordinals (sequence): Birthday ordinals by row, 0 for no birthday.
+            today (date): The date the ages are computed at.
+            bucket_size (int): The number of years in a bucket. Defaults to 10.
+
+        Returns:
+            dict: Counts by the first age of each non-empty bucket, in ascending order.
+        """
+        if not BirthdayEngine.vectorized:
+            counts = {}
+            for ordinal in ordinals:
+                if not ordinal:
+                    continue
+                birthday = date.fromordinal(ordinal)
+                age = today.year - birthday.year
+                if (
+                    DateHelper.get_next_birthday(birthday, date(today.year, 1, 1))
+                    > today
+                ):
+                    age -= 1
+                bucket = age // bucket_size * bucket_size
+                counts[bucket] = counts.get(bucket, 0) + 1
+            return dict(sorted(counts.items()))
+        _, birthdays = BirthdayEngine._column(ordinals)
+        years, month_indexes, day_offsets = BirthdayEngine._parts(birthdays)
+        this_year = BirthdayEngine._occurrence(today.year, month_indexes, day_offsets)
+        ages = today.year - years - (this_year > today.toordinal())
+        if not len(ages):
+            return {}
+        buckets = ages // bucket_size
+        first = int(buckets.min())
+        counts = np.bincount(buckets - first)
+        return {
+            (first + index) * bucket_size: count
+            for index, count in enumerate(counts.tolist())
+            if count
+        }
@@ -0,0 +1,501 @@
+"""
+A module containing a column-oriented contacts book for very large address books.
+
+Instead of one Record object per contact, the fields of all contacts are kept in compact
+columns indexed by row number:
+
+    names       interned names, None for deleted rows
+    birthdays   date ordinals in an array, 0 for no birthday
+    emails      indexes into an email string pool in an array, -1 for no email
+    phones      packed int64 numbers in an array, chained per row through slot arrays
+    addresses   Address dictionaries, only for rows that have addresses
+
+Rows are exposed as RecordView objects, so the Handler commands and the ContactsBook
+methods work unchanged. Lookups by phone, phone prefix, email domain and upcoming
+birthdays run as column scans, vectorized with NumPy when it is installed.
+
+Classes:
+    RecordView: A Record that reads and writes a row of a ColumnarContactsBook.
+    ColumnarRecordMap: A mapping of names to record views.
+    ColumnarContactsBook: A ContactsBook that stores its contacts in columns.
+"""
+
+import sys
+from array import array
+from collections.abc import MutableMapping
+from datetime import datetime
+
+from contacts_assistant.address import Address, AddressType
+from contacts_assistant.birthday import Birthday
+from contacts_assistant.contact_email import Email
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.name import Name
+from contacts_assistant.phone import Phone
+from contacts_assistant.record import Record
+from contacts_assistant.rwlock import reading
+from contacts_assistant.snapshot import Snapshot
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class RecordView(Record):
+    """
+    A Record that reads and writes a row of a ColumnarContactsBook.
+
+    Field objects are created on access from the columns and changes made through the
+    Record methods are written back to the columns.
+
+    Attributes:
+        book (ColumnarContactsBook): The book holding the columns.
+        row (int): The row of the contact.
+    """
+
+    __slots__ = ("book", "row")
+
+    def __init__(self, book, row):
+        """
+        Initialize a view of a row.
+
+        Args:
+            book (ColumnarContactsBook): The book holding the columns.
+            row (int): The row of the contact.
+        """
+        self.book = book
+        self.row = row
+
+    def __getstate__(self):
+        """Pickle views as regular records."""
+        return {
+            "name": self.name,
+            "phones": self.phones,
+            "birthday": self.birthday,
+            "email": self.email,
+            "addresses": self.addresses,
+        }
+
+    def __reduce__(self):
+        return (Record.__new__, (Record,), self.__getstate__())
+
+    def _cached(self, slot, render):
+        """Render on every call, views read the columns and may change under them."""
+        return render()
+
+    @property
+    def name(self):
+        name = Name.__new__(Name)
+        name.value = self.book.names[self.row]
+        return name
+
+    @property
+    def phones(self):
+        phones = []
+        for number in self.book.row_phones(self.row):
+            phone = Phone.__new__(Phone)
+            phone.value = f"{number:010d}"
+            phones.append(phone)
+        return phones
+
+    @phones.setter
+    def phones(self, phones):
+        self.book.clear_phones(self.row)
+        for phone in phones:
+            self.book.append_phone(self.row, int(phone.value))
+
+    @property
+    def birthday(self):
+        ordinal = self.book.birthdays[self.row]
+        if not ordinal:
+            return None
+        birthday = Birthday.__new__(Birthday)
+        birthday.value = datetime.fromordinal(ordinal)
+        return birthday
+
+    @birthday.setter
+    def birthday(self, birthday):
+        self.book.birthdays[self.row] = birthday.value.toordinal() if birthday else 0
+
+    @property
+    def email(self):
+        email_id = self.book.emails[self.row]
+        if email_id < 0:
+            return None
+        email = Email.__new__(Email)
+        email.value = self.book.email_pool[email_id]
+        return email
+
+    @email.setter
+    def email(self, email):
+        self.book.emails[self.row] = self.book.email_id(email.value) if email else -1
+
+    @property
+    def addresses(self):
+        return self.book.addresses.get(self.row, {})
+
+    @addresses.setter
+    def addresses(self, addresses):
+        self.book.addresses[self.row] = addresses
+
+    def add_phone(self, number: str):
+        """
+        Adds a phone number to the contact record.
+
+        Args:
+            number (str): The phone number to be added.
+        """
+        self.book.append_phone(self.row, int(Phone(number).value))
+
+    def edit_phone(self, old_number: str, new_number: str):
+        """
+        Edits a phone number in the contact record.
+
+        Args:
+            old_number (str): The current phone number to be replaced.
+            new_number (str): The new phone number to replace the old one with.
+
+        Raises:
+            KeyError: If the provided number does not exist or the contact has no phone numbers.
+        """
+        new_value = int(Phone(new_number).value)
+        slot = self.book.phone_heads[self.row]
+        while slot >= 0:
+            if f"{self.book.phone_numbers[slot]:010d}" == old_number:
+                self.book.phone_numbers[slot] = new_value
+                return
+            slot = self.book.phone_next[slot]
+        raise KeyError(
+            "Provided number does not exist or contact has no phone numbers."
+        )
+
+    def add_address(
+        self,
+        address_type: AddressType,
+        street=None,
+        city=None,
+        postal_code=None,
+        country=None,
+    ):
+        """
+        Add an address to the contact record.
+
+        Args:
+            address_type (AddressType): The type of address (HOME, WORK, OTHER).
+            street (str, optional): The street address.
+            city (str, optional): The city.
+            postal_code (str, optional): The postal code.
+            country (str, optional): The country.
+        """
+        self.book.addresses.setdefault(self.row, {})[address_type] = Address(
+            street, city, postal_code, country
+        )
+
+
+class ColumnarRecordMap(MutableMapping):
+    """
+    A mapping of names to record views of a ColumnarContactsBook.
+
+    Assigning a Record copies its fields into the columns.
+    """
+
+    def __init__(self, book):
+        self.book = book
+
+    def __getitem__(self, name):
+        return RecordView(self.book, self.book.rows[name])
+
+    def __contains__(self, name):
+        return name in self.book.rows
+
+    def __setitem__(self, name, record):
+        if name in self.book.rows:
+            del self[name]
+        self.book.append_record(record)
+
+    def __delitem__(self, name):
+        self.book.delete_row(self.book.rows[name])
+
+    def __iter__(self):
+        return iter(list(self.book.rows))
+
+    def __len__(self):
+        return len(self.book.rows)
+
+    def values(self):
+        """Yield the record views in row order."""
+        for row in list(self.book.rows.values()):
+            yield RecordView(self.book, row)
+
+
+class ColumnarContactsBook(ContactsBook):
+    """
+    A ContactsBook that stores its contacts in columns.
+
+    Attributes:
+        names (list): Interned contact names by row, None for deleted rows.
+        rows (dict): Rows by contact name.
+        birthdays (array): Birthday date ordinals by row, 0 for no birthday.
+        emails (array): Email pool indexes by row, -1 for no email.
+        email_pool (list): Distinct email addresses.
+        phone_numbers (array): Phone numbers as int64 by phone slot.
+        phone_rows (array): The row of each phone slot, -1 for removed phones.
+        phone_next (array): The next phone slot of the same row, -1 for the last one.
+        phone_heads (array): The first phone slot of each row, -1 for no phones.
+        phone_tails (array): The last phone slot of each row, -1 for no phones.
+        addresses (dict): Address dictionaries by row.
+
+    Methods:
+        from_records(records): Builds a book from records.
+        load_from_file(filepath): Loads a snapshot file into columns.
+        append_record(record): Copies a record into a new row.
+        delete_row(row): Removes a row.
+        find_by_phone(phone): Finds a record by phone number with a column scan.
+        find_by_phone_prefix(prefix): Finds records with a phone number starting with a prefix.
+        find_by_email(email): Finds a record by email address with a column scan.
+        find_by_email_domain(domain): Finds records with an email address at a domain.
+        birthday_column(): Returns the name and birthday columns without copying them.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty columnar contacts book.
+        """
+        super().__init__()
+        self.names = []
+        self.rows = {}
+        self.birthdays = array("l")
+        self.emails = array("l")
+        self.email_pool = []
+        self.email_ids = {}
+        self.phone_numbers = array("q")
+        self.phone_rows = array("l")
+        self.phone_next = array("l")
+        self.phone_heads = array("l")
+        self.phone_tails = array("l")
+        self.addresses = {}
+        self.data = ColumnarRecordMap(self)
+
+    @staticmethod
+    def from_records(records):
+        """
+        Build a book from records.
+
+        Args:
+            records (iterable): The records to copy into columns.
+
+        Returns:
+            ColumnarContactsBook: The new book.
+        """
+        book = ColumnarContactsBook()
+        for record in records:
+            book.append_record(record)
+        return book
+
+    @staticmethod
+    def load_from_file(filepath, legacy_filepath=None):
+        """
+        Load a snapshot or a legacy pickle file into columns.
+
+        Args:
+            filepath (str): The name of the file from which the data will be loaded.
+            legacy_filepath (str, optional): The pickle file to load if filepath does not exist.
+
+        Returns:
+            ColumnarContactsBook: The loaded address book.
+        """
+        try:
+            if Snapshot.is_snapshot(filepath):
+                return ColumnarContactsBook.from_records(
+                    Snapshot.iter_records(filepath)
+                )
+        except FileNotFoundError:
+            pass
+        book = ContactsBook.load_from_file(filepath, legacy_filepath)
+        return ColumnarContactsBook.from_records(book.data.values())
+
+    def email_id(self, email):
+        """Return the pool index of an email address, adding it if needed."""
+        email_id = self.email_ids.get(email)
+        if email_id is None:
+            email_id = self.email_ids[email] = len(self.email_pool)
+            self.email_pool.append(email)
+        return email_id
+
+    def row_phones(self, row):
+        """Yield the phone numbers of a row in insertion order."""
+        slot = self.phone_heads[row]
+        while slot >= 0:
+            yield self.phone_numbers[slot]
+            slot = self.phone_next[slot]
+
+    def append_phone(self, row, number):
+        """Append a phone number to a row."""
+        slot = len(self.phone_numbers)
+        self.phone_numbers.append(number)
+        self.phone_rows.append(row)
+        self.phone_next.append(-1)
+        if self.phone_tails[row] >= 0:
+            self.phone_next[self.phone_tails[row]] = slot
+        else:
+            self.phone_heads[row] = slot
+        self.phone_tails[row] = slot
+
+    def clear_phones(self, row):
+        """Remove all phone numbers of a row."""
+        slot = self.phone_heads[row]
+        while slot >= 0:
+            self.phone_rows[slot] = -1
+            slot = self.phone_next[slot]
+        self.phone_heads[row] = self.phone_tails[row] = -1
+
+    def append_record(self, record):
+        """
+        Copy a record into a new row.
+
+        Args:
+            record (Record): The record to copy.
+
+        Returns:
+            int: The new row.
+        """
+        row = len(self.names)
+        name = sys.intern(record.name.value)
+        self.names.append(name)
+        self.rows[name] = row
+        self.birthdays.append(
+            record.birthday.value.toordinal() if record.birthday else 0
+        )
+        self.emails.append(self.email_id(record.email.value) if record.email else -1)
+        self.phone_heads.append(-1)
+        self.phone_tails.append(-1)
+        for phone in record.phones:
+            self.append_phone(row, int(phone.value))
+        if record.addresses:
+            self.addresses[row] = dict(record.addresses)
+        return row
+
+    def delete_row(self, row):
+        """
+        Remove a row. The row number is not reused.
+
+        Args:
+            row (int): The row to remove.
+        """
+        self.clear_phones(row)
+        del self.rows[self.names[row]]
+        self.names[row] = None
+        self.birthdays[row] = 0
+        self.emails[row] = -1
+        self.addresses.pop(row, None)
+
+    def _phone_rows_matching(self, low, high):
+        """Return the rows owning a phone number in [low, high), in row order."""
+        if np is not None:
+            numbers = np.frombuffer(self.phone_numbers, dtype=np.int64)
+            owners = np.frombuffer(
+                self.phone_rows, dtype=np.dtype(f"i{self.phone_rows.itemsize}")
+            )
+            rows = owners[(numbers >= low) & (numbers < high) & (owners >= 0)]
+            return np.unique(rows).tolist()
+        return sorted(
+            {
+                row
+                for number, row in zip(self.phone_numbers, self.phone_rows)
+                if low <= number < high and row >= 0
+            }
+        )
+
+    @reading
+    def find_by_phone(self, phone: str):
+        """
+        Finds and returns a record by phone number with a scan of the phone column.
+
+        Args:
+            phone (str): The phone number of the record to find.
+
+        Returns:
+            The record if found, otherwise None.
+        """
+        if not phone.isdigit():
+            return None
+        rows = self._phone_rows_matching(int(phone), int(phone) + 1)
+        return RecordView(self, rows[0]) if rows else None
+
+    @reading
+    def find_by_phone_prefix(self, prefix: str):
+        """
+        Finds records with a phone number starting with a prefix.
+
+        Phone numbers have 10 digits, so a prefix maps to a range of packed numbers.
+
+        Args:
+            prefix (str): The leading digits of the phone number.
+
+        Returns:
+            list: The matching records in row order.
+        """
+        if not prefix.isdigit() or len(prefix) > 10:
+            return []
+        scale = 10 ** (10 - len(prefix))
+        low = int(prefix) * scale
+        return [
+            RecordView(self, row) for row in self._phone_rows_matching(low, low + scale)
+        ]
+
+    def _email_rows(self, email_ids):
+        """Return the rows whose email is one of the given pool indexes."""
+        if not email_ids:
+            return []
+        if np is not None:
+            emails = np.frombuffer(
+                self.emails, dtype=np.dtype(f"i{self.emails.itemsize}")
+            )
+            return np.flatnonzero(np.isin(emails, list(email_ids))).tolist()
+        return [
+            row for row, email_id in enumerate(self.emails) if email_id in email_ids
+        ]
+
+    @reading
+    def find_by_email(self, email: str):
+        """
+        Finds and returns a record by email address with a scan of the email column.
+
+        Args:
+            email (str): The email address of the record to find.
+
+        Returns:
+            The record if found, otherwise None.
+        """
+        email_id = self.email_ids.get(email)
+        rows = self._email_rows({email_id} if email_id is not None else set())
+        return RecordView(self, rows[0]) if rows else None
+
+    @reading
+    def find_by_email_domain(self, domain: str):
+        """
+        Finds records with an email address at a domain.
+
+        Args:
+            domain (str): The email domain, e.g. "ukr.net".
+
+        Returns:
+            list: The matching records in row order.
+        """
+        suffix = "@" + domain.lower()
+        email_ids = {
+            email_id
+            for email_id, email in enumerate(self.email_pool)
+            if email.lower().endswith(suffix)
+        }
+        return [RecordView(self, row) for row in self._email_rows(email_ids)]
+
+    @reading
+    def birthday_column(self):
+        """
+        Returns the name and birthday columns without copying them.
+
+        Returns:
+            tuple: The names list and the birthday ordinals array, deleted rows have no birthday.
+        """
+        return self.names, self.birthdays
@@ -3,16 +3,35 @@ A module containing configuration settings for a application.
 
 Constants:
     DATE_FORMAT (str): The format string for dates.
-    CONTACTS_BOOK_FILENAME (str): The filename for the contacts book file.
+    CONTACTS_BOOK_FILENAME (str): The filename for the contacts book snapshot file.
+    LEGACY_CONTACTS_BOOK_FILENAME (str): The filename for the pickled contacts book of older versions.
     NOTEBOOK_FILENAME (str): The filename for the notebook file.
+    NOTEBOOK_PARTITIONS_DIRNAME (str): The directory for the partitioned notebook.
+    PROFILE_FILENAME (str): The default filename for pstats profiles.
+    QUERY_CACHE_SIZE (int): The number of query results kept by the handler.
+    PARALLEL_SEARCH_THRESHOLD (int): The smallest notebook searched in worker processes.
+    SUBSTRING_INDEX_BATCH (int): The number of note changes after which the substring
+        index is rebuilt.
+    CONTACTS_JOURNAL_SIZE (int): The number of contact changes a contacts book remembers
+        for its indexes.
+    MENTION_INDEX_BATCH (int): The number of changed contacts after which the mention
+        automaton is rebuilt.
     MENU_BORDER (str): The border style for the menu.
     GREETING_BANNER (str): The text displayed as a greeting.
     INPUT_STYLE (dict): The style settings for input prompts.
 """
 
 DATE_FORMAT = "%d.%m.%Y"
-CONTACTS_BOOK_FILENAME = "./contacts_book.pkl"
+CONTACTS_BOOK_FILENAME = "./contacts_book.bin"
+LEGACY_CONTACTS_BOOK_FILENAME = "./contacts_book.pkl"
 NOTEBOOK_FILENAME = "./notebook.json"
+NOTEBOOK_PARTITIONS_DIRNAME = "./notebook"
+PROFILE_FILENAME = "./profile.pstats"
+QUERY_CACHE_SIZE = 128
+PARALLEL_SEARCH_THRESHOLD = 20000
+SUBSTRING_INDEX_BATCH = 500
+CONTACTS_JOURNAL_SIZE = 10000
+MENTION_INDEX_BATCH = 500
 MENU_BORDER = f"{'-'*116}\n"
 GREETING_BANNER = """
   ___          _     _              _     _           _   
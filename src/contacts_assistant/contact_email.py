@@ -22,6 +22,8 @@ class Email(Field):
         validate_email(email): Validates the email format.
     """
 
+    __slots__ = ()
+
     def __init__(self, email: str):
         """
         Initializes the Email instance by validating the provided email.
@@ -3,13 +3,21 @@ This module provides classes and functions for managing contacts.
 
 Classes:
     ContactsBook: A class for managing a collection of contacts.
+    ContactsSnapshot: An immutable point-in-time copy of a contacts book.
 """
 
+from array import array
 from datetime import date
 from collections import UserDict
+import os
 import pickle
 
-from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.birthday_engine import BirthdayEngine
+from contacts_assistant.constants import CONTACTS_JOURNAL_SIZE, DATE_FORMAT
+from contacts_assistant.persistent_map import PersistentMap
+from contacts_assistant.query_cache import next_generation
+from contacts_assistant.rwlock import ReadWriteLock, reading, writing
+from contacts_assistant.snapshot import Snapshot
 
 
 class ContactsBook(UserDict):
@@ -18,14 +26,54 @@ class ContactsBook(UserDict):
 
     Inherits from UserDict to utilize a dictionary as the underlying data structure.
 
+    The public methods take the read or write lock of the book, so lookups may run in
+    worker threads while another thread changes the book. Compound operations hold
+    book.lock.write() around their steps.
+
+    Long readers such as renderings and exports take a snapshot() instead, an immutable
+    copy that is read without locks while the book changes. The first snapshot copies the
+    records into a persistent hash trie (PersistentMap) that the book then keeps up to
+    date in O(log n) per change, so later snapshots cost O(1). Records are copied on
+    write: find_for_update() replaces a record shared with a snapshot by a copy before it
+    is edited.
+
+    The names of the contacts stored, removed or edited are appended to a change journal
+    of the last CONTACTS_JOURNAL_SIZE changes, so indexes over the contacts can catch up
+    with changes_since() instead of reading every record. Books keeping their records in columns or in a mapped file have no cheap
+    snapshots, their long readers hold the read lock instead.
+
+    Attributes:
+        lock (ReadWriteLock): The lock guarding the records.
+        generation (int): A number replaced by a new one on every change of the book.
+        cheap_snapshots (bool): Whether snapshot() costs O(1) once the first one was taken.
+
     Methods:
+        touch(): Marks the book as changed, after a record was edited in place.
+        changes_since(position): Returns the names of the contacts changed since a
+            position of the change journal.
+        snapshot(): Returns an immutable point-in-time copy of the book.
+        find_for_update(name): Finds a record by name to edit it in place.
         __str__(): Returns a string representation of the address book.
         add_record(record): Adds a new record to the address book.
         find(name): Finds and returns a record by name.
         delete(name): Deletes a record by name.
+        birthday_column(): Returns the names and birthdays of all contacts as columns.
         get_upcoming_birthdays(): Returns a list of upcoming birthdays within the next 7 days.
     """
 
+    # The records as a persistent map, kept up to date once a snapshot was taken
+    _persistent = None
+    # The number of changes ever appended to the change journal
+    _journal_end = 0
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the address book and its lock.
+        """
+        self.lock = ReadWriteLock()
+        super().__init__(*args, **kwargs)
+
+    @reading
     def __str__(self):
         """
         Returns a string representation of the address book.
@@ -35,6 +83,154 @@ class ContactsBook(UserDict):
         """
         return self.__format_book()
 
+    @property
+    def generation(self):
+        """
+        A number replaced by a new one on every change of the book.
+
+        Query results cached under a generation are valid as long as the book has it.
+
+        Returns:
+            int: The current generation.
+        """
+        if "_generation" not in self.__dict__:
+            self._generation = next_generation()
+        return self._generation
+
+    @property
+    def cheap_snapshots(self):
+        """
+        Whether snapshot() costs O(1) once the first one was taken.
+
+        Returns:
+            bool: True for books keeping their records in a dict.
+        """
+        return type(self.data) is dict
+
+    def touch(self):
+        """
+        Mark the book as changed.
+
+        Records are edited in place, so callers editing a stored record call this.
+        """
+        self._generation = next_generation()
+
+    @reading
+    def changes_since(self, position):
+        """
+        Returns the names of the contacts stored, removed or edited since a position of
+        the change journal.
+
+        Args:
+            position (int): A position returned by an earlier call, or 0.
+
+        Returns:
+            tuple: The set of names, or None if the journal no longer reaches back to
+                position, and the current position.
+        """
+        journal = self.__dict__.get("_journal", [])
+        count = self._journal_end - position
+        if count > len(journal):
+            return None, self._journal_end
+        return set(journal[len(journal) - count :]), self._journal_end
+
+    def _log(self, name):
+        """Append the name of a changed contact to the change journal."""
+        journal = self.__dict__.setdefault("_journal", [])
+        journal.append(name)
+        self._journal_end += 1
+        if len(journal) > CONTACTS_JOURNAL_SIZE:
+            del journal[: len(journal) - CONTACTS_JOURNAL_SIZE // 2]
+
+    @writing
+    def __setitem__(self, key, item):
+        super().__setitem__(key, item)
+        self._stored(key, item)
+
+    @writing
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._removed(key)
+
+    def _stored(self, name, record):
+        """Add a stored record to the persistent map and mark the book as changed."""
+        if self._persistent is not None:
+            self._persistent = self._persistent.set(name, record)
+            self._fresh.add(name)
+        self._log(name)
+        self.touch()
+
+    def _removed(self, name):
+        """Remove a record from the persistent map and mark the book as changed."""
+        if self._persistent is not None:
+            self._persistent = self._persistent.delete(name)
+        self._log(name)
+        self.touch()
+
+    @writing
+    def snapshot(self):
+        """
+        Returns an immutable point-in-time copy of the book.
+
+        Books keeping their records in columns or in a mapped file copy every record,
+        in O(n), see cheap_snapshots.
+
+        Returns:
+            ContactsSnapshot: The copy, it can be read from any thread without locks.
+        """
+        if not self.cheap_snapshots:
+            return ContactsSnapshot(
+                PersistentMap.from_items(
+                    (name, record.copy()) for name, record in self.data.items()
+                ),
+                self.generation,
+            )
+        if self._persistent is None:
+            self._persistent = PersistentMap.from_items(self.data.items())
+        # Every record is now shared with a snapshot
+        self._fresh = set()
+        return ContactsSnapshot(self._persistent, self.generation)
+
+    @writing
+    def find_for_update(self, name: str):
+        """
+        Finds a record by name to edit it in place.
+
+        A record shared with a snapshot is replaced by a copy first. Callers hold the
+        write lock while they edit the record and call touch().
+
+        Args:
+            name (str): The name of the record to find.
+
+        Returns:
+            The stored record if found, otherwise None.
+        """
+        record = self.find_by_name(name)
+        if record is not None:
+            self._log(name)
+        if record is None or self._persistent is None or name in self._fresh:
+            return record
+        record = record.copy()
+        self.data[name] = record
+        self._stored(name, record)
+        return record
+
+    def __getstate__(self):
+        # Generations are only meaningful in the process that numbered them, and locks
+        # cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_generation", None)
+        state.pop("lock", None)
+        state.pop("_persistent", None)
+        state.pop("_fresh", None)
+        state.pop("_journal", None)
+        state.pop("_journal_end", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = ReadWriteLock()
+
     def __format_book(self):
         """
         Format a list of Record objects into a neatly aligned table.
@@ -42,35 +238,27 @@ class ContactsBook(UserDict):
         Returns:
             str: A formatted string representing the contact list.
         """
-        contact_list = self.data.values()
+        # The cells of each record are cached, so the table is mostly padding and joins
+        cells = [contact.cells() for contact in self.data.values()]
         # Calculate the maximum width of each column
-        name_width = max(
-            (len(str(contact.name)) for contact in contact_list),
-            default=10,
-        )
+        name_width = max((len(name) for name, _, _, _, _ in cells), default=10)
         phone_width = max(
-            list(
-                len(str(phone)) for contact in contact_list for phone in contact.phones
-            ),
+            (len(phone) for _, phones, _, _, _ in cells for phone in phones),
             default=10,
         )
         email_width = max(
-            list(len(str(contact.email)) for contact in contact_list if contact.email),
+            (len(email) for _, _, email, _, _ in cells if email),
             default=15,
         )
         birthday_width = max(
-            list(
-                len(str(contact.birthday))
-                for contact in contact_list
-                if contact.birthday
-            ),
+            (len(birthday) for _, _, _, birthday, _ in cells if birthday),
             default=10,
         )
         address_width = max(
-            list(
-                len(str(address))
-                for contact in contact_list
-                for address in contact.addresses.values()
+            (
+                len(address)
+                for _, _, _, _, addresses in cells
+                for _, address in addresses
             ),
             default=20,
         )
@@ -83,19 +271,12 @@ class ContactsBook(UserDict):
 
         # Rows
         rows = []
-        for contact in contact_list:
-            name = str(contact.name)
-            email = str(contact.email) if contact.email else ""
-            birthday = str(contact.birthday) if contact.birthday else ""
-
-            for index in range(0, max([len(contact.phones), len(contact.addresses)])):
-                phone = ""
+        for name, phones, email, birthday, addresses in cells:
+            for index in range(0, max([len(phones), len(addresses)])):
+                phone = phones[index] if len(phones) > index else ""
                 address = ""
-                if len(contact.phones) > index:
-                    phone = str(contact.phones[index])
-
-                if len(contact.addresses) > index:
-                    address = f"{(list(contact.addresses.keys())[index]).value }: {contact.addresses[(list(contact.addresses.keys())[index])]}"
+                if len(addresses) > index:
+                    address = f"{addresses[index][0]}: {addresses[index][1]}"
 
                 rows.append(
                     f"{name:<{name_width}}  {phone:<{phone_width}}  {email:<{email_width}}  {birthday:<{birthday_width}}  {address:<{address_width}}"
@@ -106,6 +287,7 @@ class ContactsBook(UserDict):
 
         return header + "\n" + header_separator + "\n" + "\n".join(rows)
 
+    @writing
     def add_record(self, record):
         """
         Adds a new record to the address book.
@@ -119,7 +301,9 @@ class ContactsBook(UserDict):
         if record.name.value in self.data:
             raise KeyError(f"Record with name '{record.name.value}' already exists.")
         self.data[record.name.value] = record
+        self._stored(record.name.value, record)
 
+    @reading
     def find_by_name(self, name: str):
         """
         Finds and returns a record by name.
@@ -135,6 +319,7 @@ class ContactsBook(UserDict):
         else:
             return None
 
+    @reading
     def find_by_phone(self, phone: str):
         """
         Finds and returns a record by phone number.
@@ -150,6 +335,7 @@ class ContactsBook(UserDict):
                 return record
         return None
 
+    @reading
     def find_by_email(self, email: str):
         """
         Finds and returns a record by email address.
@@ -161,10 +347,11 @@ class ContactsBook(UserDict):
             The record if found, otherwise None.
         """
         for record in self.data.values():
-            if record.email.value == email:
+            if record.email and record.email.value == email:
                 return record
         return None
 
+    @writing
     def delete(self, name):
         """
         Deletes a record by name.
@@ -177,10 +364,27 @@ class ContactsBook(UserDict):
         if name in self.data:
             removedcontact = self.data[name]
             del self.data[name]
+            self._removed(name)
             return removedcontact
         else:
             return None
 
+    @reading
+    def birthday_column(self):
+        """
+        Returns the names and birthdays of all contacts as columns.
+
+        Returns:
+            tuple: A list of names and an array of birthday date ordinals, 0 for no birthday.
+        """
+        names = []
+        ordinals = array("l")
+        for contact in self.data.values():
+            names.append(contact.name.value)
+            ordinals.append(contact.birthday.value.toordinal() if contact.birthday else 0)
+        return names, ordinals
+
+    @reading
     def get_upcoming_birthdays(self, days=7):
         """
         Get a list of upcoming birthdays within the specified number of days.
@@ -191,47 +395,45 @@ class ContactsBook(UserDict):
         Returns:
             list: A list of dictionaries with names and congratulation dates for upcoming birthdays.
         """
-        today = date.today()
-        upcoming_birthdays = []
-        for contact in list(
-            filter(lambda x: x.birthday is not None, self.data.values())
-        ):
-            next_contact_birthday = DateHelper.get_next_birthday(
-                contact.birthday.value, today
+        names, ordinals = self.birthday_column()
+        return [
+            f"Contact name: {names[row]}, congratulation date: {congratulation_date.strftime(DATE_FORMAT)}"
+            for row, congratulation_date in BirthdayEngine.upcoming(
+                ordinals, date.today(), days
             )
+        ]
 
-            diffdays = (next_contact_birthday - today).days
-            if diffdays in range(0, days):
-                upcoming_birthdays.append(
-                    f"Contact name: {contact.name.value}, congratulation date: {DateHelper.get_formated_workday(next_contact_birthday)}"
-                )
-
-        return upcoming_birthdays
-
+    @reading
     def save_to_file(self, filepath):
         """
-        Saves the address book data to a file using pickle.
+        Saves the address book data to a file in the snapshot format.
+
+        The snapshot is written to a temporary file first and moved over the target,
+        so an interrupted save never leaves a truncated file behind.
 
         Args:
-            book (ContactsBook): The address book object to be saved.
-            filepath (str): The name of the file where the data will be saved. Defaults to FILENAME.
+            filepath (str): The name of the file where the data will be saved.
 
         Raises:
             Exception: If there is an error during the file operation.
         """
+        temp_filepath = f"{filepath}.tmp"
         try:
-            with open(filepath, "wb") as file:
-                pickle.dump(self, file)
+            Snapshot.save(self.data.values(), temp_filepath)
+            os.replace(temp_filepath, filepath)
         except Exception as e:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
             raise Exception(f"Error saving data: {e}")
 
     @staticmethod
-    def load_from_file(filepath):
+    def load_from_file(filepath, legacy_filepath=None):
         """
-        Loads the address book data from a file using pickle.
+        Loads the address book data from a snapshot or a legacy pickle file.
 
         Args:
-            filepath (str): The name of the file from which the data will be loaded. Defaults to FILENAME.
+            filepath (str): The name of the file from which the data will be loaded.
+            legacy_filepath (str, optional): The pickle file to load if filepath does not exist.
 
         Returns:
             ContactsBook: The loaded address book object. If the file does not exist, returns a new ContactsBook instance.
@@ -239,10 +441,54 @@ class ContactsBook(UserDict):
         Raises:
             Exception: If there is an error during the file operation other than FileNotFoundError.
         """
+        if legacy_filepath and not os.path.exists(filepath):
+            filepath = legacy_filepath
         try:
+            if Snapshot.is_snapshot(filepath):
+                book = ContactsBook()
+                book.data = Snapshot.load(filepath)
+                return book
             with open(filepath, "rb") as file:
                 return pickle.load(file)
         except FileNotFoundError:
             return ContactsBook()
         except Exception as e:
             raise Exception(f"Error loading data: {e}")
+
+
+class ContactsSnapshot(ContactsBook):
+    """
+    An immutable point-in-time copy of a contacts book.
+
+    The records are kept in a PersistentMap shared with the book. The read methods of
+    ContactsBook work unchanged, the methods changing the book raise TypeError.
+    """
+
+    def __init__(self, records, generation):
+        """
+        Initialize a snapshot.
+
+        Args:
+            records (PersistentMap): The records by name.
+            generation (int): The generation of the book when the snapshot was taken.
+        """
+        super().__init__()
+        self.data = records
+        self._generation = generation
+
+    def _read_only(self, *args, **kwargs):
+        """Refuse to change the snapshot."""
+        raise TypeError("Contacts book snapshots are read-only")
+
+    add_record = delete = find_for_update = _read_only
+    __setitem__ = __delitem__ = touch = _read_only
+    cheap_snapshots = True
+
+    def snapshot(self):
+        """
+        Returns the snapshot itself, it never changes.
+
+        Returns:
+            ContactsSnapshot: This snapshot.
+        """
+        return self
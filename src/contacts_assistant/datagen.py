@@ -0,0 +1,404 @@
+"""
+A module containing a seeded generator of realistic contacts and notes.
+
+The same seed and start date always give the same data, so benchmarks and bug reports can
+be reproduced at any scale. Names, email domains, cities and tags follow skewed (Zipf)
+distributions like real address books do, and a small share of contacts is born on
+February 29. Contacts and notes are generated one at a time and can be written straight to
+a snapshot and a notebook file, so even 10 million contacts never sit in memory at once.
+
+Usage:
+    python -m contacts_assistant.datagen --contacts 1000000 --notes 100000 --seed 7
+
+Classes:
+    ZipfSampler: A class drawing items with a Zipf distribution.
+    DataGenerator: A class generating contacts and notes from a seed.
+"""
+
+import argparse
+import calendar
+import json
+import random
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate
+
+from contacts_assistant.address import AddressType
+from contacts_assistant.constants import (
+    CONTACTS_BOOK_FILENAME,
+    DATE_FORMAT,
+    NOTEBOOK_FILENAME,
+)
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.note import Note
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.record import Record
+from contacts_assistant.snapshot import SnapshotWriter
+
+FIRST_NAMES = [
+    "Olena", "Ivan", "Oksana", "Andrii", "Nataliia", "Serhii", "Iryna", "Oleksandr",
+    "Tetiana", "Dmytro", "Yuliia", "Mykola", "Kateryna", "Volodymyr", "Mariia", "Taras",
+    "Anna", "Bohdan", "Sofiia", "Yurii", "Halyna", "Petro", "Larysa", "Vasyl", "Liudmyla",
+    "Stepan", "Viktoriia", "Roman", "Khrystyna", "Maksym", "Daryna", "Artem", "Solomiia",
+    "Denys", "Zoriana", "Ostap", "Lesia", "Yaroslav", "Ulyana", "Markiian",
+]  # fmt: skip
+LAST_NAME_ROOTS = [
+    "Shevch", "Kovalen", "Bond", "Tkach", "Kravch", "Olin", "Moroz", "Lysen", "Marchen",
+    "Savch", "Rudn", "Pavl", "Melnych", "Boiko", "Hnat", "Kushn", "Ponomar", "Symon",
+    "Sydor", "Fedor", "Levch", "Vasyl", "Zinch", "Ostap", "Franch", "Hrytsen", "Karp",
+    "Lutsen", "Nazar", "Yarosh",
+]  # fmt: skip
+LAST_NAME_SUFFIXES = ["enko", "uk", "chuk", "yshyn", "ovych", "skyi", "iak", "ets"]
+EMAIL_DOMAINS = [
+    "gmail.com", "ukr.net", "i.ua", "outlook.com", "meta.ua", "yahoo.com",
+    "proton.me", "icloud.com", "bigmir.net", "company.com.ua",
+]  # fmt: skip
+CITIES = [
+    ("Kyiv", "01"), ("Lviv", "79"), ("Kharkiv", "61"), ("Odesa", "65"), ("Dnipro", "49"),
+    ("Zaporizhzhia", "69"), ("Vinnytsia", "21"), ("Poltava", "36"), ("Chernihiv", "14"),
+    ("Ivano-Frankivsk", "76"), ("Ternopil", "46"), ("Uzhhorod", "88"), ("Lutsk", "43"),
+    ("Rivne", "33"), ("Sumy", "40"), ("Cherkasy", "18"),
+]  # fmt: skip
+STREETS = [
+    "Khreshchatyk", "Shevchenka", "Franka", "Lesi Ukrainky", "Sadova", "Naberezhna",
+    "Tsentralna", "Soborna", "Hrushevskoho", "Zelena", "Shkilna", "Myru", "Vyshneva",
+    "Lisova", "Kyivska", "Lvivska",
+]  # fmt: skip
+COUNTRIES = ["Ukraine"] * 17 + ["Poland", "Germany", "Canada"]
+PHONE_CODES = ["050", "063", "066", "067", "068", "073", "093", "095", "096", "097"]
+TAG_WORDS = [
+    "work", "home", "urgent", "family", "birthday", "shopping", "travel", "health",
+    "finance", "ideas", "call", "meeting", "books", "car", "school", "garden", "sport",
+    "gifts", "recipes", "taxes",
+]  # fmt: skip
+NOTE_TOPICS = [
+    "Call", "Meet", "Invoice", "Plan", "Buy", "Review", "Visit", "Pay", "Remind",
+    "Book", "Send", "Fix",
+]  # fmt: skip
+WORDS = [
+    "about", "the", "invoice", "tomorrow", "project", "report", "contract", "gift",
+    "tickets", "dentist", "school", "meeting", "documents", "flowers", "dinner", "repair",
+    "before", "after", "weekend", "deadline", "bank", "insurance", "garage", "keys",
+    "photos", "present", "summary", "draft", "budget", "order",
+]  # fmt: skip
+LEAP_YEARS = [year for year in range(1940, 2013) if calendar.isleap(year)]
+RECURRENCES = ["weekly", "monthly", "yearly", "weekly;interval=2", "daily;interval=3"]
+
+
+class ZipfSampler:
+    """
+    A class drawing items with a Zipf distribution.
+
+    The item of rank r is drawn with a probability proportional to 1 / r ** exponent, so
+    the first items are far more common than the last ones.
+
+    Attributes:
+        items (list): The items, most common first.
+        cum_weights (list): The cumulative weights of the items.
+
+    Methods:
+        __call__(randomizer): Draws an item.
+    """
+
+    def __init__(self, items, exponent=1.0):
+        """
+        Initialize the sampler.
+
+        Args:
+            items (list): The items, most common first.
+            exponent (float, optional): The skew of the distribution.
+        """
+        self.items = list(items)
+        self.cum_weights = list(
+            accumulate(1 / rank**exponent for rank in range(1, len(self.items) + 1))
+        )
+
+    def __call__(self, randomizer):
+        """
+        Draw an item.
+
+        Args:
+            randomizer (random.Random): The source of randomness.
+
+        Returns:
+            object: The drawn item.
+        """
+        return self.items[
+            bisect(self.cum_weights, randomizer.random() * self.cum_weights[-1])
+        ]
+
+
+class DataGenerator:
+    """
+    A class generating contacts and notes from a seed.
+
+    Contacts and notes come from separate random streams, so the contacts of a seed do not
+    change with the number of notes and the other way round.
+
+    Attributes:
+        seed (int): The seed of the random streams.
+        today (date): The day due dates are spread around.
+        email_share (float): The share of contacts with an email.
+        birthday_share (float): The share of contacts with a birthday.
+        leap_day_share (float): The share of birthdays on February 29.
+        address_share (float): The share of contacts with at least one address.
+        due_share (float): The share of notes with a due date.
+        recurring_share (float): The share of notes with a due date that repeat.
+
+    Methods:
+        records(count): Yields contact records.
+        note_dicts(count): Yields notes as dictionaries in the notebook file format.
+        notes(count): Yields notes.
+        contacts_book(count): Returns a contacts book.
+        notebook(count): Returns a notebook.
+        write_contacts(filepath, count): Writes contacts to a snapshot file.
+        write_notes(filepath, count): Writes notes to a notebook file.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        today=None,
+        email_share=0.6,
+        birthday_share=0.7,
+        leap_day_share=0.002,
+        address_share=0.4,
+        due_share=0.5,
+        recurring_share=0.05,
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int, optional): The seed of the random streams.
+            today (date, optional): The day due dates are spread around, today by default.
+            email_share (float, optional): The share of contacts with an email.
+            birthday_share (float, optional): The share of contacts with a birthday.
+            leap_day_share (float, optional): The share of birthdays on February 29.
+            address_share (float, optional): The share of contacts with at least one address.
+            due_share (float, optional): The share of notes with a due date.
+            recurring_share (float, optional): The share of notes with a due date that repeat.
+        """
+        self.seed = seed
+        self.today = today or date.today()
+        self.email_share = email_share
+        self.birthday_share = birthday_share
+        self.leap_day_share = leap_day_share
+        self.address_share = address_share
+        self.due_share = due_share
+        self.recurring_share = recurring_share
+
+        self.first_names = ZipfSampler(FIRST_NAMES, 0.8)
+        self.last_names = ZipfSampler(
+            [
+                root + suffix
+                for suffix in LAST_NAME_SUFFIXES
+                for root in LAST_NAME_ROOTS
+            ],
+            0.7,
+        )
+        self.domains = ZipfSampler(EMAIL_DOMAINS, 1.2)
+        self.cities = ZipfSampler(CITIES, 1.1)
+        self.tags = ZipfSampler(
+            TAG_WORDS + [f"project-{index}" for index in range(1, 481)]
+        )
+
+    def _birthday(self, randomizer):
+        """Return a random date of birth in DD.MM.YYYY format."""
+        if randomizer.random() < self.leap_day_share:
+            return f"29.02.{randomizer.choice(LEAP_YEARS)}"
+        ordinal = randomizer.randint(
+            date(1940, 1, 1).toordinal(), date(2012, 12, 31).toordinal()
+        )
+        return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+    def records(self, count):
+        """
+        Yield contact records.
+
+        Repeated names get a number, e.g. "Olena Shevchenko 2", so names stay unique while
+        only one counter per distinct name is kept.
+
+        Args:
+            count (int): The number of records.
+
+        Yields:
+            Record: The records, with one to three phones and optional email, birthday
+                and addresses of every type.
+        """
+        randomizer = random.Random(f"{self.seed}:contacts")
+        name_counts = {}
+        for _ in range(count):
+            first_name = self.first_names(randomizer)
+            last_name = self.last_names(randomizer)
+            name = f"{first_name} {last_name}"
+            repeat = name_counts.get(name, 0) + 1
+            name_counts[name] = repeat
+            record = Record(name if repeat == 1 else f"{name} {repeat}")
+
+            phones = randomizer.choices((1, 2, 3), weights=(60, 30, 10))[0]
+            for _ in range(phones):
+                record.add_phone(
+                    randomizer.choice(PHONE_CODES)
+                    + f"{randomizer.randrange(10**7):07d}"
+                )
+            if randomizer.random() < self.email_share:
+                record.add_email(
+                    f"{first_name.lower()}.{last_name.lower()}"
+                    f"{repeat if repeat > 1 else ''}@{self.domains(randomizer)}"
+                )
+            if randomizer.random() < self.birthday_share:
+                record.add_birthday(self._birthday(randomizer))
+            if randomizer.random() < self.address_share:
+                for address_type, share in zip(AddressType, (0.9, 0.4, 0.15)):
+                    if randomizer.random() < share:
+                        city, postal_prefix = self.cities(randomizer)
+                        record.add_address(
+                            address_type,
+                            f"{randomizer.choice(STREETS)} {randomizer.randint(1, 120)}",
+                            city,
+                            f"{postal_prefix}{randomizer.randrange(1000):03d}",
+                            randomizer.choice(COUNTRIES),
+                        )
+            yield record
+
+    def note_dicts(self, count):
+        """
+        Yield notes as dictionaries in the notebook file format.
+
+        Args:
+            count (int): The number of notes.
+
+        Yields:
+            dict: The notes, with Zipf-distributed tags, creation dates over the last
+                three years and optional due dates from a month ago to a year ahead.
+        """
+        randomizer = random.Random(f"{self.seed}:notes")
+        for index in range(count):
+            topic = randomizer.choice(NOTE_TOPICS)
+            contact = f"{self.first_names(randomizer)} {self.last_names(randomizer)}"
+            words = randomizer.choices(WORDS, k=randomizer.randint(3, 30))
+            tags = {self.tags(randomizer) for _ in range(randomizer.randint(0, 3))}
+            created_at = self.today - timedelta(randomizer.randrange(3 * 365))
+            data = {
+                "title": f"{topic} {contact} #{index + 1}",
+                "content": f"{topic} {contact} {' '.join(words)}",
+                "tags": sorted(tags),
+                "due_date": None,
+                "created_at": created_at.strftime(DATE_FORMAT),
+            }
+            if randomizer.random() < self.due_share:
+                due_date = self.today + timedelta(randomizer.randint(-30, 365))
+                data["due_date"] = due_date.strftime(DATE_FORMAT)
+                if randomizer.random() < self.recurring_share:
+                    rule = randomizer.choice(RECURRENCES)
+                    frequency, _, interval = rule.partition(";interval=")
+                    data["recurrence"] = {
+                        "frequency": frequency,
+                        "interval": int(interval or 1),
+                        "until": None,
+                        "count": None,
+                    }
+            yield data
+
+    def notes(self, count):
+        """
+        Yield notes.
+
+        Args:
+            count (int): The number of notes.
+
+        Yields:
+            Note: The notes of note_dicts.
+        """
+        for data in self.note_dicts(count):
+            yield Note.from_dict(data)
+
+    def contacts_book(self, count):
+        """
+        Return a contacts book.
+
+        Args:
+            count (int): The number of contacts.
+
+        Returns:
+            ContactsBook: The book with the generated records.
+        """
+        book = ContactsBook()
+        for record in self.records(count):
+            book.add_record(record)
+        return book
+
+    def notebook(self, count):
+        """
+        Return a notebook.
+
+        Args:
+            count (int): The number of notes.
+
+        Returns:
+            Notebook: The notebook with the generated notes.
+        """
+        notebook = Notebook()
+        notebook.notes.extend(self.notes(count))
+        return notebook
+
+    def write_contacts(self, filepath, count):
+        """
+        Write contacts to a snapshot file one at a time.
+
+        Args:
+            filepath (str): The path of the snapshot file.
+            count (int): The number of contacts.
+        """
+        with SnapshotWriter(filepath) as writer:
+            for record in self.records(count):
+                writer.write(record)
+
+    def write_notes(self, filepath, count):
+        """
+        Write notes to a notebook file one at a time.
+
+        Args:
+            filepath (str): The path of the notebook file.
+            count (int): The number of notes.
+        """
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write('{"notes": [')
+            for index, data in enumerate(self.note_dicts(count)):
+                file.write(",\n" if index else "\n")
+                file.write(json.dumps(data, ensure_ascii=False))
+            file.write("\n]}\n")
+
+
+def main():
+    """
+    Generate a contacts snapshot and a notebook file from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate realistic contacts and notes from a seed"
+    )
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--today",
+        type=lambda value: DateHelper.parse_date(value).date(),
+        help="Day due dates are spread around, in DD.MM.YYYY format (default today)",
+    )
+    parser.add_argument("--contacts-file", default=CONTACTS_BOOK_FILENAME)
+    parser.add_argument("--notebook-file", default=NOTEBOOK_FILENAME)
+    args = parser.parse_args()
+
+    generator = DataGenerator(args.seed, args.today)
+    generator.write_contacts(args.contacts_file, args.contacts)
+    generator.write_notes(args.notebook_file, args.notes)
+    print(
+        f"Generated {args.contacts} contact(s) in {args.contacts_file} "
+        f"and {args.notes} note(s) in {args.notebook_file}."
+    )
+
+
+if __name__ == "__main__":
+    main()
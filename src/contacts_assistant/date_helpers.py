@@ -1,13 +1,91 @@
 """
 This module provides helper functions for date manipulation,
 including formatting workdays and calculating the next birthday.
+
+Next birthdays are read from a BirthdayCalendar, a table of the next occurrence of every
+(month, day) pair computed once per day, so repeated birthday queries cost a dictionary lookup.
+
+Classes:
+    BirthdayCalendar: A table of next birthdays and congratulation dates for one day.
+    DateHelper: A helper class for date-related operations.
 """
 
 from datetime import date as dt_date
-from datetime import timedelta
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 from contacts_assistant.constants import DATE_FORMAT
 
+# A leap year, so the calendar has an entry for every possible birthday
+CALENDAR_YEAR = 2000
+
+
+class BirthdayCalendar:
+    """
+    A table of next birthdays and congratulation dates for one day.
+
+    Attributes:
+        fromdate (date): The day the table was computed for.
+        next_birthdays (dict): The next occurrence on or after fromdate by (month, day).
+        congratulations (dict): The next occurrence moved from a weekend to the next Monday,
+            by (month, day).
+
+    Methods:
+        __init__(fromdate): Computes the table.
+        next_birthday(birthday): Returns the next occurrence of a birthday.
+        congratulation_date(birthday): Returns the congratulation date of a birthday.
+    """
+
+    __slots__ = ("fromdate", "next_birthdays", "congratulations")
+
+    def __init__(self, fromdate: dt_date):
+        """
+        Compute the next occurrence of all 366 (month, day) pairs.
+
+        A birthday on February 29 is celebrated on March 1 in common years.
+
+        Args:
+            fromdate (date): The first day an occurrence may fall on.
+        """
+        self.fromdate = fromdate
+        self.next_birthdays = {}
+        self.congratulations = {}
+        this_year = DateHelper.year_starts(fromdate.year)
+        next_year = DateHelper.year_starts(fromdate.year + 1)
+        day = dt_date(CALENDAR_YEAR, 1, 1)
+        for _ in range(366):
+            key = (day.month, day.day)
+            occurrence = this_year[day.month - 1] + timedelta(day.day - 1)
+            if occurrence < fromdate:
+                occurrence = next_year[day.month - 1] + timedelta(day.day - 1)
+            self.next_birthdays[key] = occurrence
+            self.congratulations[key] = DateHelper.get_workday(occurrence)
+            day += timedelta(1)
+
+    def next_birthday(self, birthday: dt_date):
+        """
+        Return the next occurrence of a birthday.
+
+        Args:
+            birthday (date): The date of birth.
+
+        Returns:
+            date: The next birthday on or after fromdate.
+        """
+        return self.next_birthdays[(birthday.month, birthday.day)]
+
+    def congratulation_date(self, birthday: dt_date):
+        """
+        Return the congratulation date of a birthday.
+
+        Args:
+            birthday (date): The date of birth.
+
+        Returns:
+            date: The next birthday, moved to the next Monday if it falls on a weekend.
+        """
+        return self.congratulations[(birthday.month, birthday.day)]
+
 
 class DateHelper:
     """
@@ -15,6 +93,22 @@ class DateHelper:
     """
 
     @staticmethod
+    def get_workday(date: dt_date):
+        """
+        Returns the given date, or the next Monday if the date falls on a weekend.
+
+        Args:
+            date (date): The date to be checked.
+
+        Returns:
+            date: The workday.
+        """
+        if date.weekday() >= 5:
+            return date + timedelta(7 - date.weekday())
+        return date
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
     def get_formated_workday(date: dt_date):
         """
         Returns the formatted workday for the given date.
@@ -26,15 +120,71 @@ class DateHelper:
         Returns:
             str: The formatted workday in standard format.
         """
-        if date.weekday() >= 5:
-            return (date + timedelta(7 - date.weekday())).strftime(DATE_FORMAT)
-        return date.strftime(DATE_FORMAT)
+        return DateHelper.get_workday(date).strftime(DATE_FORMAT)
+
+    @staticmethod
+    def parse_date(value: str) -> datetime:
+        """
+        Parses a date string in DATE_FORMAT.
+
+        Dates in the fixed DD.MM.YYYY layout are decoded by slicing, other strings fall
+        back to datetime.strptime, which is several times slower.
+
+        Args:
+            value (str): The date string.
+
+        Returns:
+            datetime: The parsed date at midnight.
+
+        Raises:
+            ValueError: If the string is not a valid date in DATE_FORMAT.
+        """
+        if (
+            len(value) == 10
+            and value[2] == "."
+            and value[5] == "."
+            and value[:2].isdigit()
+            and value[3:5].isdigit()
+            and value[6:].isdigit()
+        ):
+            return datetime(int(value[6:]), int(value[3:5]), int(value[:2]))
+        return datetime.strptime(value, DATE_FORMAT)
 
     @staticmethod
     def _is_leap(year):
         "year -> true if leap year, else false."
         return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
 
+    @staticmethod
+    def year_starts(year):
+        """
+        Returns the first day of every month of a year.
+
+        Args:
+            year (int): The year.
+
+        Returns:
+            list: Twelve dates, from January 1 to December 1.
+        """
+        return [dt_date(year, month, 1) for month in range(1, 13)]
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def calendar(fromdate: dt_date):
+        """
+        Returns the birthday calendar for a day.
+
+        Calendars are cached for the last few days asked for. A long-running session asks
+        for a new day after midnight, which builds a fresh calendar.
+
+        Args:
+            fromdate (date): The first day an occurrence may fall on.
+
+        Returns:
+            BirthdayCalendar: The calendar of fromdate.
+        """
+        return BirthdayCalendar(fromdate)
+
     @staticmethod
     def get_next_birthday(birthday: dt_date, fromdate: dt_date):
         """
@@ -47,17 +197,18 @@ class DateHelper:
         Returns:
             date: The next birthday date.
         """
-        if (
-            DateHelper._is_leap(birthday.year)
-            and not DateHelper._is_leap(fromdate.year)
-            and (birthday.day == 29)
-            and (birthday.month == 2)
-        ):
-            birthday_this_year = dt_date(fromdate.year, 3, 1)
-        else:
-            birthday_this_year = dt_date(fromdate.year, birthday.month, birthday.day)
-        if birthday_this_year < fromdate:
-            return DateHelper.get_next_birthday(
-                birthday, dt_date(fromdate.year + 1, 1, 1)
-            )
-        return birthday_this_year
+        return DateHelper.calendar(fromdate).next_birthday(birthday)
+
+    @staticmethod
+    def get_congratulation_date(birthday: dt_date, fromdate: dt_date):
+        """
+        Calculates the next congratulation date of a birthday from a given date.
+
+        Args:
+            birthday (date): The date of birth.
+            fromdate (date): The date from which to calculate the next birthday.
+
+        Returns:
+            date: The next birthday, moved to the next Monday if it falls on a weekend.
+        """
+        return DateHelper.calendar(fromdate).congratulation_date(birthday)
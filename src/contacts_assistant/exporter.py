@@ -0,0 +1,361 @@
+"""
+A module containing the Exporter class for streaming contacts and notes to files.
+
+Records and notes are converted to rows and written one at a time, so memory use
+does not depend on the size of the contacts book or the notebook.
+
+Classes:
+    ExportFilter: A class to represent a parsed filter expression.
+    Exporter: A class for exporting contacts and notes in CSV, vCard 4.0 and JSON Lines.
+"""
+
+import csv
+import json
+import os
+import re
+
+from contacts_assistant.address import AddressType
+from contacts_assistant.constants import DATE_FORMAT
+from contacts_assistant.field import field_value
+
+EXPORT_FORMATS = ("csv", "vcard", "jsonl")
+CONTACT_FIELDS = (
+    "name",
+    "phones",
+    "email",
+    "birthday",
+    "address_home",
+    "address_work",
+    "address_other",
+)
+NOTE_FIELDS = ("title", "content", "tags", "due_date", "recurrence", "created_at")
+LIST_SEPARATOR = "; "
+
+
+class ExportFilter:
+    """
+    A class to represent a parsed filter expression.
+
+    The expression is a list of conditions joined with "and". Each condition has the form
+    <field><operator><value>, where the operator is one of:
+        =   the field (or any item of a list field) equals the value
+        !=  the field (or every item of a list field) differs from the value
+        ~   the field (or any item of a list field) contains the value, case-insensitive
+
+    Example: "email~@gmail.com and birthday!="
+
+    Attributes:
+        conditions (list): A list of (field, operator, value) tuples.
+
+    Methods:
+        __init__(expression, fields): Parses the expression.
+        matches(row): Checks whether a row satisfies all conditions.
+    """
+
+    CONDITION_REGEX = re.compile(r"^\s*(\w+)\s*(!=|=|~)\s*(.*?)\s*$")
+
+    def __init__(self, expression, fields):
+        """
+        Parse a filter expression.
+
+        Args:
+            expression (str): The filter expression, may be empty or None.
+            fields (tuple): The field names the expression may refer to.
+
+        Raises:
+            ValueError: If a condition is malformed or refers to an unknown field.
+        """
+        self.conditions = []
+        if not expression:
+            return
+        for condition in re.split(r"\s+and\s+", expression.strip()):
+            match = self.CONDITION_REGEX.match(condition)
+            if not match:
+                raise ValueError(f"Invalid filter condition: '{condition}'")
+            field, operator, value = match.groups()
+            if field not in fields:
+                raise ValueError(
+                    f"Unknown filter field '{field}'. Available: {', '.join(fields)}"
+                )
+            self.conditions.append((field, operator, value))
+
+    def matches(self, row):
+        """
+        Check whether a row satisfies all conditions.
+
+        Args:
+            row (dict): The row produced from a record or a note.
+
+        Returns:
+            bool: True if every condition holds for the row.
+        """
+        for field, operator, value in self.conditions:
+            field_value = row[field]
+            items = field_value if isinstance(field_value, list) else [field_value]
+            items = [item or "" for item in items] or [""]
+            if operator == "=":
+                if value not in items:
+                    return False
+            elif operator == "!=":
+                if value in items:
+                    return False
+            elif not any(value.lower() in item.lower() for item in items):
+                return False
+        return True
+
+
+class Exporter:
+    """
+    A class for exporting contacts and notes in CSV, vCard 4.0 and JSON Lines.
+
+    Methods:
+        export_contacts(book, filepath, export_format, fields, expression): Export contacts to a file.
+        export_notes(notebook, filepath, export_format, fields, expression): Export notes to a file.
+        contact_to_row(record): Convert a record to a row.
+        note_to_row(note): Convert a note to a row.
+    """
+
+    @staticmethod
+    def contact_to_row(record):
+        """
+        Convert a record to a row.
+
+        Args:
+            record (Record): The record to convert.
+
+        Returns:
+            dict: The record fields, list fields are kept as lists.
+        """
+        row = {
+            "name": record.name.value,
+            "phones": [phone.value for phone in record.phones],
+            "email": record.email.value if record.email else None,
+            "birthday": str(record.birthday) if record.birthday else None,
+        }
+        for address_type in AddressType:
+            address = record.addresses.get(address_type)
+            row[f"address_{address_type.name.lower()}"] = (
+                str(address) if address else None
+            )
+        return row
+
+    @staticmethod
+    def note_to_row(note):
+        """
+        Convert a note to a row.
+
+        Args:
+            note (Note): The note to convert.
+
+        Returns:
+            dict: The note fields, list fields are kept as lists.
+        """
+        return {
+            "title": note.title,
+            "content": note.content,
+            "tags": list(note.tags),
+            "due_date": (
+                note.due_date.strftime(DATE_FORMAT) if note.due_date else None
+            ),
+            "recurrence": str(note.recurrence) if note.recurrence else None,
+            "created_at": note.created_at.strftime(DATE_FORMAT),
+        }
+
+    @staticmethod
+    def export_contacts(
+        book, filepath, export_format=None, fields=None, expression=None
+    ):
+        """
+        Export contacts to a file.
+
+        Args:
+            book (ContactsBook): The address book to export.
+            filepath (str): The path of the output file.
+            export_format (str, optional): One of EXPORT_FORMATS, guessed from the file extension if omitted.
+            fields (str, optional): Comma-separated field names, all fields if omitted.
+            expression (str, optional): A filter expression, see ExportFilter.
+
+        Returns:
+            int: The number of exported contacts.
+        """
+        rows = (
+            dict(Exporter.contact_to_row(record), _record=record)
+            for record in book.data.values()
+        )
+        return Exporter._export(
+            rows, filepath, export_format, fields, expression, CONTACT_FIELDS
+        )
+
+    @staticmethod
+    def export_notes(
+        notebook, filepath, export_format=None, fields=None, expression=None
+    ):
+        """
+        Export notes to a file.
+
+        Args:
+            notebook (Notebook): The notebook to export.
+            filepath (str): The path of the output file.
+            export_format (str, optional): "csv" or "jsonl", guessed from the file extension if omitted.
+            fields (str, optional): Comma-separated field names, all fields if omitted.
+            expression (str, optional): A filter expression, see ExportFilter.
+
+        Returns:
+            int: The number of exported notes.
+
+        Raises:
+            ValueError: If vCard format is requested.
+        """
+        if Exporter._resolve_format(filepath, export_format) == "vcard":
+            raise ValueError("vCard export is only available for contacts")
+        rows = (Exporter.note_to_row(note) for note in notebook.notes)
+        return Exporter._export(
+            rows, filepath, export_format, fields, expression, NOTE_FIELDS
+        )
+
+    @staticmethod
+    def _resolve_format(filepath, export_format):
+        """
+        Resolve the export format from the argument or the file extension.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if not export_format:
+            extension = filepath.rsplit(".", 1)[-1].lower() if "." in filepath else ""
+            export_format = {"vcf": "vcard", "json": "jsonl"}.get(extension, extension)
+            if export_format not in EXPORT_FORMATS:
+                export_format = "csv"
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+            )
+        return export_format
+
+    @staticmethod
+    def _resolve_fields(fields, available):
+        """
+        Parse a comma-separated field list.
+
+        Raises:
+            ValueError: If a field is unknown.
+        """
+        if not fields:
+            return list(available)
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in available]
+        if unknown:
+            raise ValueError(
+                f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+            )
+        return selected
+
+    @staticmethod
+    def _export(rows, filepath, export_format, fields, expression, available):
+        """
+        Filter rows and write them to a file one at a time.
+
+        The rows are written to a temporary file moved over the target at the end, so a
+        failed export leaves no partial file behind.
+
+        Returns:
+            int: The number of written rows.
+        """
+        export_format = Exporter._resolve_format(filepath, export_format)
+        selected = Exporter._resolve_fields(fields, available)
+        row_filter = ExportFilter(expression, available)
+        writer = {
+            "csv": Exporter._write_csv,
+            "vcard": Exporter._write_vcard,
+            "jsonl": Exporter._write_jsonl,
+        }[export_format]
+
+        temp_filepath = f"{filepath}.tmp"
+        try:
+            with open(temp_filepath, "w", encoding="utf-8", newline="") as file:
+                count = writer(
+                    file, (row for row in rows if row_filter.matches(row)), selected
+                )
+            os.replace(temp_filepath, filepath)
+        except BaseException:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+            raise
+        return count
+
+    @staticmethod
+    def _write_csv(file, rows, fields):
+        """Write rows as CSV with a header line, list fields are joined with LIST_SEPARATOR."""
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        count = 0
+        for row in rows:
+            writer.writerow(
+                [
+                    (
+                        LIST_SEPARATOR.join(row[field])
+                        if isinstance(row[field], list)
+                        else row[field] or ""
+                    )
+                    for field in fields
+                ]
+            )
+            count += 1
+        return count
+
+    @staticmethod
+    def _write_jsonl(file, rows, fields):
+        """Write rows as JSON Lines, one object per line."""
+        count = 0
+        for row in rows:
+            file.write(
+                json.dumps({field: row[field] for field in fields}, ensure_ascii=False)
+            )
+            file.write("\n")
+            count += 1
+        return count
+
+    @staticmethod
+    def _write_vcard(file, rows, fields):
+        """Write contact rows as vCard 4.0 entries, FN is always present."""
+        count = 0
+        for row in rows:
+            lines = ["BEGIN:VCARD", "VERSION:4.0", f"FN:{_escape_vcard(row['name'])}"]
+            if "phones" in fields:
+                lines += [
+                    f"TEL;TYPE=voice;VALUE=text:{phone}" for phone in row["phones"]
+                ]
+            if "email" in fields and row["email"]:
+                lines.append(f"EMAIL:{_escape_vcard(row['email'])}")
+            if "birthday" in fields and row["birthday"]:
+                day, month, year = row["birthday"].split(".")
+                lines.append(f"BDAY:{year}{month}{day}")
+            for address_type, address in row["_record"].addresses.items():
+                if f"address_{address_type.name.lower()}" not in fields:
+                    continue
+                parts = [
+                    _escape_vcard(field_value(part)) if part else ""
+                    for part in (
+                        address.street,
+                        address.city,
+                        address.postal_code,
+                        address.country,
+                    )
+                ]
+                lines.append(
+                    f"ADR;TYPE={address_type.name.lower()}:;;{parts[0]};{parts[1]};;{parts[2]};{parts[3]}"
+                )
+            lines.append("END:VCARD")
+            file.write("\r\n".join(lines) + "\r\n")
+            count += 1
+        return count
+
+
+def _escape_vcard(value):
+    """Escape a text value according to RFC 6350."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace(";", "\\;")
+        .replace("\n", "\\n")
+    )
@@ -3,10 +3,15 @@ A module containing the Field class, a base class to represent a generic field.
 
 Classes:
     Field: A base class to represent a generic field.
+
+Functions:
+    field_value(field): Returns the value of a field, a plain string or None.
 """
 
+from contacts_assistant.slotted import Slotted
+
 
-class Field:
+class Field(Slotted):
     """
     A base class to represent a generic field.
 
@@ -20,6 +25,8 @@ class Field:
         __str__(): Returns a string representation of the field.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """
         Initializes the Field instance with the given value.
@@ -37,3 +44,21 @@ class Field:
             str: The string representation of the field's value.
         """
         return str(self.value)
+
+
+def field_value(field):
+    """
+    Returns the value of a field, a plain string or None.
+
+    Address parts edited by older versions were stored as plain strings instead of
+    fields, and may still be found in pickled contacts books.
+
+    Args:
+        field (Field or str): The field, a plain string or None.
+
+    Returns:
+        str: The value, or None if the field is empty.
+    """
+    if not field:
+        return None
+    return field.value if isinstance(field, Field) else field
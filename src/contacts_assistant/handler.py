@@ -7,21 +7,45 @@ Classes:
     Handler: A class for handling user commands and managing contacts and notes.
 """
 
+import calendar
+import time
+from datetime import date, timedelta
+
 from contacts_assistant.address import AddressType
+from contacts_assistant.agenda import Agenda
+from contacts_assistant.birthday_engine import BirthdayEngine
 from contacts_assistant.command_completer import CommandCompleter
+from contacts_assistant.date_helpers import DateHelper
 from contacts_assistant.constants import (
+    DATE_FORMAT,
     GREETING_BANNER,
     CONTACTS_BOOK_FILENAME,
+    LEGACY_CONTACTS_BOOK_FILENAME,
     NOTEBOOK_FILENAME,
+    NOTEBOOK_PARTITIONS_DIRNAME,
+    QUERY_CACHE_SIZE,
 )
 from contacts_assistant.menu import Menu
+from contacts_assistant.mentions import MentionIndex
 from contacts_assistant.utils import format_greeting
 from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.columnar_contacts_book import ColumnarContactsBook
+from contacts_assistant.lazy_contacts_book import LazyContactsBook
 from contacts_assistant.record import Record
 from contacts_assistant.notebook import Notebook
+from contacts_assistant.partitioned_notebook import PartitionedNotebook
 from contacts_assistant.note import Note
+from contacts_assistant.parallel_search import ParallelScanner
+from contacts_assistant.suffix_index import SubstringIndex
+from contacts_assistant.exporter import Exporter
+from contacts_assistant.profiling import Profiler
+from contacts_assistant.query_cache import QueryCache
 
 NOT_FOUND_MESSAGE = "Contact does not exist, you can add it"
+RECURRENCE_PROMPT = (
+    "Enter recurrence (daily, weekly, monthly or yearly, optional, "
+    "e.g. weekly;interval=2;until=31.12.2025): "
+)
 
 
 def handle_error(func):
@@ -42,6 +66,43 @@ def handle_error(func):
     return inner
 
 
+def edits_contacts(func):
+    """
+    Decorator running a handler method under the write lock of the contacts book.
+
+    Finding a record and editing it in place becomes one atomic step, so other threads
+    never see a half-edited record and an add-or-update never races another add.
+    Args:
+        func (function): The handler method to wrap.
+    Returns:
+        function: The wrapped method.
+    """
+
+    def inner(self, *args, **kwargs):
+        with self.contact_book.lock.write():
+            return func(self, *args, **kwargs)
+
+    return inner
+
+
+def reads_stores(func):
+    """
+    Decorator running a handler method under read locks of the contacts book and notebook.
+
+    The contacts book is always locked before the notebook.
+    Args:
+        func (function): The handler method to wrap.
+    Returns:
+        function: The wrapped method.
+    """
+
+    def inner(self, *args, **kwargs):
+        with self.contact_book.lock.read(), self.notebook.lock.read():
+            return func(self, *args, **kwargs)
+
+    return inner
+
+
 class Handler:
     """
     A class for handling user commands and managing contacts and notes.
@@ -49,6 +110,11 @@ class Handler:
     Attributes:
         contact_book (ContactsBook): The ContactsBook instance.
         notebook (Notebook): The Notebook instance.
+        notebook_path (str): The file or directory the notebook is saved to.
+        scheduler (ReminderScheduler): The reminder scheduler, or None.
+        metrics (Metrics): The command latency histograms, or None when not measured.
+        profiler (Profiler): The profiler started and stopped by the profile command.
+        query_cache (QueryCache): The rendered results of the read commands.
         completer (CommandCompleter): The CommandCompleter instance for command auto-completion.
 
     Methods:
@@ -60,7 +126,9 @@ class Handler:
         delete_contact(args): Remove a contact from the address book.
         set_contact_birthday(args): Add a birthday to a contact.
         get_contact_birthday(args): Show the birthday of a contact.
+        show_all_contacts(): Show all contacts.
         get_upcoming_birthdays(args): Show all birthdays this week.
+        get_birthday_stats(args): Show birthday statistics.
         update_contact_email(args): Update contact email.
         add_address(args): Add or update an address of a contact.
         remove_address(args): Remove an address from a contact.
@@ -75,25 +143,101 @@ class Handler:
         update_note_prompt(args): Update a note by title in the notebook via user prompt.
         search_notes(args): Search for notes containing the query in their title or content.
         filter_notes(args): Filter notes by tag.
+        get_notes_mentioning(args): Show the notes mentioning a contact.
+        get_mentioned_contacts(args): Show the contacts mentioned in a note.
         get_notes_in_days(args): Get notes that are due in the next specified number of days.
         print_all_notes(args): Print all notes in the notebook.
+        get_agenda(args): Show birthdays and note due dates of a date window.
+        export_contacts(args): Export contacts to a file.
+        export_notes(args): Export notes to a file.
+        schedule_birthday(record): Update the birthday reminder of a contact.
+        show_stats(): Show latency percentiles of the commands run so far.
+        show_cache_stats(): Show the hit rate of the query cache.
+        profile(args): Start or stop profiling.
         close(): Save data to files and return a goodbye message.
         __compliance_list(): Get a dictionary of commands and their corresponding functions.
         __without_params_commands(): Get a dictionary of commands without parameters and their corresponding functions.
         execute(command, args): Execute the function corresponding to the command.
+        __dispatch(command, args): Call the function corresponding to the command.
+        __cached(key, compute, *stores): Get a query result from the cache or compute it.
+        __cached_contacts(key, render): Get a contacts query result from the cache or
+            render it from a snapshot.
     """
 
-    def __init__(self) -> None:
-        self.contact_book = ContactsBook.load_from_file(CONTACTS_BOOK_FILENAME)
-        self.notebook = Notebook.load_from_file(NOTEBOOK_FILENAME)
+    def __init__(
+        self,
+        lazy_contacts=False,
+        partitioned_notes=False,
+        columnar_contacts=False,
+        scheduler=None,
+        metrics=None,
+        profiler=None,
+        cache_size=QUERY_CACHE_SIZE,
+        search_workers=None,
+        substring_index=False,
+    ) -> None:
+        """
+        Load the contacts book and the notebook.
 
-        if not self.contact_book:
+        Args:
+            lazy_contacts (bool, optional): Map the contacts snapshot and decode records on access.
+            partitioned_notes (bool, optional): Store notes in monthly partitions loaded on demand.
+            columnar_contacts (bool, optional): Keep contacts in columns for fast scans of large books.
+            scheduler (ReminderScheduler, optional): The scheduler to keep up to date with
+                birthdays and note due dates.
+            metrics (Metrics, optional): The histograms to record command latencies in.
+            profiler (Profiler, optional): The profiler of the session, a profiler writing
+                to PROFILE_FILENAME by default.
+            cache_size (int, optional): The number of query results cached, 0 to disable
+                the cache.
+            search_workers (int, optional): The number of processes searching notebooks
+                of PARALLEL_SEARCH_THRESHOLD notes or more, by default notes are searched
+                in the calling thread.
+            substring_index (bool, optional): Answer note searches from a suffix array of
+                the note text.
+        """
+        if lazy_contacts:
+            self.contact_book = LazyContactsBook.open(
+                CONTACTS_BOOK_FILENAME, LEGACY_CONTACTS_BOOK_FILENAME
+            )
+        elif columnar_contacts:
+            self.contact_book = ColumnarContactsBook.load_from_file(
+                CONTACTS_BOOK_FILENAME, LEGACY_CONTACTS_BOOK_FILENAME
+            )
+        else:
+            self.contact_book = ContactsBook.load_from_file(
+                CONTACTS_BOOK_FILENAME, LEGACY_CONTACTS_BOOK_FILENAME
+            )
+        if partitioned_notes:
+            self.notebook_path = NOTEBOOK_PARTITIONS_DIRNAME
+            self.notebook = PartitionedNotebook.open(
+                NOTEBOOK_PARTITIONS_DIRNAME, NOTEBOOK_FILENAME
+            )
+        else:
+            self.notebook_path = NOTEBOOK_FILENAME
+            self.notebook = Notebook.load_from_file(NOTEBOOK_FILENAME)
+        if search_workers:
+            self.notebook.scanner = ParallelScanner(search_workers)
+        if substring_index:
+            self.notebook.substring_index = SubstringIndex()
+
+        if self.contact_book is None:
             self.contact_book = ContactsBook()
+        self.notebook.mention_index = MentionIndex(self.contact_book, self.notebook)
 
         self.completer = CommandCompleter(
             Menu.get_commands_witn_args(), self.contact_book
         )
 
+        self.metrics = metrics
+        self.profiler = profiler or Profiler()
+        self.query_cache = QueryCache(cache_size)
+        self.scheduler = scheduler
+        if scheduler:
+            scheduler.load(self.contact_book, self.notebook)
+            # Notes are rescheduled and cancelled by the notebook as they change
+            self.notebook.reminders = scheduler
+
     def greeting(self) -> str:
         """Print greeting message"""
         res = f"{format_greeting(GREETING_BANNER)}\n"
@@ -105,6 +249,7 @@ class Handler:
         return f"How can I help you? \n{Menu.pretty_print()}"
 
     @handle_error
+    @edits_contacts
     def add_contact(self, args):
         """
         Add a contact to the address book or update an existing contact.
@@ -122,22 +267,27 @@ class Handler:
         email = args.email
         birthday = args.birthday
 
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         message = "Contact updated."
         if record is None:
-            record = Record(name)
-            self.contact_book.add_record(record)
+            self.contact_book.add_record(Record(name))
+            # Books may store a copy of the record, so edit the stored one
+            record = self.contact_book.find_for_update(name)
             message = "Contact added."
+        # The stored record is edited in place, so cached results showing it are dropped
+        self.contact_book.touch()
         if phone:
             record.add_phone(phone)
         if email:
             record.add_email(email)
         if birthday:
             record.add_birthday(birthday)
+            self.schedule_birthday(record)
 
         return message
 
     @handle_error
+    @edits_contacts
     def update_phone(self, args):
         """
         Change the phone number of an existing contact.
@@ -153,13 +303,15 @@ class Handler:
         old_phone = args.oldphone
         new_phone = args.newphone
 
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         if record is None:
             return NOT_FOUND_MESSAGE
+        self.contact_book.touch()
         record.edit_phone(old_phone, new_phone)
         return "Phone changed"
 
     @handle_error
+    @edits_contacts
     def delete_contact(self, args):
         """
         Removes an contact from address book.
@@ -174,9 +326,12 @@ class Handler:
         name = args.name
         if self.contact_book.delete(name) is None:
             return f"Contact with name {name} does not exist."
+        if self.scheduler:
+            self.scheduler.cancel_birthday(name)
         return "Contact removed."
 
     @handle_error
+    @edits_contacts
     def set_contact_birthday(self, args):
         """
         Add a birthday to a contact.
@@ -190,9 +345,11 @@ class Handler:
         """
         name = args.name
         birthday = args.birthday
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         if record:
+            self.contact_book.touch()
             record.add_birthday(birthday)
+            self.schedule_birthday(record)
             return "Birthday added."
         return NOT_FOUND_MESSAGE
 
@@ -219,6 +376,16 @@ class Handler:
         else:
             return NOT_FOUND_MESSAGE
 
+    @handle_error
+    def show_all_contacts(self):
+        """
+        Show all contacts.
+
+        Returns:
+            str: The contacts as a table.
+        """
+        return self.__cached_contacts(("show_all_contacts",), str)
+
     @handle_error
     def get_upcoming_birthdays(self, args):
         """
@@ -231,12 +398,63 @@ class Handler:
             list: All upcoming birthdays.
         """
         days = args.days
-        if days:
-            return str(self.contact_book.get_upcoming_birthdays(int(days)))
-        else:
-            return str(self.contact_book.get_upcoming_birthdays())
+
+        def render():
+            if days:
+                return str(self.contact_book.get_upcoming_birthdays(int(days)))
+            else:
+                return str(self.contact_book.get_upcoming_birthdays())
+
+        # The result depends on today's date as well as on the contacts
+        return self.__cached(
+            ("upcoming_birthdays", days, date.today()), render, self.contact_book
+        )
 
     @handle_error
+    @reads_stores
+    def get_birthday_stats(self, args):
+        """
+        Show birthdays per month, birthdays per weekday this year and the age distribution.
+
+        Args:
+            args (Namespace): Namespace containing the optional report name.
+
+        Returns:
+            str: The requested reports.
+        """
+        _, ordinals = self.contact_book.birthday_column()
+        today = date.today()
+        reports = []
+        if args.report in (None, "month"):
+            counts = BirthdayEngine.per_month(ordinals)
+            reports.append(
+                "Birthdays per month:\n"
+                + "\n".join(
+                    f"  {calendar.month_name[month]:<10} {count}"
+                    for month, count in enumerate(counts, start=1)
+                )
+            )
+        if args.report in (None, "weekday"):
+            counts = BirthdayEngine.per_weekday(ordinals, today.year)
+            reports.append(
+                f"Birthdays per weekday in {today.year}:\n"
+                + "\n".join(
+                    f"  {calendar.day_name[weekday]:<10} {count}"
+                    for weekday, count in enumerate(counts)
+                )
+            )
+        if args.report in (None, "age"):
+            counts = BirthdayEngine.age_distribution(ordinals, today)
+            reports.append(
+                "Age distribution:\n"
+                + "\n".join(
+                    f"  {age:>3}-{age + 9:<6} {count}" for age, count in counts.items()
+                )
+            )
+        return "\n\n".join(reports)
+
+    @handle_error
+    @edits_contacts
     def update_contact_email(self, args) -> str:
         """
         Update contact e-mail
@@ -249,14 +467,16 @@ class Handler:
         """
         name = args.name
         email = args.email
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         if record is None:
             return NOT_FOUND_MESSAGE
         else:
+            self.contact_book.touch()
             record.add_email(email)
             return "Email changed"
 
     @handle_error
+    @edits_contacts
     def add_address(self, args):
         """
         add or update address of contact.
@@ -277,9 +497,10 @@ class Handler:
         city = args.city
         postalcode = args.postalcode
         country = args.country
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         if record is None:
             return NOT_FOUND_MESSAGE
+        self.contact_book.touch()
         if address_type in record.addresses:
             record.edit_address(address_type, street, city, postalcode, country)
             return "Address updated."
@@ -289,6 +510,7 @@ class Handler:
         return "Address added."
 
     @handle_error
+    @edits_contacts
     def remove_address(self, args):
         """
         Removes an contact address from contact.
@@ -305,16 +527,18 @@ class Handler:
 
         address_type = AddressType(address_type)
 
-        record = self.contact_book.find_by_name(name)
+        record = self.contact_book.find_for_update(name)
         if record is None:
             return NOT_FOUND_MESSAGE
         if address_type in record.addresses:
+            self.contact_book.touch()
             record.remove_address(address_type)
             return "Address removed."
 
         return "Address not found."
 
     @handle_error
+    @reads_stores
     def get_contact(self, args, search_by: str):
         """
         Show the phone number of a contact.
@@ -391,11 +615,13 @@ class Handler:
         tags = input("Enter tags (comma-separated): ").split(",")
         due_date = input("Enter due date (DD.MM.YYYY, optional): ").strip()
         due_date = due_date if due_date else None
+        recurrence = input(RECURRENCE_PROMPT).strip()
         note = Note(
             title=title,
             content=content,
             tags=[tag.strip() for tag in tags],
             due_date=due_date,
+            recurrence=recurrence or None,
         )
         return self.notebook.add(note)
 
@@ -455,11 +681,13 @@ class Handler:
         tags = input("Enter new tags (comma-separated): ").split(",")
         due_date = input("Enter new due date (DD.MM.YYYY, optional): ").strip()
         due_date = due_date if due_date else None
+        recurrence = input(RECURRENCE_PROMPT).strip()
         new_note = Note(
             title=title,
             content=content,
             tags=[tag.strip() for tag in tags],
             due_date=due_date,
+            recurrence=recurrence or None,
         )
         return self.notebook.update(title, new_note)
 
@@ -467,6 +695,9 @@ class Handler:
     def search_notes(self, args):
         """
         Search for notes containing the query in their title or content.
+
+        The query may scope terms to the title, content, tags or creation dates and
+        contain regular expressions, see the note_query module.
         Args:
             args (Namespace): Namespace containing the search query.
         Returns:
@@ -474,11 +705,15 @@ class Handler:
         """
 
         query = args.query
-        results = self.notebook.search(query)
-        if results:
-            return self.notebook.format_notes_with_frame(results)
-        else:
-            return f"No notes found containing '{query}'."
+
+        def render():
+            results = self.notebook.query(query)
+            if results:
+                return self.notebook.format_notes_with_frame(results)
+            else:
+                return f"No notes found containing '{query}'."
+
+        return self.__cached(("search_notes", query), render, self.notebook)
 
     @handle_error
     def filter_notes(self, args):
@@ -491,11 +726,55 @@ class Handler:
         """
 
         tag = args.tag
-        results = self.notebook.filter_by_tag(tag)
-        if results:
-            return self.notebook.format_notes_with_frame(results)
-        else:
-            return f"No notes found with tag '{tag}'."
+
+        def render():
+            results = self.notebook.filter_by_tag(tag)
+            if results:
+                return self.notebook.format_notes_with_frame(results)
+            else:
+                return f"No notes found with tag '{tag}'."
+
+        return self.__cached(("filter_notes", tag), render, self.notebook)
+
+    @handle_error
+    @reads_stores
+    def get_notes_mentioning(self, args):
+        """
+        Show the notes mentioning a contact by name or phone.
+        Args:
+            args (Namespace): Namespace containing the name of the contact.
+        Returns:
+            str: The notes or a message indicating no note mentions the contact.
+        """
+        name = args.name
+        if self.contact_book.find_by_name(name) is None:
+            return NOT_FOUND_MESSAGE
+        notes = self.notebook.mention_index.notes_mentioning(name)
+        if notes:
+            return self.notebook.format_notes_with_frame(notes)
+        return f"No notes mention {name}."
+
+    @handle_error
+    @reads_stores
+    def get_mentioned_contacts(self, args):
+        """
+        Show the contacts mentioned in a note.
+        Args:
+            args (Namespace): Namespace containing the title of the note.
+        Returns:
+            str: The contacts or a message indicating the note mentions no contact.
+        """
+        title = args.title
+        notes = self.notebook.search(title)
+        if not notes:
+            return f"Note {title} not found."
+        names = {}
+        for note in notes:
+            for name in self.notebook.mention_index.contacts_mentioned_in(note):
+                names[name] = None
+        if not names:
+            return f"Note {title} mentions no contacts."
+        return "\n".join(str(self.contact_book.find_by_name(name)) for name in names)
 
     @handle_error
     def get_notes_in_days(self, args):
@@ -521,12 +800,134 @@ class Handler:
         Returns:
             str: String representation of all notes.
         """
-        return self.notebook.print_all_notes()
+        return self.__cached(
+            ("show_all_notes",), self.notebook.print_all_notes, self.notebook
+        )
+
+    @handle_error
+    @reads_stores
+    def get_agenda(self, args):
+        """
+        Show birthdays and note due dates of a date window in date order.
+
+        Args:
+            args (Namespace): Namespace containing the window start, end or length in days,
+                and the maximum number of events.
+
+        Returns:
+            str: One line per event or a message indicating the window is empty.
+        """
+        start = DateHelper.parse_date(args.start).date() if args.start else date.today()
+        if args.end:
+            end = DateHelper.parse_date(args.end).date()
+        else:
+            end = start + timedelta(int(args.days or 7) - 1)
+        limit = int(args.limit) if args.limit else None
+
+        lines = [
+            Agenda.format_item(item)
+            for item in Agenda.items(
+                self.contact_book, self.notebook, start, end, limit
+            )
+        ]
+        if not lines:
+            return f"Nothing planned from {start.strftime(DATE_FORMAT)} to {end.strftime(DATE_FORMAT)}."
+        return "\n".join(lines)
+
+    @handle_error
+    def export_contacts(self, args):
+        """
+        Export contacts to a file.
+        Args:
+            args (Namespace): Namespace containing the file path, format, fields and filter.
+        Returns:
+            str: Message with the number of exported contacts.
+        """
+
+        book = self.contact_book
+        if book.cheap_snapshots:
+            # Exported from a snapshot, so writers are not blocked meanwhile
+            count = Exporter.export_contacts(
+                book.snapshot(), args.file, args.format, args.fields, args.filter
+            )
+        else:
+            with book.lock.read():
+                count = Exporter.export_contacts(
+                    book, args.file, args.format, args.fields, args.filter
+                )
+        return f"Exported {count} contact(s) to {args.file}."
+
+    @handle_error
+    @reads_stores
+    def export_notes(self, args):
+        """
+        Export notes to a file.
+        Args:
+            args (Namespace): Namespace containing the file path, format, fields and filter.
+        Returns:
+            str: Message with the number of exported notes.
+        """
+
+        count = Exporter.export_notes(
+            self.notebook, args.file, args.format, args.fields, args.filter
+        )
+        return f"Exported {count} note(s) to {args.file}."
+
+    def schedule_birthday(self, record):
+        """
+        Update the birthday reminder of a contact if reminders are enabled.
+
+        Args:
+            record (Record): The contact record.
+        """
+        if self.scheduler:
+            self.scheduler.schedule_birthday(
+                record.name.value, record.birthday.value if record.birthday else None
+            )
+
+    def show_stats(self) -> str:
+        """
+        Show latency percentiles of the commands run so far.
+
+        Returns:
+            str: A table of the parse, dispatch, render and save times of each command.
+        """
+        if self.metrics is None:
+            return "Latency metrics are off. Start the assistant with --metrics."
+        return self.metrics.report()
+
+    def show_cache_stats(self) -> str:
+        """
+        Show the hit rate of the query cache.
+
+        Returns:
+            str: The hits, misses, hit rate and size of the cache.
+        """
+        return self.query_cache.report()
+
+    def profile(self, args):
+        """
+        Start or stop profiling.
+
+        Args:
+            args (Namespace): Namespace containing the action, "start" or "stop".
+        Returns:
+            str: A confirmation, or the profile summary when profiling stops.
+        """
+        if args.action == "start":
+            self.profiler.start()
+            return "Profiling started, run the commands to measure and then 'profile stop'."
+        return self.profiler.stop()
 
     def close(self) -> str:
         """return bye message and save data to files"""
-        self.notebook.save_to_file(NOTEBOOK_FILENAME)
+        if self.scheduler:
+            self.scheduler.stop()
+        start = time.perf_counter()
+        self.notebook.save_to_file(self.notebook_path)
         self.contact_book.save_to_file(CONTACTS_BOOK_FILENAME)
+        if self.metrics is not None:
+            self.metrics.record("exit", "save", time.perf_counter() - start)
 
         return "Good bye!"
 
@@ -542,6 +943,7 @@ class Handler:
             Menu.FIND_CONTACT_BY_PHONE: self.get_contact_by_phone,
             Menu.FIND_CONTACT_BY_EMAIL: self.get_contact_by_email,
             Menu.UPCOMING_BIRTHDAYS: self.get_upcoming_birthdays,
+            Menu.BIRTHDAY_STATS: self.get_birthday_stats,
             Menu.UPDATE_EMAIL: self.update_contact_email,
             Menu.ADD_ADDRESS: self.add_address,
             Menu.REMOVE_ADDRESS: self.remove_address,
@@ -550,17 +952,25 @@ class Handler:
             Menu.UPDATE_NOTE: self.update_note_prompt,
             Menu.SEARCH_NOTES: self.search_notes,
             Menu.FILTER_NOTES_BY_TAG: self.filter_notes,
+            Menu.NOTES_MENTIONING: self.get_notes_mentioning,
+            Menu.MENTIONED_CONTACTS: self.get_mentioned_contacts,
             Menu.NOTES_DUE_IN_DAYS: self.get_notes_in_days,
+            Menu.AGENDA: self.get_agenda,
+            Menu.EXPORT_CONTACTS: self.export_contacts,
+            Menu.EXPORT_NOTES: self.export_notes,
+            Menu.PROFILE: self.profile,
         }
 
     def __without_params_commands(self) -> dict:
         """Return fuction list"""
         return {
             Menu.SHOW_COMMANDS: self.hello,
-            Menu.SHOW_ALL_CONTACTS: self.contact_book.__str__,
+            Menu.SHOW_ALL_CONTACTS: self.show_all_contacts,
             Menu.ADD_NOTE: self.add_note,
             Menu.SHOW_ALL_NOTES: self.print_all_notes,
             Menu.DELETE_ALL_NOTES: self.delete_all_notes,
+            Menu.STATS: self.show_stats,
+            Menu.CACHE_STATS: self.show_cache_stats,
             Menu.EXIT: self.close,
             Menu.CLOSE: self.close,
         }
@@ -570,6 +980,9 @@ class Handler:
         """
         Execute the function corresponding the command.
 
+        The time spent in the function is recorded as the dispatch phase of the command
+        when metrics are on.
+
         Args:
             command (Menu): Input command.
             args (Namespace): Namespace of the input params.
@@ -583,7 +996,69 @@ class Handler:
         if len(command.value.param_list) != 0 and args is None:
             return ""
 
+        if self.metrics is None:
+            return self.__dispatch(command, args)
+
+        start = time.perf_counter()
+        try:
+            return self.__dispatch(command, args)
+        finally:
+            self.metrics.record(
+                command.name.lower(), "dispatch", time.perf_counter() - start
+            )
+
+    def __dispatch(self, command, args) -> str:
+        """Call the function corresponding the command"""
         if command in self.__without_params_commands():
             return self.__without_params_commands().get(command)()
 
         return self.__compliance_list().get(command)(args)
+
+    def __cached(self, key, compute, *stores):
+        """
+        Get a query result from the cache or compute it.
+
+        Args:
+            key (tuple): The query name and arguments.
+            compute (callable): The function computing the result.
+            *stores: The contacts book or notebook the query reads, their generations are
+                added to the key.
+
+        Returns:
+            str: The result.
+        """
+        locked = []
+        try:
+            # The key and the result are read under the same locks, so they match
+            for store in stores:
+                store.lock.acquire_read()
+                locked.append(store)
+            key += tuple(store.generation for store in stores)
+            return self.query_cache.get_or_compute(key, compute)
+        finally:
+            for store in reversed(locked):
+                store.lock.release_read()
+
+    def __cached_contacts(self, key, render):
+        """
+        Get a contacts query result from the cache or render it from a snapshot.
+
+        The cache is looked up by the generation of the book first, a snapshot is only
+        taken on a miss. Books without cheap snapshots are rendered under the read lock.
+
+        Args:
+            key (tuple): The query name and arguments.
+            render (callable): The function rendering the result from a contacts book.
+
+        Returns:
+            str: The result.
+        """
+        book = self.contact_book
+        if not book.cheap_snapshots:
+            return self.__cached(key, lambda: render(book), book)
+        with book.lock.read():
+            key += (book.generation,)
+
+        # Rendered from a snapshot, so writers are not blocked meanwhile. A snapshot
+        # newer than the key only caches a newer result under a generation never seen again
+        return self.query_cache.get_or_compute(key, lambda: render(book.snapshot()))
@@ -0,0 +1,132 @@
+"""
+A module containing a streaming reader for large JSON arrays.
+
+The reader decodes the items of an array one at a time from a text file, keeping only a
+small window of the raw document in memory.
+
+Classes:
+    JsonArrayStream: A class for iterating over the items of a JSON array in a file.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+
+
+class JsonArrayStream:
+    """
+    A class for iterating over the items of a JSON array in a file.
+
+    The array is either the root of the document or the value of a key of the root object,
+    e.g. {"notes": [...]}. Other keys of the root object are decoded and skipped.
+
+    Methods:
+        __init__(file, key): Initializes the stream.
+        __iter__(): Yields the decoded array items.
+    """
+
+    def __init__(self, file, key=None):
+        """
+        Initialize the stream.
+
+        Args:
+            file (TextIO): The file opened in text mode.
+            key (str, optional): The root object key holding the array.
+        """
+        self.file = file
+        self.key = key
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _fill(self, size=CHUNK_SIZE):
+        """Read more data, dropping the consumed part of the buffer."""
+        if self.eof:
+            return False
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, characters):
+        """Consume the next character, which must be one of the given characters."""
+        character = self._peek()
+        if character not in characters:
+            raise ValueError(
+                f"Expected one of '{characters}' at position {self.position}, got '{character}'"
+            )
+        self.position += 1
+        return character
+
+    def _value(self):
+        """Decode the next JSON value, reading more data while it is incomplete."""
+        self._peek()
+        size = CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number may continue in the next chunk, read on before accepting it.
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def _items(self):
+        """Yield the items of the array starting at the current position."""
+        self._expect("[")
+        if self._peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def __iter__(self):
+        """
+        Yield the decoded array items.
+
+        Yields:
+            object: The decoded items in document order.
+
+        Raises:
+            ValueError: If the document is not an array or an object holding one under the key.
+        """
+        if self._peek() == "[":
+            yield from self._items()
+            return
+
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self.key and self._peek() == "[":
+                yield from self._items()
+            else:
+                self._value()
+            if self._expect(",}") == "}":
+                return
@@ -0,0 +1,342 @@
+"""
+A module containing a read-mostly contacts book backed by a memory-mapped snapshot.
+
+The snapshot file is mapped with mmap and records are decoded only when they are
+accessed, so opening the book and answering a single lookup costs the same regardless
+of the number of contacts.
+
+Classes:
+    SnapshotStrings: A class for reading single strings from the snapshot string table.
+    SnapshotRecordMap: A mapping of names to records decoded on demand from a snapshot.
+    LazyContactsBook: A ContactsBook whose records are materialized on access.
+"""
+
+import mmap
+import os
+from collections.abc import MutableMapping
+
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.rwlock import writing
+from contacts_assistant.snapshot import FLAG_NAME_INDEX, STRING_OFFSET, Snapshot
+
+
+class SnapshotStrings:
+    """
+    A class for reading single strings from the snapshot string table.
+
+    Methods:
+        __init__(buffer, header): Initializes the reader.
+        __getitem__(string_id): Decodes and caches one string.
+    """
+
+    def __init__(self, buffer, header):
+        """
+        Initialize the reader.
+
+        Args:
+            buffer (mmap.mmap): The mapped snapshot file.
+            header (SnapshotHeader): The decoded header.
+        """
+        self.buffer = buffer
+        self.header = header
+        self.cache = {}
+
+    def __getitem__(self, string_id):
+        """
+        Decode and cache one string.
+
+        Args:
+            string_id (int): The string id.
+
+        Returns:
+            str: The decoded string.
+        """
+        value = self.cache.get(string_id)
+        if value is None:
+            start, end = (
+                STRING_OFFSET.unpack_from(
+                    self.buffer,
+                    self.header.string_index_offset + STRING_OFFSET.size * position,
+                )[0]
+                for position in (string_id, string_id + 1)
+            )
+            offset = self.header.strings_offset
+            value = self.cache[string_id] = str(
+                self.buffer[offset + start : offset + end - 1], "utf-8"
+            )
+        return value
+
+
+class SnapshotRecordMap(MutableMapping):
+    """
+    A mapping of names to records decoded on demand from a snapshot.
+
+    Records read from the file are kept once decoded, so changes made to them are kept.
+    Added and deleted records live only in memory until the book is saved.
+
+    Attributes:
+        filepath (str): The path of the mapped snapshot file.
+        buffer (mmap.mmap): The mapped snapshot file.
+        header (SnapshotHeader): The decoded header.
+        loaded (dict): Decoded records of the file by name.
+        versions (dict): The version of each decoded record when it matched the file,
+            by name.
+        added (dict): Records that are not stored in the file by name.
+        deleted (set): Names of deleted records that are still present in the file.
+
+    Methods:
+        __init__(filepath): Maps the snapshot file.
+        on_disk(name): Returns the offset of a record in the file, if it was not deleted.
+        stored_records(): Yields every current record without keeping unchanged ones in memory.
+        is_modified(): Checks whether the mapping differs from the file.
+        close(): Unmaps the file.
+        reopen(saved): Maps the file again after it was closed.
+    """
+
+    def __init__(self, filepath):
+        """
+        Map the snapshot file.
+
+        Args:
+            filepath (str): The path of a snapshot file with a name index.
+
+        Raises:
+            ValueError: If the snapshot has no name index.
+        """
+        self.filepath = filepath
+        self._map()
+        self.loaded = {}
+        self.versions = {}
+        self.added = {}
+        self.deleted = set()
+        self.length = self.header.record_count
+
+    def _map(self):
+        """Map the file and read its header."""
+        with open(self.filepath, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = Snapshot.read_header(self.buffer)
+        if not self.header.flags & FLAG_NAME_INDEX:
+            self.buffer.close()
+            raise ValueError("Snapshot has no name index, save it again to add one")
+        self.strings = SnapshotStrings(self.buffer, self.header)
+
+    def _decode(self, name, offset):
+        """Decode a stored record and keep it with its version."""
+        record = self.loaded[name] = Snapshot.decode_record(
+            self.buffer, offset, self.strings
+        )[0]
+        self.versions[name] = record.version
+        return record
+
+    def on_disk(self, name):
+        """
+        Return the offset of a record in the file, if it was not deleted.
+
+        Args:
+            name (str): The contact name.
+
+        Returns:
+            int: The record offset or None.
+        """
+        if name in self.deleted:
+            return None
+        return Snapshot.find_offset(self.buffer, self.header, name)
+
+    def __getitem__(self, name):
+        record = self.loaded.get(name) or self.added.get(name)
+        if record is not None:
+            return record
+        offset = self.on_disk(name)
+        if offset is None:
+            raise KeyError(name)
+        return self._decode(name, offset)
+
+    def __contains__(self, name):
+        return (
+            name in self.loaded or name in self.added or self.on_disk(name) is not None
+        )
+
+    def __setitem__(self, name, record):
+        if name in self.loaded or self.on_disk(name) is not None:
+            self.loaded[name] = record
+            # A record put in place of the stored one differs from the file
+            self.versions.pop(name, None)
+            return
+        if name not in self.added:
+            self.length += 1
+        self.added[name] = record
+
+    def __delitem__(self, name):
+        if name in self.added:
+            del self.added[name]
+        elif self.on_disk(name) is not None:
+            self.loaded.pop(name, None)
+            self.versions.pop(name, None)
+            self.deleted.add(name)
+        else:
+            raise KeyError(name)
+        self.length -= 1
+
+    def __len__(self):
+        return self.length
+
+    def _disk_entries(self):
+        """Yield the name and offset of every record stored in the file."""
+        offset = self.header.records_offset
+        for _ in range(self.header.record_count):
+            encoded, next_offset = Snapshot.decode_name(self.buffer, offset)
+            yield str(encoded, "utf-8"), offset
+            offset = next_offset
+
+    def __iter__(self):
+        for name, _ in self._disk_entries():
+            if name not in self.deleted:
+                yield name
+        yield from list(self.added)
+
+    def values(self):
+        """Yield the records in file order, decoding each one once."""
+        for name, offset in self._disk_entries():
+            if name in self.deleted:
+                continue
+            record = self.loaded.get(name)
+            if record is None:
+                record = self._decode(name, offset)
+            yield record
+        yield from list(self.added.values())
+
+    def stored_records(self):
+        """
+        Yield every current record without keeping unchanged ones in memory.
+
+        Yields:
+            Record: Decoded records in file order, then added records.
+        """
+        for name, offset in self._disk_entries():
+            if name in self.deleted:
+                continue
+            record = self.loaded.get(name)
+            if record is None:
+                record = Snapshot.decode_record(self.buffer, offset, self.strings)[0]
+            yield record
+        yield from list(self.added.values())
+
+    def is_modified(self):
+        """
+        Check whether the mapping differs from the file.
+
+        The Record methods increment the version of a record on every change, so a
+        decoded record changed since it was read has another version than the one kept.
+
+        Returns:
+            bool: True if records were added, deleted or changed.
+        """
+        if self.deleted or self.added:
+            return True
+        versions = self.versions
+        return any(
+            record.version != versions.get(name) for name, record in self.loaded.items()
+        )
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        self.buffer.close()
+
+    def reopen(self, saved):
+        """
+        Map the file again after it was closed.
+
+        Args:
+            saved (bool): Whether the file was replaced by the records of the mapping,
+                which then become its decoded records.
+        """
+        self._map()
+        if saved:
+            self.loaded.update(self.added)
+            self.versions = {
+                name: record.version for name, record in self.loaded.items()
+            }
+            self.added = {}
+            self.deleted = set()
+            self.length = self.header.record_count
+
+
+class LazyContactsBook(ContactsBook):
+    """
+    A ContactsBook whose records are materialized on access.
+
+    All ContactsBook methods work unchanged since the records are reached through the
+    data mapping. Saving is skipped when nothing changed, so lookups never rewrite the file.
+    The file is unmapped while a save replaces it and mapped again afterwards.
+
+    Attributes:
+        filepath (str): The path of the mapped snapshot file.
+
+    Methods:
+        open(filepath, legacy_filepath): Opens a snapshot, falling back to an eager
+            ContactsBook.
+        save_to_file(filepath): Saves the book if it was modified.
+    """
+
+    filepath = None
+
+    @staticmethod
+    def open(filepath, legacy_filepath=None):
+        """
+        Open a snapshot file in read-mostly mode.
+
+        Files without a name index, legacy pickles and missing files are loaded eagerly.
+
+        Args:
+            filepath (str): The path of the snapshot file.
+            legacy_filepath (str, optional): The pickle file to load if filepath does not exist.
+
+        Returns:
+            ContactsBook: A LazyContactsBook, or a regular ContactsBook as a fallback.
+        """
+        try:
+            data = SnapshotRecordMap(filepath)
+        except (OSError, ValueError):
+            return ContactsBook.load_from_file(filepath, legacy_filepath)
+        book = LazyContactsBook()
+        book.data = data
+        book.filepath = filepath
+        return book
+
+    @writing
+    def save_to_file(self, filepath):
+        """
+        Save the address book if it differs from the mapped snapshot.
+
+        Args:
+            filepath (str): The name of the file where the data will be saved.
+
+        Raises:
+            Exception: If there is an error during the file operation.
+        """
+        mapped = bool(self.filepath) and (
+            os.path.abspath(filepath) == os.path.abspath(self.filepath)
+        )
+        if mapped and not self.data.is_modified():
+            return
+        temp_filepath = f"{filepath}.tmp"
+        try:
+            Snapshot.save(self.data.stored_records(), temp_filepath)
+            if not mapped:
+                os.replace(temp_filepath, filepath)
+                return
+            # The mapped file is replaced only once it is unmapped and closed
+            self.data.close()
+            saved = False
+            try:
+                os.replace(temp_filepath, filepath)
+                saved = True
+            finally:
+                self.data.reopen(saved)
+        except Exception as e:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+            raise Exception(f"Error saving data: {e}")
@@ -0,0 +1,356 @@
+"""
+A module containing the index of contacts mentioned in notes.
+
+An Aho-Corasick automaton holds the casefolded names and the phone numbers of all
+contacts. It finds every one of them in a note in a single pass over the note text,
+however many contacts there are. A name or phone counts only as a whole word, so "Al"
+is not found in "Also". The mentions are kept in both directions, notes by contact name
+and contact names by note, so each direction is answered by one dictionary lookup.
+
+The index is built when it is created and notes are scanned when they are added or
+edited. Each note is also split into words, kept in an inverted index. Contact changes
+are read from the change journal of the contacts book on the next lookup, and only
+contacts whose name or phones changed are reindexed: the notes mentioning them are
+checked again, and their new names and phones are searched only in the notes containing
+their longest word. The automaton is not changed, new names and phones are kept in a
+small extra list checked after it, and the automaton is rebuilt once MENTION_INDEX_BATCH
+contacts were changed.
+
+Classes:
+    AhoCorasick: An automaton finding many strings in a text in one pass.
+    MentionIndex: The contacts mentioned in notes and the notes mentioning contacts.
+"""
+
+import threading
+from collections import deque
+from itertools import groupby
+
+from contacts_assistant.constants import MENTION_INDEX_BATCH
+
+
+class AhoCorasick:
+    """
+    An automaton finding many strings in a text in one pass.
+
+    Attributes:
+        goto (list): The transitions of each state, dictionaries by character.
+        fail (list): The state of the longest proper suffix of each state's string that
+            is a prefix of some pattern.
+        outputs (list): The (length, value) pairs of the patterns ending in each state.
+
+    Methods:
+        find(text): Yields the start, end and value of each pattern found in a text.
+    """
+
+    def __init__(self, patterns):
+        """
+        Build the automaton.
+
+        Args:
+            patterns (iterable): (string, value) pairs, empty strings are skipped.
+        """
+        self.goto = [{}]
+        self.outputs = [[]]
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for character in pattern:
+                following = self.goto[state].get(character)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][character] = following
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = following
+            self.outputs[state].append((len(pattern), value))
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(character, 0)
+                # Patterns ending at the fallback state end here too
+                self.outputs[following] = (
+                    self.outputs[following] + self.outputs[self.fail[following]]
+                )
+
+    def find(self, text):
+        """
+        Yield the start, end and value of each pattern found in a text.
+
+        Args:
+            text (str): The text.
+
+        Yields:
+            tuple: The start and end of the match in text and the value of the pattern.
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for end, character in enumerate(text, 1):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            for length, value in outputs[state]:
+                yield end - length, end, value
+
+
+def _is_word(text, start, end):
+    """Return whether a match is a whole word of text."""
+    return (start == 0 or not text[start - 1].isalnum()) and (
+        end == len(text) or not text[end].isalnum()
+    )
+
+
+def _words(fields):
+    """Return the set of whole words of the fields, the runs of letters and digits."""
+    return {
+        "".join(run)
+        for text in fields
+        for is_word, run in groupby(text, str.isalnum)
+        if is_word
+    }
+
+
+def _mentions(fields, patterns):
+    """Return whether any pattern is a whole word of any field."""
+    for text in fields:
+        for pattern in patterns:
+            start = text.find(pattern)
+            while start >= 0:
+                if _is_word(text, start, start + len(pattern)):
+                    return True
+                start = text.find(pattern, start + 1)
+    return False
+
+
+class MentionIndex:
+    """
+    The contacts mentioned in notes and the notes mentioning contacts.
+
+    Notes are keyed by Note.key. The index takes the read locks of the contacts book and
+    the notebook, in this order, when it catches up with the contacts book.
+
+    Attributes:
+        contact_book (ContactsBook): The contacts.
+        notebook (Notebook): The notes.
+        patterns (dict): The casefolded name and phones of each contact, by name.
+        automaton (AhoCorasick): The patterns when it was built, with the names of their
+            contacts as values.
+        extra (dict): The patterns of the contacts changed since the automaton was built,
+            by name.
+        position (int): The position of the contacts book change journal the index has
+            caught up with.
+        notes_by_contact (dict): The notes mentioning each contact, dictionaries of
+            notes by note key, by contact name.
+        contacts_by_note (dict): The names of the contacts mentioned in each note, by
+            note key.
+        notes_by_word (dict): The notes containing each casefolded word, dictionaries of
+            notes by note key, by word.
+        words_by_note (dict): The casefolded words of each note, by note key.
+        lock (threading.Lock): Guards the index.
+
+    Methods:
+        notes_mentioning(name): Returns the notes mentioning a contact.
+        contacts_mentioned_in(note): Returns the names of the contacts a note mentions.
+        changed(note): Scans an added or edited note.
+        replaced(old_notes, new_notes): Scans the notes added and forgets the notes
+            removed by replacing a list of notes.
+    """
+
+    def __init__(self, contact_book, notebook):
+        """
+        Initialize and build an index.
+
+        Args:
+            contact_book (ContactsBook): The contacts.
+            notebook (Notebook): The notes.
+        """
+        self.contact_book = contact_book
+        self.notebook = notebook
+        self.patterns = {}
+        self.automaton = None
+        self.extra = {}
+        self.position = None
+        self.notes_by_contact = {}
+        self.contacts_by_note = {}
+        self.notes_by_word = {}
+        self.words_by_note = {}
+        self.lock = threading.Lock()
+        self._refresh()
+
+    def notes_mentioning(self, name):
+        """
+        Return the notes mentioning a contact by name or phone.
+
+        Args:
+            name (str): The name of the contact.
+
+        Returns:
+            list: The notes, in the order they were found.
+        """
+        self._refresh()
+        with self.lock:
+            return list(self.notes_by_contact.get(name, {}).values())
+
+    def contacts_mentioned_in(self, note):
+        """
+        Return the names of the contacts a note mentions by name or phone.
+
+        Args:
+            note (Note): The note.
+
+        Returns:
+            list: The contact names, in the order they were found.
+        """
+        self._refresh()
+        with self.lock:
+            return list(self.contacts_by_note.get(note.key, ()))
+
+    def changed(self, note):
+        """
+        Scan an added or edited note.
+
+        Args:
+            note (Note): The note.
+        """
+        with self.lock:
+            self._forget(note)
+            self._scan(note)
+
+    def replaced(self, old_notes, new_notes):
+        """
+        Scan the notes added and forget the notes removed by replacing a list of notes.
+
+        Args:
+            old_notes (list): The notes before.
+            new_notes (list): The notes after.
+        """
+        with self.lock:
+            new_keys = {note.key for note in new_notes}
+            for note in old_notes:
+                if note.key not in new_keys:
+                    self._forget(note)
+            for note in new_notes:
+                if note.key not in self.contacts_by_note:
+                    self._scan(note)
+
+    def _refresh(self):
+        """Catch up with the contacts changed since the index was built or refreshed."""
+        book = self.contact_book
+        with book.lock.read(), self.notebook.lock.read(), self.lock:
+            if self.position is not None:
+                names, position = book.changes_since(self.position)
+                if names is not None:
+                    self.position = position
+                    for name in names:
+                        self._contact_changed(name, book.find_by_name(name))
+                    return
+            # A new index, or the journal was truncated: index everything
+            self.position = book.changes_since(0)[1]
+            self.patterns = {
+                name: self._patterns_of(name, record)
+                for name, record in book.data.items()
+            }
+            self._build_automaton()
+            self.notes_by_contact = {}
+            self.contacts_by_note = {}
+            self.notes_by_word = {}
+            self.words_by_note = {}
+            for note in self.notebook.notes:
+                self._scan(note)
+
+    @staticmethod
+    def _patterns_of(name, record):
+        """Return the casefolded name and the phones of a contact."""
+        return (name.casefold(),) + tuple(phone.value for phone in record.phones)
+
+    def _build_automaton(self):
+        """Build the automaton of all patterns."""
+        self.automaton = AhoCorasick(
+            (pattern, name)
+            for name, patterns in self.patterns.items()
+            for pattern in patterns
+        )
+        self.extra = {}
+
+    def _notes_containing(self, pattern):
+        """
+        Return the notes that can mention a pattern, by note key.
+
+        Each word of a pattern found as a whole word is a whole word of the note too,
+        so only the notes containing its longest word are returned.
+        """
+        words = _words((pattern,))
+        if not words:
+            return {note.key: note for note in self.notebook.notes}
+        return self.notes_by_word.get(max(words, key=len), {})
+
+    def _contact_changed(self, name, record):
+        """Reindex the notes of a contact whose name or phones changed."""
+        old = self.patterns.get(name, ())
+        new = self._patterns_of(name, record) if record is not None else ()
+        if old == new:
+            return
+        if record is None:
+            del self.patterns[name]
+        else:
+            self.patterns[name] = new
+        self.extra[name] = new
+        # Notes that mentioned the contact, and notes containing a new name or phone
+        candidates = dict(self.notes_by_contact.get(name, {}))
+        for pattern in new:
+            if pattern not in old:
+                candidates.update(self._notes_containing(pattern))
+        for key, note in candidates.items():
+            names = self.contacts_by_note.setdefault(key, {})
+            if _mentions(note.folded()[:2], new):
+                names[name] = None
+                self.notes_by_contact.setdefault(name, {})[key] = note
+            elif name in names:
+                del names[name]
+                self._unlink(self.notes_by_contact, name, key)
+        if len(self.extra) > MENTION_INDEX_BATCH:
+            self._build_automaton()
+
+    def _scan(self, note):
+        """Record the words and the contacts in the title and content of a note."""
+        key = note.key
+        names = {}
+        fields = note.folded()[:2]
+        for text in fields:
+            for start, end, name in self.automaton.find(text):
+                # Patterns changed since the automaton was built are checked below
+                if name not in self.extra and _is_word(text, start, end):
+                    names[name] = None
+        for name, patterns in self.extra.items():
+            if _mentions(fields, patterns):
+                names[name] = None
+        # Notes mentioning no contact are recorded too, so they are not scanned again
+        self.contacts_by_note[key] = names
+        for name in names:
+            self.notes_by_contact.setdefault(name, {})[key] = note
+        words = self.words_by_note[key] = _words(fields)
+        for word in words:
+            self.notes_by_word.setdefault(word, {})[key] = note
+
+    def _forget(self, note):
+        """Drop the words and the mentions of a note."""
+        key = note.key
+        for name in self.contacts_by_note.pop(key, ()):
+            self._unlink(self.notes_by_contact, name, key)
+        for word in self.words_by_note.pop(key, ()):
+            self._unlink(self.notes_by_word, word, key)
+
+    @staticmethod
+    def _unlink(notes_by, value, key):
+        """Drop a note from the notes of a contact name or a word."""
+        notes = notes_by[value]
+        del notes[key]
+        if not notes:
+            del notes_by[value]
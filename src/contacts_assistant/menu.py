@@ -41,6 +41,7 @@ class Menu(Enum):
         FIND_CONTACT_BY_EMAIL: Find a contact by email address.
         SHOW_ALL_CONTACTS: Show all contacts.
         UPCOMING_BIRTHDAYS: Show upcoming birthdays within the specified number of days.
+        BIRTHDAY_STATS: Show birthdays per month and per weekday and the age distribution.
         UPDATE_EMAIL: Update the email address of a contact.
         ADD_ADDRESS: Add or update the address of a contact.
         REMOVE_ADDRESS: Remove the address of a contact.
@@ -51,8 +52,16 @@ class Menu(Enum):
         UPDATE_NOTE: Update a note by title.
         SEARCH_NOTES: Search for notes containing the query in their title or content.
         FILTER_NOTES_BY_TAG: Filter notes by tag.
+        NOTES_MENTIONING: Show the notes mentioning a contact by name or phone.
+        MENTIONED_CONTACTS: Show the contacts mentioned in a note.
         NOTES_DUE_IN_DAYS: Show notes that are due within the next specified number of days.
         SHOW_ALL_NOTES: Show all notes.
+        AGENDA: Show birthdays and note due dates of a date window in date order.
+        EXPORT_CONTACTS: Export contacts to a CSV, vCard or JSON Lines file.
+        EXPORT_NOTES: Export notes to a CSV or JSON Lines file.
+        STATS: Show latency percentiles of the commands run in this session.
+        CACHE_STATS: Show the hit rate of the query cache.
+        PROFILE: Start or stop a CPU profile of the following commands.
         EXIT: Exit the application.
         CLOSE: Close the application.
     """
@@ -127,6 +136,19 @@ class Menu(Enum):
         "Show upcoming birthdays within the specified number of days",
     )
 
+    BIRTHDAY_STATS = Command(
+        0,
+        [
+            Parametr(
+                "report",
+                False,
+                "Report to show (month, weekday, age), all by default",
+                ["month", "weekday", "age"],
+            )
+        ],
+        "Show birthdays per month and per weekday and the age distribution",
+    )
+
     UPDATE_EMAIL = Command(
         2,
         [
@@ -186,7 +208,14 @@ class Menu(Enum):
 
     SEARCH_NOTES = Command(
         1,
-        [Parametr("query", True, "Search query")],
+        [
+            Parametr(
+                "query",
+                True,
+                "Search query, e.g. milk, title:milk, tag:home, /mi(lk|nt)/i or "
+                "created:01.05.2024..31.05.2024",
+            )
+        ],
         "Search for notes containing the query in their title or content",
     )
 
@@ -194,6 +223,18 @@ class Menu(Enum):
         1, [Parametr("tag", True, "Tag to filter notes by")], "Filter notes by tag"
     )
 
+    NOTES_MENTIONING = Command(
+        1,
+        [Parametr("name", True, "Name of the contact")],
+        "Show the notes mentioning a contact by name or phone",
+    )
+
+    MENTIONED_CONTACTS = Command(
+        1,
+        [Parametr("title", True, "Title of the note")],
+        "Show the contacts mentioned in a note",
+    )
+
     NOTES_DUE_IN_DAYS = Command(
         1,
         [Parametr("days", True, "Number of days to look ahead for due notes")],
@@ -202,6 +243,60 @@ class Menu(Enum):
 
     SHOW_ALL_NOTES = Command(0, [], "Show all notes")
 
+    AGENDA = Command(
+        0,
+        [
+            Parametr(
+                "start", False, "First day of the window (DD.MM.YYYY), today by default"
+            ),
+            Parametr("end", False, "Last day of the window (DD.MM.YYYY)"),
+            Parametr(
+                "days",
+                False,
+                "Length of the window in days when no end is given, 7 by default",
+            ),
+            Parametr("limit", False, "Maximum number of events to show"),
+        ],
+        "Show birthdays and note due dates of a date window in date order",
+    )
+
+    EXPORT_CONTACTS = Command(
+        1,
+        [
+            Parametr("file", True, "Path of the output file"),
+            Parametr(
+                "format",
+                False,
+                "Export format (csv, vcard, jsonl)",
+                ["csv", "vcard", "jsonl"],
+            ),
+            Parametr("fields", False, "Comma-separated list of fields to export"),
+            Parametr("filter", False, "Filter expression, e.g. 'email~@gmail.com'"),
+        ],
+        "Export contacts to a CSV, vCard or JSON Lines file",
+    )
+
+    EXPORT_NOTES = Command(
+        1,
+        [
+            Parametr("file", True, "Path of the output file"),
+            Parametr("format", False, "Export format (csv, jsonl)", ["csv", "jsonl"]),
+            Parametr("fields", False, "Comma-separated list of fields to export"),
+            Parametr("filter", False, "Filter expression, e.g. 'tags=work'"),
+        ],
+        "Export notes to a CSV or JSON Lines file",
+    )
+
+    STATS = Command(0, [], "Show latency percentiles of the commands run so far")
+
+    CACHE_STATS = Command(0, [], "Show the hit rate of the query cache")
+
+    PROFILE = Command(
+        1,
+        [Parametr("action", True, "start or stop", ["start", "stop"])],
+        "Start or stop profiling the following commands",
+    )
+
     EXIT = Command(0, [], "Exit the application")
 
     CLOSE = Command(0, [], "Close the application")
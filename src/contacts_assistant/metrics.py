@@ -0,0 +1,245 @@
+"""
+A module containing latency metrics for the assistant commands.
+
+Each command phase (parse, dispatch, render, save) has a streaming histogram with
+logarithmic buckets in the style of HdrHistogram: 16 buckets per power of two of
+microseconds, so percentiles are within about 6% of the exact value while recording a
+sample is a few integer operations and memory does not grow with the number of samples.
+
+Classes:
+    LatencyHistogram: A streaming histogram of durations.
+    Metrics: A collection of histograms by command and phase.
+"""
+
+import json
+import math
+
+PHASES = ("parse", "dispatch", "render", "save")
+PERCENTILES = (50, 95, 99)
+
+# Buckets per power of two, as a number of bits
+SUB_BUCKET_BITS = 4
+
+
+class LatencyHistogram:
+    """
+    A streaming histogram of durations.
+
+    Values below 32 microseconds have a bucket each. Larger values share a bucket with
+    the values having the same five leading bits.
+
+    Attributes:
+        counts (list): Sample counts by bucket index.
+        count (int): The number of samples.
+        total (int): The sum of the samples in microseconds.
+        max (int): The largest sample in microseconds.
+
+    Methods:
+        record(seconds): Adds a sample.
+        merge(other): Adds the samples of another histogram.
+        percentile(percent): Returns a percentile in seconds.
+        summary(): Returns the count, mean, percentiles and maximum in milliseconds.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        """
+        Initialize an empty histogram.
+        """
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_index(value):
+        """
+        Return the bucket index of a value.
+
+        Args:
+            value (int): The value in microseconds.
+
+        Returns:
+            int: The bucket index.
+        """
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS - 1)
+        return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def bucket_upper_bound(index):
+        """
+        Return the largest value of a bucket.
+
+        Args:
+            index (int): The bucket index.
+
+        Returns:
+            int: The largest value in microseconds.
+        """
+        shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+        return ((index - (shift << SUB_BUCKET_BITS) + 1) << shift) - 1
+
+    def record(self, seconds):
+        """
+        Add a sample.
+
+        Args:
+            seconds (float): The duration in seconds.
+        """
+        value = int(seconds * 1_000_000)
+        index = self.bucket_index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram.
+
+        Args:
+            other (LatencyHistogram): The histogram to add.
+        """
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """
+        Return a percentile.
+
+        Args:
+            percent (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The largest value of the bucket holding the percentile, in seconds.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_upper_bound(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self):
+        """
+        Return the count, mean, percentiles and maximum.
+
+        Returns:
+            dict: The count and the durations in milliseconds.
+        """
+        result = {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count / 1000, 3) if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}_ms"] = round(self.percentile(percent) * 1000, 3)
+        result["max_ms"] = round(self.max / 1000, 3)
+        return result
+
+
+class Metrics:
+    """
+    A collection of histograms by command and phase.
+
+    Attributes:
+        histograms (dict): Histograms by (command, phase).
+
+    Methods:
+        record(command, phase, seconds): Adds a sample to the histogram of a command phase.
+        merge(other): Adds the samples of other metrics.
+        to_dict(): Returns the summaries by command and phase.
+        report(): Returns the summaries as a table.
+        dump(filepath): Writes the summaries to a JSON file.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty metrics.
+        """
+        self.histograms = {}
+
+    def record(self, command, phase, seconds):
+        """
+        Add a sample to the histogram of a command phase.
+
+        Args:
+            command (str): The command name.
+            phase (str): One of "parse", "dispatch", "render" or "save".
+            seconds (float): The duration in seconds.
+        """
+        histogram = self.histograms.get((command, phase))
+        if histogram is None:
+            histogram = self.histograms[(command, phase)] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def merge(self, other):
+        """
+        Add the samples of other metrics.
+
+        Args:
+            other (Metrics): The metrics to add.
+        """
+        for key, histogram in other.histograms.items():
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            self.histograms[key].merge(histogram)
+
+    def to_dict(self):
+        """
+        Return the summaries by command and phase.
+
+        Returns:
+            dict: Summaries by phase by command name, in command and phase order.
+        """
+        result = {}
+        for (command, phase), histogram in sorted(
+            self.histograms.items(),
+            key=lambda item: (item[0][0], PHASES.index(item[0][1])),
+        ):
+            result.setdefault(command, {})[phase] = histogram.summary()
+        return result
+
+    def report(self):
+        """
+        Return the summaries as a table.
+
+        Returns:
+            str: One line per command phase with the count, percentiles and maximum.
+        """
+        if not self.histograms:
+            return "No commands measured yet."
+        header = f"{'Command':<22}{'Phase':<10}{'Count':>7}"
+        header += "".join(f"{f'p{percent} ms':>11}" for percent in PERCENTILES)
+        header += f"{'max ms':>11}"
+        lines = [header, "-" * len(header)]
+        for command, phases in self.to_dict().items():
+            for phase, summary in phases.items():
+                line = f"{command:<22}{phase:<10}{summary['count']:>7}"
+                line += "".join(
+                    f"{summary[f'p{percent}_ms']:>11.3f}" for percent in PERCENTILES
+                )
+                line += f"{summary['max_ms']:>11.3f}"
+                lines.append(line)
+        return "\n".join(lines)
+
+    def dump(self, filepath):
+        """
+        Write the summaries to a JSON file.
+
+        Args:
+            filepath (str): The path of the file.
+        """
+        with open(filepath, "w", encoding="utf-8") as file:
+            json.dump({"commands": self.to_dict()}, file, indent=4)
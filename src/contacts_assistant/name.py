@@ -23,6 +23,8 @@ class Name(Field):
         __init__(name): Initializes the Name with a given name string.
     """
 
+    __slots__ = ()
+
     def __init__(self, name):
         """
         Initializes the Name instance with the given name string.
@@ -1,19 +1,27 @@
 """
 A module containing the Note class for managing notes.
 
-This module provides the Note class, which represents a note with a title, content, tags, and optional due date.
+This module provides the Note class, which represents a note with a title, content, tags, optional due date
+and optional recurrence.
 
 Classes:
     Note: A class to represent a note.
 """
 
+import itertools
 import json
-from datetime import datetime
+import sys
+from datetime import date, datetime
 from textwrap import fill
 from contacts_assistant.constants import DATE_FORMAT, MAX_SIMBOLS_IN_ROW
+from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.recurrence import Recurrence
+from contacts_assistant.slotted import VersionedSlotted
 
+_keys = itertools.count()
 
-class Note:
+
+class Note(VersionedSlotted):
     """
     A class to represent a note.
 
@@ -23,17 +31,37 @@ class Note:
         tags (list): List of tags associated with the note.
         due_date (datetime): Due date of the note.
         created_at (datetime): Date when the note was created.
+        recurrence (Recurrence): The rule repeating the note from its due date, or None.
+        version (int): The number of changes, incremented by touch().
+        key (int): A number identifying the note while the program runs.
 
     Methods:
-        __init__(title, content, tags=None, due_date=None): Initializes a Note instance.
+        __init__(title, content, tags=None, due_date=None, recurrence=None): Initializes a Note instance.
         _validate_date(date_str): Validates the date format.
+        occurrences(first_day, last_day): Yields the due dates of a window.
+        next_due_date(fromdate): Returns the first due date on or after a day.
+        occurrence(due_date): Returns a copy of the note due on one of its occurrences.
         to_dict(): Converts the Note instance to a dictionary.
         from_dict(data): Creates a Note instance from a dictionary.
         from_json(json_obj): Creates a Note instance from a JSON object.
         __str__(): Gets the string representation of the Note instance.
+        frame(): Gets the string representation of the Note instance in a decorative frame.
+        folded(): Gets the casefolded title, content and tags the searches match.
     """
 
-    def __init__(self, title, content, tags=None, due_date=None):
+    __slots__ = (
+        "title",
+        "content",
+        "tags",
+        "due_date",
+        "created_at",
+        "recurrence",
+        "_frame",
+        "_folded",
+        "_key",
+    )
+
+    def __init__(self, title, content, tags=None, due_date=None, recurrence=None):
         """
         Initialize a Note instance.
 
@@ -42,15 +70,38 @@ class Note:
             content (str): The content of the note.
             tags (list, optional): List of tags associated with the note.
             due_date (str, optional): Due date of the note in DD.MM.YYYY format.
+            recurrence (str, optional): Recurrence rule, e.g. "weekly;interval=2", the due
+                date is the first occurrence.
 
         Raises:
-            ValueError: If due_date is not in the correct format.
+            ValueError: If due_date is not in the correct format, the recurrence rule is not
+                valid or a recurrence is given without a due date.
         """
         self.title = title
         self.content = content
         self.tags = tags if tags else []
         self.due_date = self._validate_date(due_date) if due_date else None
         self.created_at = datetime.now()
+        self.recurrence = Recurrence.parse(recurrence) if recurrence else None
+        if self.recurrence and not self.due_date:
+            raise ValueError("A repeating note needs a due date")
+
+    @property
+    def key(self):
+        """
+        Return a number identifying the note while the program runs.
+
+        Unlike id(), the number is never given to another note once the note is dropped,
+        so indexes can keep it as the key of the notes they hold.
+
+        Returns:
+            int: The number, assigned on the first call.
+        """
+        try:
+            return self._key
+        except AttributeError:
+            self._key = next(_keys)
+            return self._key
 
     def _validate_date(self, date_str):
         """
@@ -66,10 +117,71 @@ class Note:
             ValueError: If date_str is not in the correct format.
         """
         try:
-            return datetime.strptime(date_str, DATE_FORMAT)
+            return DateHelper.parse_date(date_str)
         except ValueError:
             raise ValueError("Invalid date format. Please use DD.MM.YYYY")
 
+    def occurrences(self, first_day: date, last_day: date):
+        """
+        Yield the due dates of a window.
+
+        Args:
+            first_day (date): The first day of the window.
+            last_day (date): The last day of the window.
+
+        Yields:
+            datetime: The due date, or each occurrence of a repeating note, in the window.
+        """
+        if self.due_date is None:
+            return
+        if self.recurrence is None:
+            if first_day <= self.due_date.date() <= last_day:
+                yield self.due_date
+            return
+        yield from self.recurrence.occurrences(self.due_date, first_day, last_day)
+
+    def next_due_date(self, fromdate: date):
+        """
+        Return the first due date on or after a day.
+
+        Args:
+            fromdate (date): The day.
+
+        Returns:
+            datetime: The due date or occurrence, or None if there is none.
+        """
+        if self.due_date is None:
+            return None
+        if self.recurrence is None:
+            return self.due_date if self.due_date.date() >= fromdate else None
+        return next(
+            self.recurrence.occurrences(self.due_date, fromdate, date.max), None
+        )
+
+    def occurrence(self, due_date: datetime):
+        """
+        Return a copy of the note due on one of its occurrences.
+
+        The copy shares the title, content and tags of the note and is meant for display,
+        changes to it are not saved.
+
+        Args:
+            due_date (datetime): The due date of the occurrence.
+
+        Returns:
+            Note: The note itself if due_date is its due date, otherwise a copy.
+        """
+        if due_date == self.due_date:
+            return self
+        copy = Note.__new__(Note)
+        copy.title = self.title
+        copy.content = self.content
+        copy.tags = self.tags
+        copy.due_date = due_date
+        copy.created_at = self.created_at
+        copy.recurrence = self.recurrence
+        return copy
+
     def to_dict(self):
         """
         Convert the Note instance to a dictionary.
@@ -77,13 +189,16 @@ class Note:
         Returns:
             dict: Dictionary representation of the Note instance.
         """
-        return {
+        data = {
             "title": self.title,
             "content": self.content,
             "tags": self.tags,
             "due_date": self.due_date.strftime(DATE_FORMAT) if self.due_date else None,
             "created_at": self.created_at.strftime(DATE_FORMAT),
         }
+        if self.recurrence:
+            data["recurrence"] = self.recurrence.to_dict()
+        return data
 
     @staticmethod
     def from_dict(data):
@@ -96,15 +211,20 @@ class Note:
         Returns:
             Note: A Note instance created from the dictionary data.
         """
-        note = Note(
-            title=data["title"],
-            content=data["content"],
-            tags=data.get("tags", []),
-            due_date=data.get("due_date"),
-        )
-        note.created_at = datetime.strptime(
-            data.get("created_at", datetime.now().strftime(DATE_FORMAT)), DATE_FORMAT
+        note = Note.__new__(Note)
+        note.title = data["title"]
+        note.content = data["content"]
+        note.tags = [sys.intern(tag) for tag in data.get("tags") or []]
+        due_date = data.get("due_date")
+        note.due_date = note._validate_date(due_date) if due_date else None
+        created_at = data.get("created_at")
+        note.created_at = (
+            DateHelper.parse_date(created_at)
+            if created_at
+            else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         )
+        recurrence = data.get("recurrence")
+        note.recurrence = Recurrence.from_dict(recurrence) if recurrence else None
         return note
 
     @staticmethod
@@ -135,6 +255,8 @@ class Note:
         content = fill(self.content, MAX_SIMBOLS_IN_ROW) + " \n" * 2
         tag = f"Tags:       {', '.join(self.tags)}\n"
         due_date = f"Due Date:   {due_date_str}\n"
+        if self.recurrence:
+            due_date += f"Repeats:    {self.recurrence}\n"
         created_at = f"Created At: {self.created_at.strftime(DATE_FORMAT)}"
         return (
             title
@@ -146,3 +268,44 @@ class Note:
             + due_date
             + created_at
         )
+
+    def frame(self):
+        """
+        Get the string representation of the Note instance in a decorative frame.
+
+        The frame is rendered once per version of the note, call touch() after editing
+        the attributes of a note.
+
+        Returns:
+            str: The string representation padded to its widest line and framed.
+        """
+        return self._cached("_frame", self._render_frame)
+
+    def folded(self):
+        """
+        Get the casefolded title, content and tags the searches match.
+
+        The shadow copy is made once per version of the note, so searches never fold
+        the same text twice.
+
+        Returns:
+            tuple: The casefolded title and content, and a tuple of the casefolded tags.
+        """
+        return self._cached("_folded", self._fold)
+
+    def _fold(self):
+        """Casefold the searchable text."""
+        return (
+            self.title.casefold(),
+            self.content.casefold(),
+            tuple(tag.casefold() for tag in self.tags),
+        )
+
+    def _render_frame(self):
+        """Wrap the note text in a frame."""
+        lines = str(self).split("\n")
+        width = max(len(line) for line in lines)
+        frame = ["╔" + "═" * (width + 2) + "╗"]
+        frame += ["║ " + line.ljust(width) + " ║" for line in lines]
+        frame += ["╚" + "═" * (width + 2) + "╝"]
+        return "\n".join(frame)
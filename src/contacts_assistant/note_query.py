@@ -0,0 +1,226 @@
+"""
+A module containing the search query syntax of notes.
+
+A query is a list of terms separated by spaces, a note has to match all of them:
+
+    milk                        title or content contains "milk", ignoring case
+    "buy milk"                  title or content contains the phrase
+    title:milk                  the title contains "milk", also content:milk
+    tag:home                    a tag is "home", ignoring case
+    created:01.05.2024..31.05.2024
+                                created in the date range, either end may be left out,
+                                created:01.05.2024 is a single day
+    /mi(lk|nt)/i                title or content matches the regular expression, the
+                                i, m, s and x flags may follow, title:/.../ and
+                                tag:/.../ scope it
+
+A query without scoped, quoted or regular expression terms is one plain substring, as
+before the syntax existed, so "buy milk" finds the phrase. Substrings are matched
+against the casefolded shadow of each note (Note.folded()) and regular expressions
+against the original text. Parsed queries and compiled patterns are cached.
+
+Classes:
+    NoteQuery: A parsed note search query.
+
+Functions:
+    compile_pattern(pattern, flags): Returns a compiled regular expression, cached.
+    find_in_fields(text, offsets, query, base): Returns the notes of packed text
+        containing a substring.
+"""
+
+import functools
+import re
+from bisect import bisect_right
+
+from contacts_assistant.date_helpers import DateHelper
+
+PATTERN_CACHE_SIZE = 256
+SCOPES = ("title", "content", "tag", "created")
+FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+TOKEN = re.compile(
+    r'(?:(\w+):)?(?:"([^"]*)"|/((?:\\.|[^/\\])+)/([imsx]*)(?=\s|$)|(\S+))'
+)
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern, flags=0):
+    """
+    Return a compiled regular expression, cached.
+
+    Args:
+        pattern (str): The regular expression.
+        flags (int, optional): The re flags.
+
+    Returns:
+        re.Pattern: The compiled expression.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+    try:
+        return re.compile(pattern, flags)
+    except re.error as error:
+        raise ValueError(f"Invalid regular expression /{pattern}/: {error}")
+
+
+def find_in_fields(text, offsets, query, base=0):
+    """
+    Return the notes of packed text containing a substring in their title or content.
+
+    The titles and contents are concatenated in text, field 2 * i is the title and field
+    2 * i + 1 the content of note i. A match counts only if it lies within one field.
+
+    Args:
+        text (str or bytes): The concatenated fields.
+        offsets (sequence): The start of each field and the end of the last one, minus
+            base is the position in text.
+        query (str or bytes): The substring, of the same type as text.
+        base (int, optional): The offset of the start of text.
+
+    Returns:
+        list: The indexes of the matching notes, in order.
+    """
+    if not query:
+        return list(range(len(offsets) // 2))
+    matches = []
+    position = text.find(query)
+    while position != -1:
+        field = bisect_right(offsets, base + position) - 1
+        if base + position + len(query) <= offsets[field + 1]:
+            note = field // 2
+            matches.append(note)
+            # The next match is searched from the start of the next note
+            position = text.find(query, offsets[2 * note + 2] - base)
+        else:
+            position = text.find(query, position + 1)
+    return matches
+
+
+class NoteQuery:
+    """
+    A parsed note search query.
+
+    Attributes:
+        text (str): The query as typed.
+        plain (bool): Whether the whole query is one substring.
+        terms (list): Functions taking a note and its shadow, one per term.
+        pattern (tuple): The (pattern, flags) of a query made of one unscoped regular
+            expression, which can be scanned in parallel, otherwise None.
+
+    Methods:
+        parse(text): Parses a query, cached.
+        matches(note, folded): Returns whether a note matches every term.
+    """
+
+    def __init__(self, text):
+        """
+        Parse a query.
+
+        Args:
+            text (str): The query.
+
+        Raises:
+            ValueError: If a date or regular expression is not valid.
+        """
+        self.text = text
+        self.terms = []
+        structured = False
+        pattern_term = None
+        for match in TOKEN.finditer(text):
+            scope, quoted, pattern, flags, word = match.groups()
+            if scope is not None and scope.lower() not in SCOPES:
+                scope, word = None, match.group(0)
+                quoted = pattern = None
+            if scope is not None or quoted is not None or pattern is not None:
+                structured = True
+            scope = scope.lower() if scope else None
+            if pattern is not None:
+                self.terms.append(self._pattern_term(scope, pattern, flags))
+                if scope is None:
+                    pattern_term = (pattern, self._flags(flags))
+            else:
+                value = quoted if quoted is not None else word
+                self.terms.append(self._text_term(scope, value))
+        self.plain = not structured
+        self.pattern = pattern_term if len(self.terms) == 1 else None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+    def parse(text):
+        """
+        Parse a query, cached.
+
+        Args:
+            text (str): The query.
+
+        Returns:
+            NoteQuery: The parsed query.
+        """
+        return NoteQuery(text)
+
+    def matches(self, note, folded):
+        """
+        Return whether a note matches every term.
+
+        Args:
+            note (Note): The note.
+            folded (tuple): The casefolded title, content and tags of the note.
+
+        Returns:
+            bool: True if all terms match.
+        """
+        for term in self.terms:
+            if not term(note, folded):
+                return False
+        return True
+
+    @staticmethod
+    def _flags(letters):
+        """Return the re flags of flag letters."""
+        flags = 0
+        for letter in letters:
+            flags |= FLAGS[letter]
+        return flags
+
+    def _pattern_term(self, scope, pattern, letters):
+        """Return the term matching a regular expression."""
+        search = compile_pattern(pattern, self._flags(letters)).search
+        if scope == "title":
+            return lambda note, folded: search(note.title) is not None
+        if scope == "content":
+            return lambda note, folded: search(note.content) is not None
+        if scope == "tag":
+            return lambda note, folded: any(search(tag) for tag in note.tags)
+        if scope == "created":
+            raise ValueError("Use created:DD.MM.YYYY..DD.MM.YYYY to search by date")
+        return lambda note, folded: bool(search(note.title) or search(note.content))
+
+    def _text_term(self, scope, value):
+        """Return the term matching a substring, a tag or a date range."""
+        if scope == "created":
+            return self._created_term(value)
+        value = value.casefold()
+        if scope == "title":
+            return lambda note, folded: value in folded[0]
+        if scope == "content":
+            return lambda note, folded: value in folded[1]
+        if scope == "tag":
+            return lambda note, folded: value in folded[2]
+        return lambda note, folded: value in folded[0] or value in folded[1]
+
+    @staticmethod
+    def _created_term(value):
+        """Return the term matching a creation date range."""
+        start, separator, end = value.partition("..")
+        if not separator:
+            end = start
+        first = DateHelper.parse_date(start).date() if start else None
+        last = DateHelper.parse_date(end).date() if end else None
+
+        def term(note, folded):
+            created = note.created_at.date()
+            return (first is None or created >= first) and (
+                last is None or created <= last
+            )
+
+        return term
@@ -8,31 +8,54 @@ Classes:
     Notebook: A class to represent a collection of notes.
 """
 
+import heapq
 import json
-from datetime import datetime, timedelta
+from itertools import accumulate
+from datetime import date, datetime, timedelta
 
+from contacts_assistant.json_stream import JsonArrayStream
 from contacts_assistant.note import Note
+from contacts_assistant.note_query import NoteQuery, find_in_fields
+from contacts_assistant.query_cache import next_generation
+from contacts_assistant.rwlock import ReadWriteLock, reading, writing
 
 
 class Notebook:
     """
     A class to represent a collection of notes.
 
+    The methods take the read or write lock of the notebook, so notes may be searched
+    from worker threads while another thread changes the notebook. Confirmation prompts
+    are shown before the write lock is taken.
+
     Attributes:
+        lock (ReadWriteLock): The lock guarding the notes.
+        scanner (ParallelScanner): Searches large notebooks in worker processes, None
+            to always search in the calling thread.
+        substring_index (SubstringIndex): A suffix array answering searches, or None.
+        mention_index (MentionIndex): The contacts mentioned in the notes, or None.
+        reminders (ReminderScheduler): The scheduler of the note reminders, or None.
         notes (list): A list of Note objects representing the notes in the notebook.
+        generation (int): A number replaced by a new one on every change of the notebook.
 
     Methods:
         __init__(): Initializes a Notebook instance.
+        touch(): Marks the notebook as changed.
         add(note, suppress_message=False): Adds a note to the notebook.
         search(query): Searches for notes containing the query in their title or content.
+        query(text): Searches for notes matching a query of scoped and regex terms.
         remove(title): Removes notes with the specified title.
         remove_all(): Removes all notes from the notebook.
         update(title, new_note): Updates a note with new note data.
         filter_by_tag(tag): Filters notes by tag.
         notes_due_in_days(days): Gets notes due in the next specified number of days.
+        notes_due_between(start, end): Gets notes due in a date window.
+        occurrences_between(start, end): Yields the due dates of a date window in date
+            order, computed lazily.
         to_dict(): Converts the Notebook instance to a dictionary.
         from_dict(data): Creates a Notebook instance from a dictionary.
         save_to_file(filepath): Saves the Notebook instance to a file.
+        iter_file(filepath): Yields the notes stored in a file one at a time.
         load_from_file(filepath): Loads a Notebook instance from a file.
         print_all_notes(): Gets a string representation of all notes in the notebook.
         format_notes_with_frame(notes): Formats a list of notes with a decorative frame.
@@ -40,12 +63,63 @@ class Notebook:
         __str__(): Gets the string representation of the Notebook instance.
     """
 
+    scanner = None
+    substring_index = None
+    mention_index = None
+    reminders = None
+    # The casefolded shadows of the notes, the same text packed for substring searches
+    # and the original text packed for regular expressions, with the generation they
+    # were made at
+    _shadows = (None, ())
+    _packed = (None, "", (0,))
+    _originals = (None, "", (0,))
+
     def __init__(self):
         """
         Initialize a Notebook instance.
         """
+        self.lock = ReadWriteLock()
         self.notes = []
 
+    @property
+    def notes(self):
+        """
+        The notes of the notebook.
+
+        Returns:
+            list: The Note objects.
+        """
+        return self._notes
+
+    @notes.setter
+    @writing
+    def notes(self, notes):
+        if "_notes" in self.__dict__:
+            self._index_replaced(self._notes, notes)
+        self._notes = notes
+        self.touch()
+
+    @property
+    def generation(self):
+        """
+        A number replaced by a new one on every change of the notebook.
+
+        Query results cached under a generation are valid as long as the notebook has it.
+
+        Returns:
+            int: The current generation.
+        """
+        if "_generation" not in self.__dict__:
+            self._generation = next_generation()
+        return self._generation
+
+    def touch(self):
+        """
+        Mark the notebook as changed.
+        """
+        self._generation = next_generation()
+
+    @writing
     def add(self, note, suppress_message=False):
         """
         Add a note to the notebook.
@@ -55,9 +129,12 @@ class Notebook:
             suppress_message (bool, optional): Suppress the "Note added" message if True.
         """
         self.notes.append(note)
+        self._index_changed(note)
+        self.touch()
         if not suppress_message:
             return "Note added."
 
+    @reading
     def search(self, query):
         """
         Search for notes containing the query in their title or content.
@@ -68,12 +145,106 @@ class Notebook:
         Returns:
             list: List of notes matching the search query.
         """
-        query = query.lower()
-        result = []
-        for note in self.notes:
-            if query in note.title.lower() or query in note.content.lower():
-                result.append(note)
-        return result
+        query = query.casefold()
+        if self.substring_index is not None:
+            found = self.substring_index.find(query, lambda: self.notes)
+            if found is not None:
+                return found
+        notes = self.notes
+        text, offsets = self._packed_notes(notes)
+        if self.scanner is not None and self.scanner.should_scan(len(notes)):
+            indexes = self.scanner.find(text, offsets, self.generation, query)
+        else:
+            indexes = find_in_fields(text, offsets, query)
+        return [notes[index] for index in indexes]
+
+    @reading
+    def query(self, text):
+        """
+        Search for notes matching a query of scoped and regex terms.
+
+        See the note_query module for the syntax, a query without scoped, quoted or
+        regex terms is searched as one substring.
+
+        Args:
+            text (str): The query.
+
+        Returns:
+            list: List of notes matching every term of the query.
+
+        Raises:
+            ValueError: If a date or regular expression of the query is not valid.
+        """
+        parsed = NoteQuery.parse(text)
+        if parsed.plain:
+            return self.search(text)
+        notes = self.notes
+        scanner = self.scanner
+        if parsed.pattern and scanner is not None and scanner.should_scan(len(notes)):
+            text, offsets = self._packed_originals(notes)
+            indexes = scanner.find_pattern(
+                text, offsets, self.generation, *parsed.pattern
+            )
+            return [notes[index] for index in indexes]
+        return [
+            note
+            for note, folded in zip(notes, self._folded_notes(notes))
+            if parsed.matches(note, folded)
+        ]
+
+    def _indexes(self):
+        """Return the indexes and the scheduler kept up to date with the notes."""
+        return [
+            index
+            for index in (self.substring_index, self.mention_index, self.reminders)
+            if index is not None
+        ]
+
+    def _index_changed(self, note):
+        """Tell the indexes about an added or edited note."""
+        for index in self._indexes():
+            index.changed(note)
+
+    def _index_replaced(self, old_notes, new_notes):
+        """Tell the indexes about the notes added and removed by replacing the notes."""
+        for index in self._indexes():
+            index.replaced(old_notes, new_notes)
+
+    def _packed_notes(self, notes):
+        """Return the shadows concatenated and the field offsets, once per generation."""
+        generation, text, offsets = self._packed
+        if generation != self.generation or len(offsets) != 2 * len(notes) + 1:
+            text, offsets = self._pack(
+                field for shadow in self._folded_notes(notes) for field in shadow[:2]
+            )
+            self._packed = (self.generation, text, offsets)
+        return text, offsets
+
+    def _packed_originals(self, notes):
+        """Return the titles and contents concatenated and the field offsets, once per generation."""
+        generation, text, offsets = self._originals
+        if generation != self.generation or len(offsets) != 2 * len(notes) + 1:
+            text, offsets = self._pack(
+                field for note in notes for field in (note.title, note.content)
+            )
+            self._originals = (self.generation, text, offsets)
+        return text, offsets
+
+    @staticmethod
+    def _pack(fields):
+        """Return fields concatenated and the start of each one, then the end."""
+        fields = list(fields)
+        offsets = [0]
+        offsets.extend(accumulate(map(len, fields)))
+        return "".join(fields), offsets
+
+    def _folded_notes(self, notes):
+        """Return the casefolded shadows of the notes, made once per generation."""
+        generation, shadows = self._shadows
+        if generation != self.generation or len(shadows) != len(notes):
+            shadows = [note.folded() for note in notes]
+            self._shadows = (self.generation, shadows)
+        return shadows
 
     def remove(self, title):
         """
@@ -100,7 +271,9 @@ class Notebook:
             if confirmation == "x":
                 return "Note deletion canceled."
             elif confirmation == "":
-                self.notes = [note for note in self.notes if note not in notes]
+                # Notes added while the prompt was shown are kept
+                with self.lock.write():
+                    self.notes = [note for note in self.notes if note not in notes]
                 return f"{len(notes)} note(s) deleted."
 
     def remove_all(self):
@@ -126,7 +299,8 @@ class Notebook:
             if confirmation == "x":
                 return "Note deletion canceled."
             elif confirmation == "":
-                self.notes = []
+                with self.lock.write():
+                    self.notes = []
                 return "All notes deleted."
 
     def update(self, title, new_note):
@@ -157,12 +331,18 @@ class Notebook:
             if confirmation == "x":
                 return "Note update canceled."
             elif confirmation == "":
-                current_note.title = new_note.title
-                current_note.content = new_note.content
-                current_note.tags = new_note.tags
-                current_note.due_date = new_note.due_date
+                with self.lock.write():
+                    current_note.title = new_note.title
+                    current_note.content = new_note.content
+                    current_note.tags = new_note.tags
+                    current_note.due_date = new_note.due_date
+                    current_note.recurrence = new_note.recurrence
+                    current_note.touch()
+                    self._index_changed(current_note)
+                    self.touch()
                 return "Note updated."
 
+    @reading
     def filter_by_tag(self, tag):
         """
         Filter notes by tag.
@@ -179,6 +359,7 @@ class Notebook:
                 result.append(note)
         return result
 
+    @reading
     def notes_due_in_days(self, days):
         """
         Get notes that are due in the next specified number of days.
@@ -189,13 +370,88 @@ class Notebook:
         Returns:
             list: List of notes that are due in the next specified number of days.
         """
+        return self._notes_due_by(self.notes, datetime.now() + timedelta(days=days))
+
+    @staticmethod
+    def _notes_due_by(notes, target_date):
+        """
+        Get the notes due by a date.
+
+        Repeating notes are listed once per occurrence from today, other notes are listed
+        if their due date is not later than the target date.
+        """
         result = []
-        target_date = datetime.now() + timedelta(days=days)
-        for note in self.notes:
-            if note.due_date and note.due_date <= target_date:
+        for note in notes:
+            if note.recurrence:
+                result.extend(
+                    note.occurrence(due_date)
+                    for due_date in note.occurrences(date.today(), target_date.date())
+                )
+            elif note.due_date and note.due_date <= target_date:
                 result.append(note)
         return result
 
+    @reading
+    def notes_due_between(self, start, end):
+        """
+        Get notes that are due in a date window.
+
+        Args:
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+
+        Returns:
+            list: List of notes due between start and end inclusive, in notebook order.
+                Repeating notes are listed once per occurrence in the window.
+        """
+        return self._occurrences_between(self._due_candidates(start, end), start, end)
+
+    @reading
+    def occurrences_between(self, start, end):
+        """
+        Yield the due dates of a date window in date order, computed lazily.
+
+        The occurrences of each note are generated one at a time and merged with
+        heapq.merge, so taking the first few only computes the first occurrence of each
+        note and as many later ones as are taken. Iterate the result under the read lock.
+
+        Args:
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+
+        Returns:
+            iterator: (due date, note) pairs, notes due at the same time in notebook
+                order. Repeating notes are listed once per occurrence in the window.
+        """
+        merged = heapq.merge(
+            *(
+                self._indexed_occurrences(index, note, start, end)
+                for index, note in enumerate(self._due_candidates(start, end))
+                if note.due_date is not None
+            )
+        )
+        return ((due_date, note) for due_date, _, note in merged)
+
+    def _due_candidates(self, start, end):
+        """Return the notes that may be due in a date window."""
+        return self.notes
+
+    @staticmethod
+    def _indexed_occurrences(index, note, start, end):
+        """Yield the due dates of a note in a date window with its notebook index."""
+        for due_date in note.occurrences(start, end):
+            yield due_date, index, note
+
+    @staticmethod
+    def _occurrences_between(notes, start, end):
+        """Get the notes or occurrences of repeating notes due in a date window."""
+        return [
+            note.occurrence(due_date)
+            for note in notes
+            for due_date in note.occurrences(start, end)
+        ]
+
+    @reading
     def to_dict(self):
         """
         Convert the Notebook instance to a dictionary.
@@ -224,6 +480,7 @@ class Notebook:
             notebook.notes.append(Note.from_dict(note_data))
         return notebook
 
+    @reading
     def save_to_file(self, filepath):
         """
         Save the Notebook instance to a file.
@@ -234,6 +491,24 @@ class Notebook:
         with open(filepath, "w", encoding="utf-8") as file:
             json.dump(self.to_dict(), file, ensure_ascii=False, indent=4)
 
+    @staticmethod
+    def iter_file(filepath):
+        """
+        Yield the notes stored in a file one at a time.
+
+        The file is decoded incrementally, so the raw document is never held in memory
+        next to the decoded notes.
+
+        Args:
+            filepath (str): The path to the notebook file, either {"notes": [...]} or a bare list.
+
+        Yields:
+            Note: The notes in file order.
+        """
+        with open(filepath, "r", encoding="utf-8") as file:
+            for note_data in JsonArrayStream(file, "notes"):
+                yield Note.from_dict(note_data)
+
     @staticmethod
     def load_from_file(filepath):
         """
@@ -245,15 +520,14 @@ class Notebook:
         Returns:
             Notebook: A Notebook instance loaded from the file.
         """
+        notebook = Notebook()
         try:
-            with open(filepath, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                if isinstance(data, list):
-                    data = {"notes": data}
-                return Notebook.from_dict(data)
+            notebook.notes.extend(Notebook.iter_file(filepath))
         except FileNotFoundError:
-            return Notebook()
+            pass
+        return notebook
 
+    @reading
     def print_all_notes(self):
         """
         Get a string representation of all notes in the notebook.
@@ -263,10 +537,7 @@ class Notebook:
         """
         if not self.notes:
             return "No notes available."
-        result = "\n"
-        for note in self.notes:
-            result += self._format_note_with_frame(note) + "\n\n"
-        return result.strip()
+        return "\n\n".join(note.frame() for note in self.notes)
 
     def format_notes_with_frame(self, notes):
         """
@@ -280,10 +551,7 @@ class Notebook:
         """
         if not notes:
             return "No notes found."
-        result = "\n"
-        for note in notes:
-            result += self._format_note_with_frame(note) + "\n\n"
-        return result.strip()
+        return "\n\n".join(note.frame() for note in notes)
 
     def _format_note_with_frame(self, note):
         """
@@ -295,12 +563,7 @@ class Notebook:
         Returns:
             str: String representation of the note with a decorative frame.
         """
-        lines = str(note).split("\n")
-        width = max(len(line) for line in lines)
-        frame = ["╔" + "═" * (width + 2) + "╗"]
-        frame += ["║ " + line.ljust(width) + " ║" for line in lines]
-        frame += ["╚" + "═" * (width + 2) + "╝"]
-        return "\n".join(frame)
+        return note.frame()
 
     def __str__(self):
         """
@@ -0,0 +1,237 @@
+"""
+A module containing the parallel scan of large notebooks.
+
+Searching notes is CPU-bound and a single thread scans them under the GIL. The notebook
+packs the titles and contents of its notes into one string with the field offsets, once
+per generation, and the scanner copies that string into a shared memory block, with no
+work per note, which worker processes started once scan in chunks in parallel:
+
+    block: field offsets (int64, two fields per note, one more for the end) | text
+
+The text is stored as UTF-32, four bytes per character, so the character offsets of the
+notebook locate the fields in the block and a chunk is decoded as one slice. Substring
+queries are matched on the casefolded text with find_in_fields, the way the serial
+search matches it. Regular expressions are matched on each field of the original text.
+The chunk results are merged in the original order of the notes.
+
+Classes:
+    ParallelScanner: Scans the notes of large notebooks in worker processes.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from contacts_assistant.constants import PARALLEL_SEARCH_THRESHOLD
+from contacts_assistant.note_query import compile_pattern, find_in_fields
+
+OFFSET_SIZE = array("q").itemsize
+# The text is stored as UTF-32, lone surrogates are kept as they are
+CHAR_SIZE = 4
+ENCODING = "utf-32-le"
+# Chunks per worker, more chunks even out notes of different lengths
+CHUNKS_PER_WORKER = 4
+
+# The block a worker process attached to last, by name
+_attached = {}
+
+
+def _attach(name):
+    """Return the shared memory block of a name, attaching to it on first use."""
+    block = _attached.get(name)
+    if block is None:
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        block = _attached[name] = SharedMemory(name)
+    return block
+
+
+def _scan_chunk(name, count, start, end, kind, query, flags):
+    """
+    Return the indexes of the matching notes of a chunk, run in a worker process.
+
+    Args:
+        name (str): The name of the shared memory block.
+        count (int): The number of notes in the block.
+        start (int): The index of the first note of the chunk.
+        end (int): The index after the last note of the chunk.
+        kind (str): "substring" or "regex".
+        query (str): The casefolded substring or the pattern.
+        flags (int): The flags of the pattern.
+
+    Returns:
+        list: The indexes of the matching notes, in order.
+    """
+    buffer = _attach(name).buf
+    header = OFFSET_SIZE * (2 * count + 1)
+    offsets = array("q")
+    offsets.frombytes(buffer[OFFSET_SIZE * 2 * start : OFFSET_SIZE * (2 * end + 1)])
+    base = offsets[0]
+    text = str(
+        buffer[header + CHAR_SIZE * base : header + CHAR_SIZE * offsets[-1]],
+        ENCODING,
+        "surrogatepass",
+    )
+    if kind == "substring":
+        return [start + note for note in find_in_fields(text, offsets, query, base)]
+    matches = []
+    search = compile_pattern(query, flags).search
+    for note in range(end - start):
+        for field in (2 * note, 2 * note + 1):
+            if search(text[offsets[field] - base : offsets[field + 1] - base]):
+                matches.append(start + note)
+                break
+    return matches
+
+
+class ParallelScanner:
+    """
+    Scans the notes of large notebooks in worker processes.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        threshold (int): The smallest number of notes scanned in parallel, smaller
+            notebooks are searched serially by the caller.
+        pool (ProcessPoolExecutor): The worker processes, started on first use.
+        blocks (dict): The packed notes by kind, as (generation, text, block).
+        lock (threading.Lock): Lets one search at a time use the workers and blocks.
+
+    Methods:
+        should_scan(count): Returns whether a number of notes is scanned in parallel.
+        find(text, offsets, generation, query): Returns the indexes of notes containing
+            a query.
+        find_pattern(text, offsets, generation, pattern, flags): Returns the indexes of
+            notes matching a regular expression.
+        close(): Stops the workers and frees the shared memory.
+    """
+
+    def __init__(self, workers=None, threshold=PARALLEL_SEARCH_THRESHOLD):
+        """
+        Initialize a scanner, no process is started yet.
+
+        Args:
+            workers (int, optional): The number of worker processes, one per CPU by default.
+            threshold (int, optional): The smallest number of notes scanned in parallel.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.pool = None
+        self.blocks = {}
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def should_scan(self, count):
+        """
+        Return whether a number of notes is scanned in parallel.
+
+        Args:
+            count (int): The number of notes.
+
+        Returns:
+            bool: True if there are several workers and at least threshold notes.
+        """
+        return self.workers > 1 and count >= self.threshold
+
+    def find(self, text, offsets, generation, query):
+        """
+        Return the indexes of the notes whose title or content contains a query.
+
+        Args:
+            text (str): The casefolded titles and contents of the notes, concatenated.
+            offsets (list): The start of each field in text and the end of the last one.
+            generation (int): The generation of the notebook, the text is copied to
+                shared memory again when it changes.
+            query (str): The casefolded query.
+
+        Returns:
+            list: The indexes of the matching notes, in order.
+        """
+        return self._scan(text, offsets, generation, "substring", query, 0)
+
+    def find_pattern(self, text, offsets, generation, pattern, flags=0):
+        """
+        Return the indexes of the notes whose title or content matches a regular expression.
+
+        Args:
+            text (str): The titles and contents of the notes as written, concatenated.
+            offsets (list): The start of each field in text and the end of the last one.
+            generation (int): The generation of the notebook.
+            pattern (str): The regular expression.
+            flags (int, optional): The re flags of the expression.
+
+        Returns:
+            list: The indexes of the matching notes, in order.
+        """
+        return self._scan(text, offsets, generation, "regex", pattern, flags)
+
+    def _scan(self, text, offsets, generation, kind, query, flags):
+        """Scan the packed fields in chunks and merge the results."""
+        with self.lock:
+            return self._scan_packed(
+                self._pack(text, offsets, generation, kind),
+                len(offsets) // 2,
+                kind,
+                query,
+                flags,
+            )
+
+    def _scan_packed(self, name, count, kind, query, flags):
+        """Scan a block in chunks and merge the results."""
+        if self.pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Forking a process with running threads is unsafe
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        size = -(-count // (self.workers * CHUNKS_PER_WORKER))
+        futures = [
+            self.pool.submit(
+                _scan_chunk,
+                name,
+                count,
+                start,
+                min(start + size, count),
+                kind,
+                query,
+                flags,
+            )
+            for start in range(0, count, size)
+        ]
+        return [index for future in futures for index in future.result()]
+
+    def _pack(self, text, offsets, generation, kind):
+        """Return the name of the block holding the packed text of a generation."""
+        packed = self.blocks.get(kind)
+        if packed and packed[0] == generation and packed[1] is text:
+            return packed[2].name
+        header = array("q", offsets).tobytes()
+        encoded = text.encode(ENCODING, "surrogatepass")
+        block = SharedMemory(create=True, size=max(len(header) + len(encoded), 1))
+        block.buf[: len(header)] = header
+        block.buf[len(header) : len(header) + len(encoded)] = encoded
+        self._free(kind)
+        self.blocks[kind] = (generation, text, block)
+        return block.name
+
+    def _free(self, kind):
+        """Free the block of a kind."""
+        packed = self.blocks.pop(kind, None)
+        if packed:
+            packed[2].close()
+            packed[2].unlink()
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for kind in list(self.blocks):
+            self._free(kind)
@@ -0,0 +1,326 @@
+"""
+A module containing the PartitionedNotebook class for storing notes in monthly partitions.
+
+Notes are stored in a directory with one file per creation month and a small manifest
+with per-partition summaries:
+
+    notebook/
+        manifest.json   {"version": 1, "partitions": {"2024-05": {...}, ...}}
+        2024-05.json    {"notes": [...]}, the same layout as notebook.json
+
+Each summary holds the number of notes, their tags, the earliest and latest due dates,
+whether any note repeats and the file size. Filters read only the partitions whose summaries could match, and saving
+rewrites only the partitions that changed.
+
+Classes:
+    PartitionedNotebook: A notebook whose notes are loaded and saved per partition.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from contacts_assistant.constants import DATE_FORMAT
+from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.rwlock import reading, writing
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class PartitionedNotebook(Notebook):
+    """
+    A notebook whose notes are loaded and saved per partition.
+
+    The notes attribute still exposes all notes as one sequence, loading every partition
+    on first use, so all Notebook methods keep working. It is a read-only tuple built
+    from the partitions: notes are changed through add, update and remove, or by
+    assigning a new list, which marks the partitions whose notes changed.
+
+    Attributes:
+        dirpath (str): The directory holding the partition files and the manifest.
+        manifest (dict): Summaries of the partitions stored on disk, by partition key.
+        partitions (dict): Loaded partitions, lists of notes by partition key.
+        dirty (set): Keys of partitions that changed since they were loaded.
+
+    Methods:
+        open(dirpath, legacy_filepath): Opens a partitioned notebook directory.
+        partition_key(note): Returns the partition key of a note.
+        add(note, suppress_message): Adds a note, loading only its partition.
+        update(title, new_note): Updates a note and marks its partition as changed.
+        filter_by_tag(tag): Filters notes, reading only partitions that contain the tag.
+        notes_due_in_days(days): Gets due notes, reading only partitions with early enough due dates.
+        notes_due_between(start, end): Gets notes due in a window, reading only overlapping
+            partitions (through _due_candidates).
+        save_to_file(dirpath): Saves the changed partitions and the manifest.
+    """
+
+    def __init__(self, dirpath=None):
+        """
+        Initialize an empty partitioned notebook.
+
+        Args:
+            dirpath (str, optional): The directory holding the partition files.
+        """
+        self.dirpath = dirpath
+        self.manifest = {}
+        self.partitions = {}
+        self.dirty = set()
+        super().__init__()
+
+    @staticmethod
+    def open(dirpath, legacy_filepath=None):
+        """
+        Open a partitioned notebook directory.
+
+        If the directory has no manifest yet, the notes of legacy_filepath are imported
+        and will be written to partitions on the next save.
+
+        Args:
+            dirpath (str): The directory holding the partition files.
+            legacy_filepath (str, optional): A notebook.json file to import.
+
+        Returns:
+            PartitionedNotebook: The opened notebook, no partition is read yet.
+        """
+        notebook = PartitionedNotebook(dirpath)
+        try:
+            with open(
+                os.path.join(dirpath, MANIFEST_FILENAME), "r", encoding="utf-8"
+            ) as file:
+                manifest = json.load(file)
+            if manifest.get("version", 1) > MANIFEST_VERSION:
+                raise ValueError(
+                    f"Unsupported notebook manifest version {manifest['version']}"
+                )
+            notebook.manifest = manifest["partitions"]
+        except FileNotFoundError:
+            if legacy_filepath and os.path.exists(legacy_filepath):
+                for note in Notebook.iter_file(legacy_filepath):
+                    notebook.partitions.setdefault(
+                        PartitionedNotebook.partition_key(note), []
+                    ).append(note)
+                notebook.dirty.update(notebook.partitions)
+        return notebook
+
+    @staticmethod
+    def partition_key(note):
+        """
+        Return the partition key of a note.
+
+        Args:
+            note (Note): The note.
+
+        Returns:
+            str: The creation month in YYYY-MM format.
+        """
+        return note.created_at.strftime("%Y-%m")
+
+    def _partition(self, key):
+        """Return the notes of a partition, reading its file on first use."""
+        notes = self.partitions.get(key)
+        if notes is None:
+            notes = []
+            if key in self.manifest:
+                notes.extend(
+                    Notebook.iter_file(
+                        os.path.join(self.dirpath, self.manifest[key]["file"])
+                    )
+                )
+            # Readers may load a partition at the same time, the first copy is kept
+            notes = self.partitions.setdefault(key, notes)
+        return notes
+
+    def _keys(self):
+        """Return all partition keys in chronological order."""
+        return sorted(set(self.manifest) | set(self.partitions))
+
+    def _matching_notes(self, could_match):
+        """Yield the notes of loaded partitions and of stored partitions whose summary could match."""
+        for key in self._keys():
+            if key in self.partitions or could_match(self.manifest[key]):
+                yield from self._partition(key)
+
+    @property
+    def notes(self):
+        """
+        All notes, ordered by partition.
+
+        Returns:
+            tuple: The notes of every partition, changes go through the notebook methods.
+        """
+        return tuple(note for key in self._keys() for note in self._partition(key))
+
+    @notes.setter
+    @writing
+    def notes(self, notes):
+        if self._indexes():
+            self._index_replaced(self.notes, notes)
+        grouped = {}
+        for note in notes:
+            grouped.setdefault(self.partition_key(note), []).append(note)
+        for key in set(self._keys()) | set(grouped):
+            new_notes = grouped.get(key, [])
+            old_notes = self._partition(key)
+            if len(old_notes) != len(new_notes) or any(
+                old is not new for old, new in zip(old_notes, new_notes)
+            ):
+                self.partitions[key] = new_notes
+                self.dirty.add(key)
+        self.touch()
+
+    @writing
+    def add(self, note, suppress_message=False):
+        """
+        Add a note to the notebook, loading only its partition.
+
+        Args:
+            note (Note): The note to add.
+            suppress_message (bool, optional): Suppress the "Note added" message if True.
+        """
+        key = self.partition_key(note)
+        self._partition(key).append(note)
+        self.dirty.add(key)
+        self._index_changed(note)
+        self.touch()
+        if not suppress_message:
+            return "Note added."
+
+    def update(self, title, new_note):
+        """
+        Update a note with a new note data and mark its partition as changed.
+
+        Args:
+            title (str): The title of the note to update.
+            new_note (Note): The new note data.
+
+        Returns:
+            str: Message indicating whether the note was updated or not.
+        """
+        notes = self.search(title)
+        result = super().update(title, new_note)
+        if notes and result == "Note updated.":
+            with self.lock.write():
+                self.dirty.add(self.partition_key(notes[0]))
+        return result
+
+    @reading
+    def filter_by_tag(self, tag):
+        """
+        Filter notes by tag, reading only partitions that contain the tag.
+
+        Args:
+            tag (str): The tag to filter by.
+
+        Returns:
+            list: List of notes with the specified tag.
+        """
+        return [
+            note
+            for note in self._matching_notes(lambda summary: tag in summary["tags"])
+            if tag in note.tags
+        ]
+
+    @reading
+    def notes_due_in_days(self, days):
+        """
+        Get notes due in the next days, reading only partitions with early enough due dates.
+
+        Args:
+            days (int): The number of days to look ahead for due notes.
+
+        Returns:
+            list: List of notes that are due in the next specified number of days.
+        """
+        target_date = datetime.now() + timedelta(days=days)
+
+        def could_match(summary):
+            return (
+                summary["due_min"] is not None
+                and DateHelper.parse_date(summary["due_min"]) <= target_date
+            )
+
+        return self._notes_due_by(self._matching_notes(could_match), target_date)
+
+    def _due_candidates(self, start, end):
+        """Return the notes of the partitions whose due dates overlap a date window."""
+
+        def could_match(summary):
+            # Repeating notes may have occurrences after the latest due date
+            return (
+                summary["due_min"] is not None
+                and DateHelper.parse_date(summary["due_min"]).date() <= end
+                and (
+                    summary.get("recurring")
+                    or DateHelper.parse_date(summary["due_max"]).date() >= start
+                )
+            )
+
+        return self._matching_notes(could_match)
+
+    def _summary(self, key, size):
+        """Build the manifest summary of a loaded partition."""
+        notes = self.partitions[key]
+        due_dates = [note.due_date for note in notes if note.due_date]
+        return {
+            "file": f"{key}.json",
+            "count": len(notes),
+            "tags": sorted({tag for note in notes for tag in note.tags}),
+            "due_min": min(due_dates).strftime(DATE_FORMAT) if due_dates else None,
+            "due_max": max(due_dates).strftime(DATE_FORMAT) if due_dates else None,
+            "recurring": any(note.recurrence for note in notes),
+            "size": size,
+        }
+
+    @writing
+    def save_to_file(self, dirpath=None):
+        """
+        Save the changed partitions and the manifest.
+
+        Partition files are written to a temporary file first and then moved in place.
+        Partitions that became empty are removed.
+
+        Args:
+            dirpath (str, optional): The directory to save to, the opened directory by default.
+        """
+        dirpath = dirpath or self.dirpath
+        if dirpath != self.dirpath:
+            # Saving to another directory writes every partition
+            for key in self._keys():
+                self._partition(key)
+            self.dirty.update(self.partitions)
+            self.dirpath = dirpath
+        if not self.dirty:
+            return
+        os.makedirs(dirpath, exist_ok=True)
+
+        for key in sorted(self.dirty):
+            filepath = os.path.join(dirpath, f"{key}.json")
+            notes = self.partitions.get(key, [])
+            if not notes:
+                self.partitions.pop(key, None)
+                self.manifest.pop(key, None)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                continue
+            with open(f"{filepath}.tmp", "w", encoding="utf-8") as file:
+                json.dump(
+                    {"notes": [note.to_dict() for note in notes]},
+                    file,
+                    ensure_ascii=False,
+                    indent=4,
+                )
+            os.replace(f"{filepath}.tmp", filepath)
+            self.manifest[key] = self._summary(key, os.path.getsize(filepath))
+
+        manifest_path = os.path.join(dirpath, MANIFEST_FILENAME)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "partitions": self.manifest},
+                file,
+                ensure_ascii=False,
+                indent=4,
+            )
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        self.dirty.clear()
@@ -0,0 +1,298 @@
+"""
+A module containing an immutable hash array mapped trie.
+
+A PersistentMap is never changed: set() and delete() return a new map that shares all
+nodes but the ones on the path to the key, so a change copies at most one node of up to
+32 entries per level, about log32(n) levels. Keeping a reference to a map is therefore a
+free point-in-time snapshot, and any number of threads may read it without locks.
+
+Like a dict, the map iterates in insertion order, a key set again keeps its position. Each
+leaf carries an insertion number and iteration sorts the leaves by it.
+
+Classes:
+    PersistentMap: An immutable mapping with cheap updated copies.
+"""
+
+from collections.abc import Mapping
+from operator import itemgetter
+
+# Bits of the hash used per level, each node has up to 2**BITS slots
+BITS = 5
+MASK = (1 << BITS) - 1
+HASH_MASK = (1 << 64) - 1
+
+
+class _Node:
+    """A trie node, the slots hold (hash, key, value, order) leaves, nodes and collisions."""
+
+    __slots__ = ("bitmap", "slots")
+
+    def __init__(self, bitmap, slots):
+        self.bitmap = bitmap
+        self.slots = slots
+
+
+class _Collision:
+    """The leaves of keys with the same hash."""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, key_hash, leaves):
+        self.hash = key_hash
+        self.leaves = leaves
+
+
+_EMPTY = _Node(0, ())
+
+
+def _hash(key):
+    return hash(key) & HASH_MASK
+
+
+def _slot(bitmap, bit):
+    """Return the slot of a bit, the number of bits set below it."""
+    # int.bit_count() would need Python 3.10
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+def _entry_hash(entry):
+    return entry.hash if type(entry) is _Collision else entry[0]
+
+
+def _merge(shift, first, second):
+    """Return a node holding two entries with different keys."""
+    first_hash, second_hash = _entry_hash(first), _entry_hash(second)
+    if first_hash == second_hash:
+        return _Collision(first_hash, (first, second))
+    first_index = (first_hash >> shift) & MASK
+    second_index = (second_hash >> shift) & MASK
+    if first_index == second_index:
+        return _Node(1 << first_index, (_merge(shift + BITS, first, second),))
+    if first_index > second_index:
+        first, second = second, first
+    return _Node((1 << first_index) | (1 << second_index), (first, second))
+
+
+def _set(node, shift, leaf):
+    """Return the node with the leaf set and whether the key is new."""
+    bit = 1 << ((leaf[0] >> shift) & MASK)
+    index = _slot(node.bitmap, bit)
+    slots = node.slots
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, slots[:index] + (leaf,) + slots[index:]), True
+    entry = slots[index]
+    if type(entry) is _Node:
+        entry, added = _set(entry, shift + BITS, leaf)
+    elif type(entry) is _Collision:
+        if entry.hash != leaf[0]:
+            entry, added = _merge(shift + BITS, entry, leaf), True
+        else:
+            leaves = tuple(old for old in entry.leaves if old[1] != leaf[1])
+            added = len(leaves) == len(entry.leaves)
+            if not added:
+                old = next(old for old in entry.leaves if old[1] == leaf[1])
+                leaf = leaf[:3] + (old[3],)
+            entry = _Collision(entry.hash, leaves + (leaf,))
+    elif entry[0] == leaf[0] and (entry[1] is leaf[1] or entry[1] == leaf[1]):
+        entry, added = leaf[:3] + (entry[3],), False
+    else:
+        entry, added = _merge(shift + BITS, entry, leaf), True
+    return _Node(node.bitmap, slots[:index] + (entry,) + slots[index + 1 :]), added
+
+
+def _delete(node, shift, key_hash, key):
+    """
+    Return the node without the key, the node itself if the key is missing, None if the
+    node became empty or its only remaining leaf, which the parent stores in its place.
+    """
+    bit = 1 << ((key_hash >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node
+    index = _slot(node.bitmap, bit)
+    entry = node.slots[index]
+    if type(entry) is _Node:
+        new_entry = _delete(entry, shift + BITS, key_hash, key)
+    elif type(entry) is _Collision:
+        if entry.hash != key_hash:
+            return node
+        leaves = tuple(leaf for leaf in entry.leaves if leaf[1] != key)
+        if len(leaves) == len(entry.leaves):
+            return node
+        new_entry = leaves[0] if len(leaves) == 1 else _Collision(key_hash, leaves)
+    elif entry[0] == key_hash and (entry[1] is key or entry[1] == key):
+        new_entry = None
+    else:
+        return node
+    if new_entry is entry:
+        return node
+    if new_entry is None:
+        slots = node.slots[:index] + node.slots[index + 1 :]
+        if not slots:
+            return None
+        if len(slots) == 1 and type(slots[0]) is not _Node and shift:
+            return slots[0]
+        return _Node(node.bitmap & ~bit, slots)
+    if len(node.slots) == 1 and type(new_entry) is not _Node and shift:
+        return new_entry
+    return _Node(
+        node.bitmap, node.slots[:index] + (new_entry,) + node.slots[index + 1 :]
+    )
+
+
+def _build(leaves, shift):
+    """Build a node from leaves with distinct keys whose hashes agree below shift."""
+    if len(leaves) == 1:
+        return leaves[0]
+    if shift >= 64:
+        return _Collision(leaves[0][0], tuple(leaves))
+    buckets = {}
+    for leaf in leaves:
+        buckets.setdefault((leaf[0] >> shift) & MASK, []).append(leaf)
+    bitmap = 0
+    for index in buckets:
+        bitmap |= 1 << index
+    return _Node(
+        bitmap,
+        tuple(_build(buckets[index], shift + BITS) for index in sorted(buckets)),
+    )
+
+
+class PersistentMap(Mapping):
+    """
+    An immutable mapping with cheap updated copies.
+
+    Methods:
+        from_items(items): Builds a map from key and value pairs.
+        set(key, value): Returns a map with a key set.
+        delete(key): Returns a map without a key.
+    """
+
+    __slots__ = ("_root", "_size", "_next")
+
+    def __init__(self, root=_EMPTY, size=0, next_order=0):
+        """
+        Initialize a map from a trie root, an empty map by default.
+
+        Args:
+            root (_Node, optional): The root node.
+            size (int, optional): The number of keys under the root.
+            next_order (int, optional): The insertion number of the next new key.
+        """
+        self._root = root
+        self._size = size
+        self._next = next_order
+
+    @staticmethod
+    def from_items(items):
+        """
+        Build a map from key and value pairs in one pass.
+
+        Args:
+            items (iterable): (key, value) pairs with distinct keys.
+
+        Returns:
+            PersistentMap: The new map.
+        """
+        leaves = [
+            (_hash(key), key, value, order) for order, (key, value) in enumerate(items)
+        ]
+        if not leaves:
+            return PersistentMap()
+        root = _build(leaves, 0)
+        if type(root) is not _Node:
+            root = _Node(1 << (leaves[0][0] & MASK), (root,))
+        return PersistentMap(root, len(leaves), len(leaves))
+
+    def set(self, key, value):
+        """
+        Return a map with a key set.
+
+        Args:
+            key: The key.
+            value: The value.
+
+        Returns:
+            PersistentMap: The new map, this map is not changed.
+        """
+        root, added = _set(self._root, 0, (_hash(key), key, value, self._next))
+        return PersistentMap(root, self._size + added, self._next + added)
+
+    def delete(self, key):
+        """
+        Return a map without a key.
+
+        Args:
+            key: The key.
+
+        Returns:
+            PersistentMap: The new map, or this map if the key is missing.
+        """
+        root = _delete(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        if root is None:
+            return PersistentMap()
+        if type(root) is not _Node:
+            root = _Node(1 << (_entry_hash(root) & MASK), (root,))
+        return PersistentMap(root, self._size - 1, self._next)
+
+    def __getitem__(self, key):
+        key_hash = _hash(key)
+        node = self._root
+        shift = 0
+        while True:
+            bit = 1 << ((key_hash >> shift) & MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            entry = node.slots[_slot(node.bitmap, bit)]
+            if type(entry) is _Node:
+                node = entry
+                shift += BITS
+                continue
+            if type(entry) is _Collision:
+                for leaf in entry.leaves:
+                    if leaf[1] == key:
+                        return leaf[2]
+            elif entry[0] == key_hash and (entry[1] is key or entry[1] == key):
+                return entry[2]
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def _leaves(self):
+        """Return the (hash, key, value, order) leaves in insertion order."""
+        return sorted(self._trie_leaves(), key=itemgetter(3))
+
+    def _trie_leaves(self):
+        """Yield the leaves in trie order."""
+        stack = [iter(self._root.slots)]
+        while stack:
+            for entry in stack[-1]:
+                if type(entry) is _Node:
+                    stack.append(iter(entry.slots))
+                    break
+                if type(entry) is _Collision:
+                    yield from entry.leaves
+                else:
+                    yield entry
+            else:
+                stack.pop()
+
+    def __iter__(self):
+        return (leaf[1] for leaf in self._leaves())
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        """Yield the values in insertion order."""
+        return (leaf[2] for leaf in self._leaves())
+
+    def items(self):
+        """Yield the (key, value) pairs in insertion order."""
+        return ((leaf[1], leaf[2]) for leaf in self._leaves())
@@ -25,6 +25,8 @@ class Phone(Field):
         validate_number(number): Validates the phone number format.
     """
 
+    __slots__ = ()
+
     def __init__(self, number):
         """
         Initializes the Phone instance with the given phone number.
@@ -0,0 +1,136 @@
+"""
+A module containing the session profiler.
+
+CPU time is captured with cProfile and written as a pstats file, which can be explored
+with `python -m pstats` or snakeviz. Allocations are traced with tracemalloc and the lines
+allocating the most memory are written as a text report.
+
+Classes:
+    Profiler: A class capturing CPU and memory profiles of a session or a few commands.
+"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+from contacts_assistant.constants import PROFILE_FILENAME
+
+# Files whose allocations are left out of the memory report
+IGNORED_ALLOCATIONS = (
+    "<frozen importlib._bootstrap>",
+    "<unknown>",
+    tracemalloc.__file__,
+    cProfile.__file__,
+)
+
+
+class Profiler:
+    """
+    A class capturing CPU and memory profiles of a session or a few commands.
+
+    Attributes:
+        profile_path (str): The pstats file to write, or None to skip CPU profiling.
+        memory_path (str): The allocation report to write, or None to skip memory tracing.
+        top (int): The number of functions and allocation sites in the summaries.
+        profile (cProfile.Profile): The running CPU profile, or None.
+        tracing (bool): True while allocations are traced.
+
+    Methods:
+        active: True while a capture is running.
+        start(): Starts capturing.
+        stop(): Stops capturing, writes the reports and returns a summary.
+    """
+
+    def __init__(self, profile_path=None, memory_path=None, top=15):
+        """
+        Initialize a stopped profiler.
+
+        Args:
+            profile_path (str, optional): The pstats file to write.
+            memory_path (str, optional): The allocation report to write.
+            top (int, optional): The number of entries in the summaries.
+        """
+        self.profile_path = profile_path
+        self.memory_path = memory_path
+        self.top = top
+        self.profile = None
+        self.tracing = False
+
+    @property
+    def active(self):
+        """
+        Return True while a capture is running.
+        """
+        return self.profile is not None or self.tracing
+
+    def start(self):
+        """
+        Start capturing.
+
+        Without output paths, the CPU profile is written to PROFILE_FILENAME.
+
+        Raises:
+            ValueError: If a capture is already running.
+        """
+        if self.active:
+            raise ValueError("Profiling is already on.")
+        if not self.profile_path and not self.memory_path:
+            self.profile_path = PROFILE_FILENAME
+        if self.memory_path:
+            tracemalloc.start()
+            self.tracing = True
+        if self.profile_path:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self):
+        """
+        Stop capturing and write the reports.
+
+        Returns:
+            str: The slowest functions by cumulative time, the largest allocation sites and
+                the paths of the reports.
+
+        Raises:
+            ValueError: If no capture is running.
+        """
+        if not self.active:
+            raise ValueError("Profiling is off.")
+        if self.profile is not None:
+            self.profile.disable()
+        # The allocation report is written first so it leaves out the pstats processing
+        summary = []
+        if self.tracing:
+            summary.append(self._write_memory())
+            tracemalloc.stop()
+            self.tracing = False
+        if self.profile is not None:
+            summary.insert(0, self._write_profile())
+            self.profile = None
+        return "\n\n".join(summary)
+
+    def _write_profile(self):
+        """Write the pstats file and return the slowest functions."""
+        self.profile.dump_stats(self.profile_path)
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return f"{stream.getvalue().strip()}\n\nProfile saved to {self.profile_path}"
+
+    def _write_memory(self):
+        """Write the allocation report and return its first lines."""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_ALLOCATIONS]
+        )
+        statistics = snapshot.statistics("lineno")
+        lines = [
+            f"Traced memory: {current / 1024:.1f} KiB current, {peak / 1024:.1f} KiB peak",
+            "Allocation sites by size:",
+        ]
+        lines += [f"{index}. {stat}" for index, stat in enumerate(statistics, 1)]
+        with open(self.memory_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        summary = "\n".join(lines[: self.top + 2])
+        return f"{summary}\n\nAllocation report saved to {self.memory_path}"
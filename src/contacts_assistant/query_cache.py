@@ -0,0 +1,137 @@
+"""
+A module containing the query result cache.
+
+Read commands such as search_notes or show_all_contacts are answered from a least recently
+used cache of their rendered output. The contacts book and the notebook carry a generation
+number that every mutation replaces with a new one from a process-wide counter, and the
+generations of the stores a query reads are part of its cache key. A mutation therefore
+makes every older result unreachable at once, nothing has to be looked up to invalidate
+it, and the unreachable results age out of the cache.
+
+Classes:
+    QueryCache: A least recently used cache of query results with hit and miss counters.
+
+Functions:
+    next_generation(): Returns a new store generation number.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+
+from contacts_assistant.constants import QUERY_CACHE_SIZE
+
+# Shared by all stores, so two stores never have the same generation
+_generations = itertools.count(1)
+
+
+def next_generation():
+    """
+    Return a new store generation number.
+
+    Returns:
+        int: A number never returned before in this process.
+    """
+    return next(_generations)
+
+
+class QueryCache:
+    """
+    A least recently used cache of query results with hit and miss counters.
+
+    Attributes:
+        maxsize (int): The maximum number of results kept, 0 to disable the cache.
+        entries (OrderedDict): The results by key, least recently used first.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that computed the result.
+        lock (threading.Lock): Guards the entries and counters, results are computed
+            outside of it.
+
+    Methods:
+        get_or_compute(key, compute): Returns the cached result of a key or computes it.
+        clear(): Drops the results and resets the counters.
+        stats(): Returns the counters, the hit rate and the size.
+        report(): Returns the counters as text.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): The maximum number of results kept, 0 to disable the cache.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result of a key or compute and cache it.
+
+        Exceptions raised by compute are not cached.
+
+        Args:
+            key (tuple): A hashable key including the generations of the stores read.
+            compute (callable): The function returning the result.
+
+        Returns:
+            The result.
+        """
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return value
+        value = compute()
+        if self.maxsize > 0:
+            with self.lock:
+                self.entries[key] = value
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Drop the results and reset the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the counters, the hit rate and the size.
+
+        Returns:
+            dict: The hits, misses, hit rate from 0 to 1, number of results and maximum size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+    def report(self):
+        """
+        Return the counters as text.
+
+        Returns:
+            str: The hits, misses, hit rate and size of the cache.
+        """
+        stats = self.stats()
+        return (
+            f"Query cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+            f"hit rate {stats['hit_rate']:.1%}, "
+            f"{stats['size']} of {stats['maxsize']} result(s) cached."
+        )
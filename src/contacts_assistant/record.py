@@ -8,14 +8,24 @@ Classes:
     Record: A class to represent a contact record.
 """
 
+from copy import copy
+
 from contacts_assistant.phone import Phone
 from contacts_assistant.name import Name
 from contacts_assistant.birthday import Birthday
 from contacts_assistant.contact_email import Email
-from contacts_assistant.address import Address, AddressType
-
-
-class Record:
+from contacts_assistant.address import (
+    Address,
+    AddressType,
+    City,
+    Country,
+    PostalCode,
+    Street,
+)
+from contacts_assistant.slotted import VersionedSlotted
+
+
+class Record(VersionedSlotted):
     """
     A class to represent a contact record.
 
@@ -23,10 +33,13 @@ class Record:
         name (Name): The name of the contact.
         phones (list): A list of phone numbers associated with the contact.
         birthday (Birthday): The birthday of the contact.
+        version (int): The number of changes made through the Record methods.
 
     Methods:
         __init__(name): Initializes the Record with a given name.
         __str__(): Returns a string representation of the contact record.
+        cells(): Returns the fields of the contact record as strings.
+        copy(): Returns a copy that can be edited without changing this record.
         add_phone(number): Adds a phone number to the contact record.
         remove_phone(number): Removes a phone number from the contact record.
         edit_phone(old_number, new_number): Edits a phone number in the contact record.
@@ -34,6 +47,8 @@ class Record:
         add_birthday(date): Adds a birthday to the contact record.
     """
 
+    __slots__ = ("name", "phones", "birthday", "email", "addresses", "_text", "_cells")
+
     def __init__(self, name):
         """
         Initializes the Record instance with the given name.
@@ -51,23 +66,73 @@ class Record:
         """
         Returns a string representation of the contact record.
 
+        The string is rendered once per version of the record.
+
         Returns:
             str: A string containing the name, phone numbers, and birthday of the contact.
         """
-        result = f"Contact name: {self.name.value}, phones: {'; '.join(p.value for p in self.phones)}"
+        return self._cached("_text", self._render)
+
+    def _render(self):
+        """Build the string representation from the cells."""
+        name, phones, email, birthday, addresses = self.cells()
+        parts = [f"Contact name: {name}, phones: {'; '.join(phones)}"]
+        if email:
+            parts.append(f"email: {email}")
+        if birthday:
+            parts.append(f"birthday: {birthday}")
+        if addresses:
+            parts.append(
+                "addresses: "
+                + ", ".join(f"{addr_type}: {address}" for addr_type, address in addresses)
+            )
+        return ", ".join(parts)
+
+    def cells(self):
+        """
+        Returns the fields of the contact record as strings.
 
-        if self.email:
-            result += f", email: {self.email}"
+        The cells are rendered once per version of the record, so listings of a book
+        only pad and join them.
 
-        if self.birthday:
-            result += f", birthday: {self.birthday}"
+        Returns:
+            tuple: The name, a tuple of phone numbers, the email and birthday ("" if not
+                set) and a tuple of (address type, address) pairs.
+        """
+        return self._cached("_cells", self._render_cells)
+
+    def _render_cells(self):
+        """Convert the fields to strings."""
+        return (
+            str(self.name),
+            tuple(str(phone) for phone in self.phones),
+            str(self.email) if self.email else "",
+            str(self.birthday) if self.birthday else "",
+            tuple(
+                (addr_type.value, str(address))
+                for addr_type, address in self.addresses.items()
+            ),
+        )
+
+    def copy(self):
+        """
+        Returns a copy that can be edited without changing this record.
 
-        if self.addresses:
-            result += ", addresses: "
-            for addr_type, address in self.addresses.items():
-                result += f"{addr_type.value}: {address}, "
-            result = result[:-2]  # Remove trailing comma and space
-        return result
+        Fields replaced on edit are shared, the phone list and the addresses are copied.
+
+        Returns:
+            Record: The copy.
+        """
+        record = Record.__new__(Record)
+        record.name = self.name
+        record.phones = list(self.phones)
+        record.birthday = self.birthday
+        record.email = self.email
+        record.addresses = {
+            address_type: copy(address)
+            for address_type, address in self.addresses.items()
+        }
+        return record
 
     def add_phone(self, number: str):
         """
@@ -77,6 +142,7 @@ class Record:
             number (str): The phone number to be added.
         """
         self.phones.append(Phone(number))
+        self.touch()
 
     def remove_phone(self, number: str):
         """
@@ -86,6 +152,7 @@ class Record:
             number (str): The phone number to be removed.
         """
         self.phones = list(filter(lambda phone: phone == number, self.phones))
+        self.touch()
 
     def edit_phone(self, old_number: str, new_number: str):
         """
@@ -102,6 +169,7 @@ class Record:
         for i, phone in enumerate(self.phones):
             if phone.value == old_number:
                 self.phones[i] = Phone(new_number)
+                self.touch()
                 found = True
                 break
         if not found:
@@ -131,6 +199,7 @@ class Record:
             date (str): The birthday date string in the format specified by DATE_FORMAT: "%d.%m.%Y".
         """
         self.birthday = Birthday(date)
+        self.touch()
 
     def add_email(self, email: str):
         """
@@ -143,6 +212,7 @@ class Record:
             ValueError: If the email address format is invalid.
         """
         self.email = Email(email)
+        self.touch()
 
     def add_address(
         self,
@@ -163,6 +233,7 @@ class Record:
             country (str, optional): The country.
         """
         self.addresses[address_type] = Address(street, city, postal_code, country)
+        self.touch()
 
     def edit_address(
         self,
@@ -187,14 +258,16 @@ class Record:
         """
         if address_type in self.addresses:
             address = self.addresses[address_type]
+            # The parts are wrapped in the same fields as in add_address
             if street is not None:
-                address.street = street
+                address.street = Street(street)
             if city is not None:
-                address.city = city
+                address.city = City(city)
             if postal_code is not None:
-                address.postal_code = postal_code
+                address.postal_code = PostalCode(postal_code)
             if country is not None:
-                address.country = country
+                address.country = Country(country)
+            self.touch()
         else:
             raise ValueError("No address exists to edit.")
 
@@ -207,3 +280,4 @@ class Record:
         """
         if address_type in self.addresses:
             del self.addresses[address_type]
+            self.touch()
@@ -0,0 +1,212 @@
+"""
+A module containing the Recurrence class for repeating notes.
+
+A recurrence rule is written as a frequency followed by optional settings separated by
+semicolons, e.g. "weekly", "monthly;interval=3" or "daily;interval=2;until=31.12.2025;count=10".
+
+Occurrences are computed from the first due date on demand, so a repeating note is stored
+once whatever the number of its occurrences.
+
+Classes:
+    Recurrence: A class to represent a recurrence rule.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+from contacts_assistant.constants import DATE_FORMAT
+from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.slotted import Slotted
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+
+class Recurrence(Slotted):
+    """
+    A class to represent a recurrence rule.
+
+    Attributes:
+        frequency (str): One of "daily", "weekly", "monthly" or "yearly".
+        interval (int): The number of frequency units between occurrences.
+        until (datetime): The last day an occurrence may fall on, or None.
+        count (int): The maximum number of occurrences, or None.
+
+    Methods:
+        __init__(frequency, interval, until, count): Initializes a Recurrence instance.
+        parse(text): Creates a Recurrence instance from a rule string.
+        to_dict(): Converts the Recurrence instance to a dictionary.
+        from_dict(data): Creates a Recurrence instance from a dictionary.
+        occurrence(start, index): Returns an occurrence by its index.
+        occurrences(start, first_day, last_day): Yields the occurrences of a window.
+        __str__(): Gets the rule string of the Recurrence instance.
+    """
+
+    __slots__ = ("frequency", "interval", "until", "count")
+
+    def __init__(self, frequency, interval=1, until=None, count=None):
+        """
+        Initialize a Recurrence instance.
+
+        Args:
+            frequency (str): One of "daily", "weekly", "monthly" or "yearly".
+            interval (int, optional): The number of frequency units between occurrences.
+            until (datetime, optional): The last day an occurrence may fall on.
+            count (int, optional): The maximum number of occurrences.
+
+        Raises:
+            ValueError: If the frequency is unknown or interval or count is not positive.
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(
+                f"Invalid recurrence '{frequency}'. Use one of: {', '.join(FREQUENCIES)}"
+            )
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Recurrence interval and count should be positive numbers")
+        self.frequency = frequency
+        self.interval = interval
+        self.until = until
+        self.count = count
+
+    @staticmethod
+    def parse(text):
+        """
+        Create a Recurrence instance from a rule string.
+
+        Args:
+            text (str): The rule, e.g. "weekly;interval=2;until=31.12.2025".
+
+        Returns:
+            Recurrence: The parsed rule.
+
+        Raises:
+            ValueError: If the rule is not valid.
+        """
+        frequency, *settings = [part.strip() for part in text.lower().split(";")]
+        options = {}
+        for setting in settings:
+            key, _, value = setting.partition("=")
+            if key in ("interval", "count") and value.isdigit():
+                options[key] = int(value)
+            elif key == "until" and value:
+                options[key] = DateHelper.parse_date(value)
+            else:
+                raise ValueError(
+                    f"Invalid recurrence setting '{setting}'. "
+                    "Use interval=N, until=DD.MM.YYYY or count=N"
+                )
+        return Recurrence(frequency, **options)
+
+    def to_dict(self):
+        """
+        Convert the Recurrence instance to a dictionary.
+
+        Returns:
+            dict: Dictionary representation of the Recurrence instance.
+        """
+        return {
+            "frequency": self.frequency,
+            "interval": self.interval,
+            "until": self.until.strftime(DATE_FORMAT) if self.until else None,
+            "count": self.count,
+        }
+
+    @staticmethod
+    def from_dict(data):
+        """
+        Create a Recurrence instance from a dictionary.
+
+        Args:
+            data (dict): Dictionary containing the rule.
+
+        Returns:
+            Recurrence: A Recurrence instance created from the dictionary data.
+        """
+        until = data.get("until")
+        return Recurrence(
+            data["frequency"],
+            data.get("interval") or 1,
+            DateHelper.parse_date(until) if until else None,
+            data.get("count"),
+        )
+
+    def occurrence(self, start: datetime, index):
+        """
+        Return an occurrence by its index.
+
+        Monthly and yearly occurrences are counted from the start date, a day that does
+        not exist in a month is moved to the last day of that month.
+
+        Args:
+            start (datetime): The first occurrence.
+            index (int): The index of the occurrence, 0 for the first one.
+
+        Returns:
+            datetime: The occurrence, ignoring the until and count limits.
+        """
+        if self.frequency == "daily":
+            return start + timedelta(days=index * self.interval)
+        if self.frequency == "weekly":
+            return start + timedelta(weeks=index * self.interval)
+        months = index * self.interval * (12 if self.frequency == "yearly" else 1)
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        day = min(start.day, calendar.monthrange(year, month + 1)[1])
+        return start.replace(year=year, month=month + 1, day=day)
+
+    def _first_index(self, start: datetime, first_day: date):
+        """Return the index of the first occurrence on or after a day."""
+        days = (first_day - start.date()).days
+        if days <= 0:
+            return 0
+        if self.frequency == "daily":
+            return -(-days // self.interval)
+        if self.frequency == "weekly":
+            return -(-days // (7 * self.interval))
+        months = (first_day.year - start.year) * 12 + first_day.month - start.month
+        if self.frequency == "yearly":
+            months //= 12
+        index = max(0, months // self.interval - 1)
+        while self.occurrence(start, index).date() < first_day:
+            index += 1
+        return index
+
+    def occurrences(self, start: datetime, first_day: date, last_day: date):
+        """
+        Yield the occurrences of a window.
+
+        The first occurrence of the window is computed directly, so earlier occurrences
+        are never generated.
+
+        Args:
+            start (datetime): The first occurrence.
+            first_day (date): The first day of the window.
+            last_day (date): The last day of the window.
+
+        Yields:
+            datetime: The occurrences in the window in date order.
+        """
+        if self.until:
+            last_day = min(last_day, self.until.date())
+        index = self._first_index(start, first_day)
+        while self.count is None or index < self.count:
+            occurrence = self.occurrence(start, index)
+            if occurrence.date() > last_day:
+                return
+            yield occurrence
+            index += 1
+
+    def __str__(self):
+        """
+        Get the rule string of the Recurrence instance.
+
+        Returns:
+            str: The rule, e.g. "weekly;interval=2".
+        """
+        parts = [self.frequency]
+        if self.interval != 1:
+            parts.append(f"interval={self.interval}")
+        if self.until:
+            parts.append(f"until={self.until.strftime(DATE_FORMAT)}")
+        if self.count:
+            parts.append(f"count={self.count}")
+        return ";".join(parts)
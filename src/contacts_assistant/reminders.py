@@ -0,0 +1,462 @@
+"""
+A module containing the reminder scheduler for long-running sessions.
+
+Due notes and birthdays are kept in a hierarchical timer wheel with one-minute ticks.
+Scheduling and cancelling a reminder are O(1), and each tick only looks at the reminders
+that fall due in it, so the contacts book and the notebook are never polled. Reminders are
+printed to the console or passed to a local hook script.
+
+Classes:
+    Reminder: A named tuple describing a fired reminder.
+    TimerWheel: A hierarchical hashed timer wheel.
+    ConsoleNotifier: A class printing reminders to the console.
+    HookNotifier: A class running a script for each reminder.
+    ReminderScheduler: A class scheduling reminders for due notes and birthdays.
+"""
+
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+
+from contacts_assistant.constants import DATE_FORMAT
+from contacts_assistant.date_helpers import DateHelper
+
+# Length of a wheel tick in seconds
+TICK_SECONDS = 60
+
+Reminder = namedtuple("Reminder", ["kind", "date", "title", "message"])
+
+
+class TimerWheel:
+    """
+    A hierarchical hashed timer wheel.
+
+    Level l has slots of slots**l ticks each. A timer is stored in the lowest level whose
+    span covers its distance from the current tick and moves down a level each time the
+    wheel above turns, so inserting and cancelling never scan other timers.
+
+    Attributes:
+        slots (int): The number of slots of each level.
+        current (int): The current tick.
+        wheels (list): The slots of each level, dictionaries of timers by key.
+        positions (dict): The level and slot of each timer by key, level -1 for overdue timers.
+        overdue (dict): Timers whose deadline had passed when they were inserted.
+
+    Methods:
+        insert(key, deadline, payload): Schedules or reschedules a timer.
+        cancel(key): Cancels a timer.
+        advance(tick): Moves the wheel to a tick and returns the expired timers.
+    """
+
+    def __init__(self, current, slots=64, levels=4):
+        """
+        Initialize an empty wheel.
+
+        Args:
+            current (int): The current tick.
+            slots (int, optional): The number of slots of each level.
+            levels (int, optional): The number of levels.
+        """
+        self.slots = slots
+        self.levels = levels
+        self.current = current
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.positions = {}
+        self.overdue = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def _place(self, key, deadline, payload):
+        """Store a timer in the level covering its distance from the current tick."""
+        distance = deadline - self.current
+        if distance <= 0:
+            self.overdue[key] = (deadline, payload)
+            self.positions[key] = (-1, None)
+            return
+        level, span = 0, self.slots
+        while distance >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+        slot = deadline // (span // self.slots) % self.slots
+        self.wheels[level][slot][key] = (deadline, payload)
+        self.positions[key] = (level, slot)
+
+    def insert(self, key, deadline, payload):
+        """
+        Schedule or reschedule a timer.
+
+        Args:
+            key (hashable): The timer key, an existing timer with the key is replaced.
+            deadline (int): The tick the timer expires at.
+            payload (object): The value returned when the timer expires.
+        """
+        self.cancel(key)
+        self._place(key, deadline, payload)
+
+    def cancel(self, key):
+        """
+        Cancel a timer.
+
+        Args:
+            key (hashable): The timer key.
+
+        Returns:
+            bool: True if the timer was scheduled.
+        """
+        position = self.positions.pop(key, None)
+        if position is None:
+            return False
+        level, slot = position
+        if level < 0:
+            del self.overdue[key]
+        else:
+            del self.wheels[level][slot][key]
+        return True
+
+    def advance(self, tick):
+        """
+        Move the wheel to a tick and return the expired timers.
+
+        Args:
+            tick (int): The new current tick.
+
+        Returns:
+            list: (key, deadline, payload) tuples of the expired timers in deadline order.
+        """
+        expired = []
+        while self.current < tick and self.positions:
+            self.current += 1
+            turned = 0
+            while (
+                turned < self.levels - 1
+                and self.current % self.slots ** (turned + 1) == 0
+            ):
+                turned += 1
+            # Cascade from the top so timers moved down are picked up by the lower levels
+            for level in range(turned, 0, -1):
+                span = self.slots**level
+                slot = self.wheels[level][self.current // span % self.slots]
+                timers = list(slot.items())
+                slot.clear()
+                for key, (deadline, payload) in timers:
+                    self._place(key, deadline, payload)
+            slot = self.wheels[0][self.current % self.slots]
+            if slot:
+                self.overdue.update(slot)
+                slot.clear()
+            if self.overdue:
+                for key, (deadline, payload) in self.overdue.items():
+                    del self.positions[key]
+                    expired.append((key, deadline, payload))
+                self.overdue.clear()
+        self.current = max(self.current, tick)
+        for key, (deadline, payload) in self.overdue.items():
+            del self.positions[key]
+            expired.append((key, deadline, payload))
+        self.overdue.clear()
+        expired.sort(key=lambda timer: timer[1])
+        return expired
+
+
+class ConsoleNotifier:
+    """
+    A class printing reminders to the console.
+    """
+
+    def __call__(self, reminder):
+        """
+        Print a reminder.
+
+        Args:
+            reminder (Reminder): The fired reminder.
+        """
+        print(f"\n[Reminder] {reminder.message}")
+
+
+class HookNotifier:
+    """
+    A class running a script for each reminder.
+
+    The script gets the reminder kind ("note" or "birthday"), the date in DD.MM.YYYY format
+    and the note title or contact name as arguments. It runs in the background.
+
+    Attributes:
+        command (str): The path of the script.
+    """
+
+    def __init__(self, command):
+        """
+        Initialize the notifier.
+
+        Args:
+            command (str): The path of the script.
+        """
+        self.command = command
+
+    def __call__(self, reminder):
+        """
+        Run the script for a reminder.
+
+        Args:
+            reminder (Reminder): The fired reminder.
+        """
+        subprocess.Popen(
+            [
+                self.command,
+                reminder.kind,
+                reminder.date.strftime(DATE_FORMAT),
+                reminder.title,
+            ]
+        )
+
+
+class ReminderScheduler:
+    """
+    A class scheduling reminders for due notes and birthdays.
+
+    Reminders fire at a fixed time of day on the due date or birthday. Birthday reminders
+    are rescheduled for the next year and repeating notes for their next occurrence once
+    they fire. Reminders whose time has already
+    passed today fire on the next tick.
+
+    Attributes:
+        notify (callable): The function called with each fired Reminder.
+        remind_at (time): The time of day reminders fire at.
+        clock (callable): The function returning the current time as a timestamp.
+        wheel (TimerWheel): The scheduled reminders.
+        lock (threading.RLock): The lock guarding the wheel.
+
+    Methods:
+        load(book, notebook): Schedules the reminders of all contacts and notes.
+        schedule_note(note): Schedules or reschedules the reminder of a note.
+        cancel_note(note): Cancels the reminder of a note.
+        cancel_notes(): Cancels the reminders of all notes.
+        changed(note): Reschedules a note added to or edited in the notebook.
+        replaced(old_notes, new_notes): Cancels the removed notes and schedules the added
+            notes of a notebook.
+        schedule_birthday(name, birthday): Schedules or reschedules the reminder of a birthday.
+        cancel_birthday(name): Cancels the reminder of a birthday.
+        run_pending(): Fires the reminders that are due.
+        start(): Starts firing reminders from a background thread.
+        stop(): Stops the background thread.
+    """
+
+    def __init__(self, notify, remind_at=dt_time(9, 0), clock=time.time):
+        """
+        Initialize the scheduler.
+
+        Args:
+            notify (callable): The function called with each fired Reminder.
+            remind_at (time, optional): The time of day reminders fire at, 09:00 by default.
+            clock (callable, optional): The function returning the current time as a timestamp.
+        """
+        self.notify = notify
+        self.remind_at = remind_at
+        self.clock = clock
+        self.wheel = TimerWheel(int(clock() // TICK_SECONDS))
+        self.lock = threading.RLock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _today(self):
+        """Return the current date of the scheduler clock."""
+        return datetime.fromtimestamp(self.clock()).date()
+
+    def _deadline(self, day):
+        """Return the tick a reminder for a day fires at."""
+        return int(datetime.combine(day, self.remind_at).timestamp() // TICK_SECONDS)
+
+    def load(self, book, notebook):
+        """
+        Schedule the reminders of all contacts and notes.
+
+        Args:
+            book (ContactsBook): The contacts book.
+            notebook (Notebook): The notebook.
+        """
+        names, ordinals = book.birthday_column()
+        for name, ordinal in zip(names, ordinals):
+            if ordinal:
+                self.schedule_birthday(name, date.fromordinal(ordinal))
+        for note in notebook.notes:
+            self.schedule_note(note)
+
+    def schedule_note(self, note, fromdate=None):
+        """
+        Schedule or reschedule the reminder of a note.
+
+        Notes without a due date or due before today have no reminder. Repeating notes
+        are reminded of their next occurrence.
+
+        Args:
+            note (Note): The note.
+            fromdate (date, optional): The first day the reminder may fire on, today by default.
+        """
+        next_due_date = note.next_due_date(fromdate or self._today())
+        if next_due_date is None:
+            self.cancel_note(note)
+            return
+        due_date = next_due_date.date()
+        with self.lock:
+            self.wheel.insert(
+                ("note", id(note)), self._deadline(due_date), (note, due_date)
+            )
+
+    def cancel_note(self, note):
+        """
+        Cancel the reminder of a note.
+
+        Args:
+            note (Note): The note.
+        """
+        with self.lock:
+            self.wheel.cancel(("note", id(note)))
+
+    def cancel_notes(self):
+        """
+        Cancel the reminders of all notes.
+        """
+        with self.lock:
+            for key in [key for key in self.wheel.positions if key[0] == "note"]:
+                self.wheel.cancel(key)
+
+    def changed(self, note):
+        """
+        Reschedule a note added to or edited in the notebook.
+
+        Args:
+            note (Note): The note.
+        """
+        self.schedule_note(note)
+
+    def replaced(self, old_notes, new_notes):
+        """
+        Cancel the reminders of the removed notes and schedule the added notes when the
+        notes of the notebook are replaced.
+
+        Reminders are keyed by note id. The wheel holds the note while its reminder is
+        pending, so the id is not reused meanwhile, and removed notes are cancelled here
+        before another note can get their id.
+
+        Args:
+            old_notes (list): The notes before.
+            new_notes (list): The notes after.
+        """
+        old_ids = {id(note) for note in old_notes}
+        new_ids = {id(note) for note in new_notes}
+        for note in old_notes:
+            if id(note) not in new_ids:
+                self.cancel_note(note)
+        for note in new_notes:
+            if id(note) not in old_ids:
+                self.schedule_note(note)
+
+    def schedule_birthday(self, name, birthday, fromdate=None):
+        """
+        Schedule or reschedule the reminder of a birthday.
+
+        Args:
+            name (str): The contact name.
+            birthday (date): The date of birth, None to cancel the reminder.
+            fromdate (date, optional): The first day the reminder may fire on, today by default.
+        """
+        if birthday is None:
+            self.cancel_birthday(name)
+            return
+        next_birthday = DateHelper.get_next_birthday(
+            birthday, fromdate or self._today()
+        )
+        with self.lock:
+            self.wheel.insert(
+                ("birthday", name),
+                self._deadline(next_birthday),
+                (birthday, next_birthday),
+            )
+
+    def cancel_birthday(self, name):
+        """
+        Cancel the reminder of a birthday.
+
+        Args:
+            name (str): The contact name.
+        """
+        with self.lock:
+            self.wheel.cancel(("birthday", name))
+
+    def run_pending(self):
+        """
+        Fire the reminders that are due.
+
+        Returns:
+            list: The fired reminders.
+        """
+        with self.lock:
+            expired = self.wheel.advance(int(self.clock() // TICK_SECONDS))
+        reminders = []
+        for (kind, name), _, payload in expired:
+            if kind == "note":
+                note, due_date = payload
+                # The note may have been changed without rescheduling
+                next_due_date = note.next_due_date(due_date)
+                if next_due_date is None or next_due_date.date() != due_date:
+                    continue
+                if note.recurrence:
+                    with self.lock:
+                        if ("note", id(note)) not in self.wheel:
+                            self.schedule_note(note, due_date + timedelta(1))
+                reminders.append(
+                    Reminder(
+                        "note",
+                        due_date,
+                        note.title,
+                        f"Note '{note.title}' is due on {due_date.strftime(DATE_FORMAT)}.",
+                    )
+                )
+            else:
+                birthday, next_birthday = payload
+                reminders.append(
+                    Reminder(
+                        "birthday",
+                        next_birthday,
+                        name,
+                        f"{name} has a birthday on {next_birthday.strftime(DATE_FORMAT)}.",
+                    )
+                )
+                with self.lock:
+                    if ("birthday", name) not in self.wheel:
+                        self.schedule_birthday(
+                            name, birthday, next_birthday + timedelta(1)
+                        )
+        for reminder in reminders:
+            self.notify(reminder)
+        return reminders
+
+    def _run(self):
+        """Fire reminders at every tick until stopped."""
+        while not self.stopped.wait(TICK_SECONDS - self.clock() % TICK_SECONDS):
+            self.run_pending()
+
+    def start(self):
+        """
+        Start firing reminders from a background thread.
+        """
+        self.run_pending()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
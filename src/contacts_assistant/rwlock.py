@@ -0,0 +1,186 @@
+"""
+A module containing the reader-writer lock of the contacts book and the notebook.
+
+Any number of threads may read a store at the same time, while a thread changing it has
+it to itself. Waiting writers are served before new readers, so a steady stream of
+lookups cannot starve a change. Both locks are reentrant: a thread holding the write lock
+may read and write again, which lets compound operations such as add-or-update call the
+store methods, and a thread holding a read lock may read again even if a writer waits.
+
+Classes:
+    ReadWriteLock: A reentrant, writer-preferring reader-writer lock.
+
+Functions:
+    reading(method): Decorates a store method to run under the read lock of the store.
+    writing(method): Decorates a store method to run under the write lock of the store.
+"""
+
+import functools
+import threading
+
+
+class _Guard:
+    """A context manager calling an acquire and a release function."""
+
+    __slots__ = ("acquire", "release")
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ReadWriteLock:
+    """
+    A reentrant, writer-preferring reader-writer lock.
+
+    Attributes:
+        condition (threading.Condition): Guards the state below and signals its changes.
+        readers (dict): Read lock depths by thread identifier.
+        writer (int): The identifier of the thread holding the write lock, or None.
+        writer_depth (int): The number of times the writer acquired the write lock.
+        waiting_writers (int): The number of threads waiting for the write lock.
+
+    Methods:
+        acquire_read(): Waits for and takes a read lock.
+        release_read(): Releases a read lock.
+        acquire_write(): Waits for and takes the write lock.
+        release_write(): Releases the write lock.
+        read(): Returns a context manager holding a read lock.
+        write(): Returns a context manager holding the write lock.
+    """
+
+    def __init__(self):
+        """
+        Initialize an unlocked lock.
+        """
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = {}
+        self.writer = None
+        self.writer_depth = 0
+        self.waiting_writers = 0
+        self._read_guard = _Guard(self.acquire_read, self.release_read)
+        self._write_guard = _Guard(self.acquire_write, self.release_write)
+
+    def acquire_read(self):
+        """
+        Wait until no writer holds or waits for the lock and take a read lock.
+
+        A thread already reading or writing gets the read lock at once.
+        """
+        thread = threading.get_ident()
+        with self.condition:
+            if thread in self.readers or self.writer == thread:
+                self.readers[thread] = self.readers.get(thread, 0) + 1
+                return
+            while self.writer is not None or self.waiting_writers:
+                self.condition.wait()
+            self.readers[thread] = 1
+
+    def release_read(self):
+        """
+        Release a read lock.
+        """
+        thread = threading.get_ident()
+        with self.condition:
+            depth = self.readers[thread] - 1
+            if depth:
+                self.readers[thread] = depth
+                return
+            del self.readers[thread]
+            if not self.readers:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Wait until no other thread holds the lock and take the write lock.
+
+        Raises:
+            RuntimeError: If the thread holds a read lock, a read lock cannot be upgraded.
+        """
+        thread = threading.get_ident()
+        with self.condition:
+            if self.writer == thread:
+                self.writer_depth += 1
+                return
+            if thread in self.readers:
+                raise RuntimeError("A read lock cannot be upgraded to the write lock")
+            self.waiting_writers += 1
+            try:
+                while self.writer is not None or self.readers:
+                    self.condition.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writer = thread
+            self.writer_depth = 1
+
+    def release_write(self):
+        """
+        Release the write lock.
+        """
+        with self.condition:
+            self.writer_depth -= 1
+            if not self.writer_depth:
+                self.writer = None
+                self.condition.notify_all()
+
+    def read(self):
+        """
+        Return a context manager holding a read lock.
+
+        Returns:
+            A context manager taking a read lock on enter and releasing it on exit.
+        """
+        return self._read_guard
+
+    def write(self):
+        """
+        Return a context manager holding the write lock.
+
+        Returns:
+            A context manager taking the write lock on enter and releasing it on exit.
+        """
+        return self._write_guard
+
+
+def reading(method):
+    """
+    Decorate a store method to run under the read lock of the store.
+
+    Args:
+        method (function): A method of an object with a lock attribute.
+
+    Returns:
+        function: The wrapped method.
+    """
+
+    @functools.wraps(method)
+    def inner(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+
+    return inner
+
+
+def writing(method):
+    """
+    Decorate a store method to run under the write lock of the store.
+
+    Args:
+        method (function): A method of an object with a lock attribute.
+
+    Returns:
+        function: The wrapped method.
+    """
+
+    @functools.wraps(method)
+    def inner(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+
+    return inner
@@ -0,0 +1,110 @@
+"""
+A module containing the Slotted base class for compact model objects.
+
+Classes:
+    Slotted: A base class for objects that keep their attributes in __slots__.
+    VersionedSlotted: A slotted base class for objects caching their rendered text.
+"""
+
+
+class Slotted:
+    """
+    A base class for objects that keep their attributes in __slots__.
+
+    Slotted objects have no per-instance __dict__. They are pickled with a plain
+    attribute dictionary, the same state older versions of the classes produced, so
+    pickles written before and after the switch to __slots__ load with either version.
+    Slots starting with an underscore hold derived data and are not pickled.
+
+    Methods:
+        __getstate__(): Returns the attributes as a dictionary.
+        __setstate__(state): Restores the attributes from a dictionary.
+    """
+
+    __slots__ = ()
+
+    def _slot_names(self):
+        """Return the slot names of the class and its bases."""
+        return [
+            name
+            for cls in type(self).__mro__
+            for name in cls.__dict__.get("__slots__", ())
+        ]
+
+    def __getstate__(self):
+        """
+        Return the attributes as a dictionary.
+
+        Returns:
+            dict: The values of the slots that are set.
+        """
+        return {
+            name: getattr(self, name)
+            for name in self._slot_names()
+            if not name.startswith("_") and hasattr(self, name)
+        }
+
+    def __setstate__(self, state):
+        """
+        Restore the attributes from a dictionary.
+
+        Args:
+            state (dict or tuple): An attribute dictionary, or a (dict, slots dict) pair.
+        """
+        if isinstance(state, tuple):
+            instance_state, slots_state = state
+            state = dict(instance_state or {}, **(slots_state or {}))
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class VersionedSlotted(Slotted):
+    """
+    A slotted base class for objects caching their rendered text.
+
+    The version is incremented by every change, and a rendering is cached together with
+    the version it was made at, so an edit makes the cached text stale without having to
+    find and drop it.
+
+    Methods:
+        version: The number of changes made to the object.
+        touch(): Marks the object as changed.
+        _cached(slot, render): Returns the rendering cached in a slot or renders it.
+    """
+
+    __slots__ = ("_version",)
+
+    @property
+    def version(self):
+        """
+        Return the number of changes made to the object.
+
+        Returns:
+            int: The version, 0 for an object that was never changed.
+        """
+        return getattr(self, "_version", 0)
+
+    def touch(self):
+        """
+        Mark the object as changed, which makes its cached renderings stale.
+        """
+        self._version = self.version + 1
+
+    def _cached(self, slot, render):
+        """
+        Return the rendering cached in a slot, or render and cache it.
+
+        Args:
+            slot (str): The slot holding a (version, value) pair.
+            render (callable): The function rendering the value.
+
+        Returns:
+            The value for the current version.
+        """
+        version = self.version
+        cached = getattr(self, slot, None)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = render()
+        setattr(self, slot, (version, value))
+        return value
@@ -0,0 +1,552 @@
+"""
+A module containing the compact binary snapshot format for the contacts book.
+
+The snapshot replaces the pickled object graph with a schema-versioned layout that does not
+depend on module paths:
+
+    header         magic, schema version, flags, record count, section offsets
+    records        length-prefixed records, one per contact
+    strings        string table shared by email domains and address parts
+    string index   offsets of the strings, for random access (version 2)
+    name index     open-addressing hash table of record offsets by name (version 2)
+
+Each record stores the name and the email local part inline, phones as packed 64-bit
+integers, the birthday as a date ordinal, and the email domain and address parts as
+indexes into the string table. The indexes of version 2 let a reader find and decode a
+single record without reading the rest of the file.
+
+Classes:
+    SnapshotWriter: A class for writing a snapshot one record at a time.
+    Snapshot: A class with helpers to save, load and convert snapshots.
+
+Constants:
+    SnapshotHeader: A namedtuple with the decoded header fields.
+"""
+
+import argparse
+import gc
+import pickle
+import struct
+import zlib
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+from contacts_assistant.address import (
+    Address,
+    AddressType,
+    City,
+    Country,
+    PostalCode,
+    Street,
+)
+from contacts_assistant.birthday import Birthday
+from contacts_assistant.contact_email import Email
+from contacts_assistant.field import field_value
+from contacts_assistant.name import Name
+from contacts_assistant.phone import Phone
+from contacts_assistant.record import Record
+
+MAGIC = b"CABK"
+SCHEMA_VERSION = 2
+FLAG_NAME_INDEX = 1
+
+# magic, version, flags, reserved, record count, string count, strings offset
+HEADER_V1 = struct.Struct("<4sBBHIIQ")
+# version 1 fields, string index offset, name index offset, name index slot count
+HEADER = struct.Struct("<4sBBHIIQQQI")
+# length, name length, phone count, address count, birthday ordinal,
+# email domain string id + 1, email local part length
+RECORD_HEAD = struct.Struct("<IHBBIIH")
+# address type, street, city, postal code, country (string id + 1 each)
+ADDRESS = struct.Struct("<B4I")
+PHONE = struct.Struct("<Q")
+STRING_OFFSET = struct.Struct("<I")
+INDEX_SLOT = struct.Struct("<Q")
+
+SnapshotHeader = namedtuple(
+    "SnapshotHeader",
+    [
+        "version",
+        "flags",
+        "record_count",
+        "string_count",
+        "records_offset",
+        "strings_offset",
+        "strings_end",
+        "string_index_offset",
+        "index_offset",
+        "index_slots",
+    ],
+)
+
+ADDRESS_TYPES = list(AddressType)
+ADDRESS_TYPE_CODES = {
+    address_type: code for code, address_type in enumerate(ADDRESS_TYPES)
+}
+ADDRESS_PARTS = (
+    ("street", Street),
+    ("city", City),
+    ("postal_code", PostalCode),
+    ("country", Country),
+)
+
+
+class SnapshotWriter:
+    """
+    A class for writing a snapshot one record at a time.
+
+    The string table is collected while records are written and appended at the end
+    together with the string and name indexes, after which the header is patched with
+    the final counts and offsets. Besides the string table, the writer keeps only the
+    offset and name hash of every record.
+
+    Methods:
+        __init__(filepath): Opens the output file.
+        write(record): Encodes and writes a record.
+        close(): Writes the string table and the header.
+    """
+
+    def __init__(self, filepath):
+        """
+        Open the output file and reserve space for the header.
+
+        Args:
+            filepath (str): The path of the snapshot file.
+        """
+        self.file = open(filepath, "wb")
+        self.file.write(bytes(HEADER.size))
+        self.position = HEADER.size
+        self.record_count = 0
+        self.strings = {}
+        self.offsets = array("Q")
+        self.hashes = array("L")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    def _string_id(self, value):
+        """Return the string table id + 1 of a value, 0 for an empty value."""
+        if not value:
+            return 0
+        string_id = self.strings.get(value)
+        if string_id is None:
+            if "\0" in value:
+                raise ValueError("Snapshot strings can not contain NUL characters")
+            string_id = self.strings[value] = len(self.strings)
+        return string_id + 1
+
+    def write(self, record):
+        """
+        Encode a record and write it to the file.
+
+        Args:
+            record (Record): The record to write.
+        """
+        name = record.name.value.encode("utf-8")
+        email_domain = 0
+        email_local = b""
+        if record.email:
+            local, _, domain = record.email.value.rpartition("@")
+            email_domain = self._string_id(domain)
+            email_local = local.encode("utf-8")
+        birthday = record.birthday.value.toordinal() if record.birthday else 0
+        phones = [int(phone.value) for phone in record.phones]
+        if len(phones) > 255 or len(record.addresses) > 255:
+            raise ValueError("Snapshot records support up to 255 phones and addresses")
+
+        body = [name, email_local, struct.pack(f"<{len(phones)}Q", *phones)]
+        for address_type, address in record.addresses.items():
+            body.append(
+                ADDRESS.pack(
+                    ADDRESS_TYPE_CODES[address_type],
+                    *(
+                        self._string_id(field_value(part))
+                        for part in (
+                            address.street,
+                            address.city,
+                            address.postal_code,
+                            address.country,
+                        )
+                    ),
+                )
+            )
+        body = b"".join(body)
+        self.file.write(
+            RECORD_HEAD.pack(
+                RECORD_HEAD.size - 4 + len(body),
+                len(name),
+                len(phones),
+                len(record.addresses),
+                birthday,
+                email_domain,
+                len(email_local),
+            )
+        )
+        self.file.write(body)
+        self.offsets.append(self.position)
+        self.hashes.append(zlib.crc32(name))
+        self.position += RECORD_HEAD.size + len(body)
+        self.record_count += 1
+
+    def close(self):
+        """
+        Write the string table and the indexes, patch the header and close the file.
+        """
+        strings_offset = self.position
+        string_offsets = array("I", [0])
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            self.file.write(encoded)
+            self.file.write(b"\0")
+            string_offsets.append(string_offsets[-1] + len(encoded) + 1)
+        string_index_offset = strings_offset + string_offsets[-1]
+        self.file.write(string_offsets.tobytes())
+
+        index_slots = 1
+        while index_slots < 2 * self.record_count:
+            index_slots *= 2
+        mask = index_slots - 1
+        slots = array("Q", bytes(INDEX_SLOT.size * index_slots))
+        for offset, name_hash in zip(self.offsets, self.hashes):
+            slot = name_hash & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = offset + 1
+        index_offset = string_index_offset + STRING_OFFSET.size * len(string_offsets)
+        self.file.write(slots.tobytes())
+
+        self.file.seek(0)
+        self.file.write(
+            HEADER.pack(
+                MAGIC,
+                SCHEMA_VERSION,
+                FLAG_NAME_INDEX,
+                0,
+                self.record_count,
+                len(self.strings),
+                strings_offset,
+                string_index_offset,
+                index_offset,
+                index_slots,
+            )
+        )
+        self.file.close()
+
+
+class Snapshot:
+    """
+    A class with helpers to save, load and convert snapshots.
+
+    Methods:
+        is_snapshot(filepath): Checks whether a file starts with the snapshot magic.
+        save(records, filepath): Writes records to a snapshot file.
+        read_header(buffer): Decodes and validates the snapshot header.
+        read_strings(buffer, header): Decodes the whole string table.
+        find_offset(buffer, header, name): Finds the offset of a record by name.
+        decode_name(buffer, offset): Decodes the name of the record stored at an offset.
+        decode_record(buffer, offset, strings): Decodes the record stored at an offset.
+        iter_records(filepath): Yields the records of a snapshot file.
+        load(filepath): Loads all records of a snapshot file.
+        convert_pickle(source, target): Converts a pickled contacts book to a snapshot.
+    """
+
+    @staticmethod
+    def is_snapshot(filepath):
+        """
+        Check whether a file starts with the snapshot magic.
+
+        Args:
+            filepath (str): The path of the file.
+
+        Returns:
+            bool: True if the file is a snapshot.
+        """
+        with open(filepath, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def save(records, filepath):
+        """
+        Write records to a snapshot file.
+
+        Args:
+            records (iterable): The records to write.
+            filepath (str): The path of the snapshot file.
+
+        Returns:
+            int: The number of written records.
+        """
+        with SnapshotWriter(filepath) as writer:
+            for record in records:
+                writer.write(record)
+            return writer.record_count
+
+    @staticmethod
+    def read_header(buffer):
+        """
+        Decode and validate the snapshot header.
+
+        Args:
+            buffer (bytes): The snapshot file contents.
+
+        Returns:
+            SnapshotHeader: The decoded header, with zero index offsets for version 1 files.
+
+        Raises:
+            ValueError: If the buffer is not a snapshot of a supported version.
+        """
+        if len(buffer) < HEADER_V1.size:
+            raise ValueError("Snapshot file is truncated")
+        magic, version = buffer[:4], buffer[4]
+        if magic != MAGIC:
+            raise ValueError("Not a contacts book snapshot")
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        if version == 1:
+            _, _, flags, _, record_count, string_count, strings_offset = (
+                HEADER_V1.unpack_from(buffer)
+            )
+            return SnapshotHeader(
+                version,
+                flags,
+                record_count,
+                string_count,
+                HEADER_V1.size,
+                strings_offset,
+                len(buffer),
+                0,
+                0,
+                0,
+            )
+
+        (
+            _,
+            _,
+            flags,
+            _,
+            record_count,
+            string_count,
+            strings_offset,
+            string_index_offset,
+            index_offset,
+            index_slots,
+        ) = HEADER.unpack_from(buffer)
+        return SnapshotHeader(
+            version,
+            flags,
+            record_count,
+            string_count,
+            HEADER.size,
+            strings_offset,
+            string_index_offset,
+            string_index_offset,
+            index_offset,
+            index_slots,
+        )
+
+    @staticmethod
+    def read_strings(buffer, header):
+        """
+        Decode the whole string table.
+
+        Args:
+            buffer (bytes): The snapshot file contents.
+            header (SnapshotHeader): The decoded header.
+
+        Returns:
+            list: The strings in string id order.
+        """
+        if not header.string_count:
+            return []
+        strings = str(
+            buffer[header.strings_offset : header.strings_end], "utf-8"
+        ).split("\0")
+        return strings[: header.string_count]
+
+    @staticmethod
+    def decode_name(buffer, offset):
+        """
+        Decode the name of the record stored at an offset.
+
+        Args:
+            buffer (bytes): The snapshot file contents.
+            offset (int): The offset of the record.
+
+        Returns:
+            tuple: The encoded name and the offset of the next record.
+        """
+        length, name_len = struct.unpack_from("<IH", buffer, offset)
+        start = offset + RECORD_HEAD.size
+        return buffer[start : start + name_len], offset + 4 + length
+
+    @staticmethod
+    def find_offset(buffer, header, name):
+        """
+        Find the offset of a record by name using the name index.
+
+        Args:
+            buffer (bytes): The snapshot file contents.
+            header (SnapshotHeader): The decoded header of a file with a name index.
+            name (str): The contact name.
+
+        Returns:
+            int: The record offset, or None if there is no such record.
+        """
+        encoded = name.encode("utf-8")
+        mask = header.index_slots - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            (offset,) = INDEX_SLOT.unpack_from(
+                buffer, header.index_offset + INDEX_SLOT.size * slot
+            )
+            if not offset:
+                return None
+            if Snapshot.decode_name(buffer, offset - 1)[0] == encoded:
+                return offset - 1
+            slot = (slot + 1) & mask
+
+    @staticmethod
+    def decode_record(buffer, offset, strings):
+        """
+        Decode the record stored at an offset.
+
+        Args:
+            buffer (bytes): The snapshot file contents.
+            offset (int): The offset of the record.
+            strings (list): The string table.
+
+        Returns:
+            tuple: The decoded Record and the offset of the next record.
+        """
+        length, name_len, phone_count, address_count, birthday, domain, local_len = (
+            RECORD_HEAD.unpack_from(buffer, offset)
+        )
+        position = offset + RECORD_HEAD.size
+
+        record = Record.__new__(Record)
+        record.name = name = Name.__new__(Name)
+        name.value = str(buffer[position : position + name_len], "utf-8")
+        position += name_len
+
+        record.email = None
+        if domain:
+            record.email = email = Email.__new__(Email)
+            local = str(buffer[position : position + local_len], "utf-8")
+            email.value = f"{local}@{strings[domain - 1]}"
+        position += local_len
+
+        phones = []
+        for number in struct.unpack_from(f"<{phone_count}Q", buffer, position):
+            phone = Phone.__new__(Phone)
+            phone.value = f"{number:010d}"
+            phones.append(phone)
+        record.phones = phones
+        position += phone_count * PHONE.size
+
+        record.birthday = None
+        if birthday:
+            record.birthday = Birthday.__new__(Birthday)
+            record.birthday.value = datetime.fromordinal(birthday)
+
+        addresses = {}
+        for _ in range(address_count):
+            code, *parts = ADDRESS.unpack_from(buffer, position)
+            position += ADDRESS.size
+            address = Address.__new__(Address)
+            for (attribute, field_class), string_id in zip(ADDRESS_PARTS, parts):
+                value = None
+                if string_id:
+                    value = field_class.__new__(field_class)
+                    value.value = strings[string_id - 1]
+                setattr(address, attribute, value)
+            addresses[ADDRESS_TYPES[code]] = address
+        record.addresses = addresses
+
+        return record, offset + 4 + length
+
+    @staticmethod
+    def iter_records(filepath):
+        """
+        Yield the records of a snapshot file.
+
+        Args:
+            filepath (str): The path of the snapshot file.
+
+        Yields:
+            Record: The decoded records in file order.
+        """
+        with open(filepath, "rb") as file:
+            buffer = file.read()
+        header = Snapshot.read_header(buffer)
+        strings = Snapshot.read_strings(buffer, header)
+        offset = header.records_offset
+        decode_record = Snapshot.decode_record
+        for _ in range(header.record_count):
+            record, offset = decode_record(buffer, offset, strings)
+            yield record
+
+    @staticmethod
+    def load(filepath):
+        """
+        Load all records of a snapshot file.
+
+        The cyclic garbage collector is paused while decoding, since the loader only
+        allocates acyclic objects and collections triggered by them would dominate the load time.
+
+        Args:
+            filepath (str): The path of the snapshot file.
+
+        Returns:
+            dict: The records keyed by contact name.
+        """
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return {
+                record.name.value: record for record in Snapshot.iter_records(filepath)
+            }
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    @staticmethod
+    def convert_pickle(source, target):
+        """
+        Convert a pickled contacts book to a snapshot.
+
+        Args:
+            source (str): The path of the pickled contacts book.
+            target (str): The path of the snapshot file to write.
+
+        Returns:
+            int: The number of converted records.
+        """
+        with open(source, "rb") as file:
+            book = pickle.load(file)
+        return Snapshot.save(book.data.values(), target)
+
+
+def main():
+    """
+    Convert a pickled contacts book to the snapshot format from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert a pickled contacts book to the snapshot format"
+    )
+    parser.add_argument("source", help="Path of the pickled contacts book")
+    parser.add_argument("target", help="Path of the snapshot file to write")
+    args = parser.parse_args()
+    count = Snapshot.convert_pickle(args.source, args.target)
+    print(f"Converted {count} contact(s) to {args.target}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+A module containing the suffix array index of note text.
+
+The casefolded title and content of every note are concatenated, each followed by a
+separator character, and the starts of all suffixes of this text are sorted. The suffixes
+starting with a query form one run of the sorted array, found with two binary searches in
+O(m log N) for a query of m characters and a text of N characters, whatever the query:
+"oice" finds "invoice" just as well as a whole word does. A query never contains the
+separator, so a match never spans two fields.
+
+The array is not changed by edits. Notes added or edited since it was built are kept in a
+small pending list searched linearly, and the array positions of edited or removed notes
+are skipped. The array is built by prefix doubling, with NumPy when it is installed, in a
+background thread: the first search starts the build and is answered by the notebook
+without the index, and after SUBSTRING_INDEX_BATCH changes a search starts a rebuild while
+the old array keeps answering. Searches never wait for a build.
+
+Classes:
+    SubstringIndex: A suffix array index of the casefolded titles and contents of notes.
+
+Functions:
+    suffix_array(text): Returns the starts of the suffixes of a text in sorted order.
+"""
+
+import threading
+from array import array
+from bisect import bisect_right
+
+from contacts_assistant.constants import SUBSTRING_INDEX_BATCH
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SEPARATOR = "\x00"
+
+
+def suffix_array(text):
+    """
+    Return the starts of the suffixes of a text in sorted order.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        array: The suffix array, 64-bit integers.
+    """
+    if np is not None and text:
+        return _suffix_array_numpy(text)
+    return _suffix_array_python(text)
+
+
+def _suffix_array_numpy(text):
+    """Sort the suffixes by ranks of prefixes doubling in length, with NumPy."""
+    size = len(text)
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    alphabet, symbols = np.unique(codes, return_inverse=True)
+    symbols = symbols.astype(np.int64) + 1
+    # The first sort compares as many characters as fit in a 62-bit key
+    bits = len(alphabet).bit_length()
+    length = max(62 // bits, 1)
+    key = np.zeros(size, dtype=np.int64)
+    for offset in range(length):
+        key <<= bits
+        key[: max(size - offset, 0)] |= symbols[offset:]
+    while True:
+        order = np.argsort(key)
+        sorted_key = key[order]
+        new_group = np.ones(size, dtype=bool)
+        np.not_equal(sorted_key[1:], sorted_key[:-1], out=new_group[1:])
+        if new_group.all():
+            break
+        # Suffixes are sorted next by the ranks of their first 2 * length characters
+        rank = np.empty(size, dtype=np.int64)
+        rank[order] = np.cumsum(new_group)
+        second = np.zeros(size, dtype=np.int64)
+        second[: max(size - length, 0)] = rank[length:]
+        key = rank * (size + 1) + second
+        length *= 2
+    suffixes = array("q")
+    suffixes.frombytes(order.astype(np.int64).tobytes())
+    return suffixes
+
+
+def _suffix_array_python(text):
+    """Sort the suffixes by ranks of prefixes doubling in length."""
+    size = len(text)
+    rank = [ord(character) for character in text]
+    order = list(range(size))
+    length = 1
+    while size:
+        keys = [
+            (rank[start], rank[start + length] if start + length < size else -1)
+            for start in range(size)
+        ]
+        order.sort(key=keys.__getitem__)
+        group = 0
+        for previous, start in zip(order, order[1:]):
+            if keys[start] != keys[previous]:
+                group += 1
+            rank[start] = group
+        rank[order[0]] = 0
+        if group == size - 1:
+            break
+        length *= 2
+    return array("q", order)
+
+
+def _bounds(suffixes, text, query):
+    """Return the run of suffixes starting with a query, by two binary searches."""
+    # bisect only takes a key function from Python 3.10
+    length = len(query)
+    low, high = 0, len(suffixes)
+    while low < high:
+        middle = (low + high) // 2
+        start = suffixes[middle]
+        if text[start : start + length] < query:
+            low = middle + 1
+        else:
+            high = middle
+    first, high = low, len(suffixes)
+    while low < high:
+        middle = (low + high) // 2
+        start = suffixes[middle]
+        if text[start : start + length] <= query:
+            low = middle + 1
+        else:
+            high = middle
+    return first, low
+
+
+class SubstringIndex:
+    """
+    A suffix array index of the casefolded titles and contents of notes.
+
+    Attributes:
+        notes (list): The notes in the suffix array, by slot.
+        text (str): Their casefolded titles and contents, each followed by SEPARATOR.
+        suffixes (array): The starts of the suffixes of text in sorted order.
+        starts (list): The start of each note in text, by slot.
+        slots (dict): The slots of the notes in the suffix array, by note id.
+        dead (set): Slots of notes edited or removed since the array was built.
+        pending (dict): Notes added or edited since the array was built, as
+            (order, note) pairs by note id, where order sorts them among the slots.
+        added (int): The number of notes added since the array was built.
+        built (bool): Whether the array was built, changes are ignored until then.
+        builder (threading.Thread): The thread building the next array, or None.
+        changes (list): The (note id, note) changes since the running build started, in
+            order, with None as the note of removed notes.
+        lock (threading.Lock): Guards the index, searches may run on several threads.
+
+    Methods:
+        find(query, load_notes): Returns the notes containing a query.
+        changed(note): Marks a note as added or edited.
+        replaced(old_notes, new_notes): Marks the differences of two note lists.
+        wait(): Waits for the running build to finish.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty index, it is built after the first search.
+        """
+        self.notes = []
+        self.text = ""
+        self.suffixes = array("q")
+        self.starts = []
+        self.slots = {}
+        self.dead = set()
+        self.pending = {}
+        self.added = 0
+        self.built = False
+        self.builder = None
+        self.changes = None
+        self.lock = threading.Lock()
+
+    def find(self, query, load_notes):
+        """
+        Return the notes containing a query in their title or content.
+
+        Args:
+            query (str): The casefolded query.
+            load_notes (callable): Returns the notes of the notebook, called when the
+                index has to be built.
+
+        Returns:
+            list: The matching notes in notebook order, or None if the query is empty,
+                contains the separator or the index is not built yet, and the notes
+                have to be searched without the index.
+        """
+        if not query or SEPARATOR in query:
+            return None
+        with self.lock:
+            changes = len(self.pending) + len(self.dead)
+            if self.builder is None and (
+                not self.built or changes > SUBSTRING_INDEX_BATCH
+            ):
+                self._start_build(list(load_notes()))
+            if not self.built:
+                return None
+            start, end = _bounds(self.suffixes, self.text, query)
+            found = {}
+            for start in self.suffixes[start:end]:
+                slot = bisect_right(self.starts, start) - 1
+                if slot not in self.dead:
+                    found[slot] = self.notes[slot]
+            for order, note in self.pending.values():
+                title, content = note.folded()[:2]
+                if query in title or query in content:
+                    found[order] = note
+            return [found[order] for order in sorted(found)]
+
+    def changed(self, note):
+        """
+        Mark a note as added or edited.
+
+        Args:
+            note (Note): The note.
+        """
+        with self.lock:
+            if self.changes is not None:
+                self.changes.append((id(note), note))
+            if self.built:
+                self._changed(note)
+
+    def replaced(self, old_notes, new_notes):
+        """
+        Mark the notes added and removed by replacing a list of notes.
+
+        Args:
+            old_notes (list): The notes before.
+            new_notes (list): The notes after.
+        """
+        old_ids = {id(note) for note in old_notes}
+        new_ids = {id(note) for note in new_notes}
+        for note in new_notes:
+            if id(note) not in old_ids:
+                self.changed(note)
+        with self.lock:
+            for note in old_notes:
+                key = id(note)
+                if key not in new_ids:
+                    if self.changes is not None:
+                        self.changes.append((key, None))
+                    self._removed(key)
+
+    def wait(self):
+        """
+        Wait for the running build to finish.
+        """
+        builder = self.builder
+        if builder is not None:
+            builder.join()
+
+    def _changed(self, note):
+        """Mark a note as added or edited, with the lock held."""
+        key = id(note)
+        if key in self.pending:
+            return
+        slot = self.slots.get(key)
+        if slot is None:
+            # Added notes are listed after the notes in the array
+            slot = len(self.notes) + self.added
+            self.added += 1
+        else:
+            self.dead.add(slot)
+        self.pending[key] = (slot, note)
+
+    def _removed(self, key):
+        """Mark a note as removed by its id, with the lock held."""
+        self.pending.pop(key, None)
+        # The id may be reused by a new note once this one is collected
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.dead.add(slot)
+
+    def _start_build(self, notes):
+        """Start building the suffix array of the notes in a thread, with the lock held."""
+        self.changes = []
+        self.builder = threading.Thread(
+            target=self._build, args=(notes,), name="substring-index", daemon=True
+        )
+        self.builder.start()
+
+    def _build(self, notes):
+        """Build the suffix array of the notes and replace the current one."""
+        try:
+            parts = []
+            starts = []
+            position = 0
+            for note in notes:
+                title, content = note.folded()[:2]
+                starts.append(position)
+                parts.extend((title, SEPARATOR, content, SEPARATOR))
+                position += len(title) + len(content) + 2
+            text = "".join(parts)
+            suffixes = suffix_array(text)
+        except Exception:
+            # The current array keeps answering, the next search tries again
+            with self.lock:
+                self.changes = None
+                self.builder = None
+            raise
+        with self.lock:
+            self.notes = notes
+            self.text = text
+            self.suffixes = suffixes
+            self.starts = starts
+            self.slots = {id(note): slot for slot, note in enumerate(notes)}
+            self.dead = set()
+            self.pending = {}
+            self.added = 0
+            # Notes changed while the array was built are searched directly
+            for key, note in self.changes:
+                if note is None:
+                    self._removed(key)
+                else:
+                    self._changed(note)
+            self.changes = None
+            self.built = True
+            self.builder = None
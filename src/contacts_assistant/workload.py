@@ -0,0 +1,297 @@
+"""
+A module containing the workload recorder and the replay tool.
+
+A recorded workload is a JSON Lines file with one entry per command line: the time it was
+entered, the line and the answers given to the prompts of interactive commands such as
+add_note. Replaying it against a copy of the data reproduces a real session, so the effect
+of an upgrade or of a storage option can be measured on it.
+
+Usage:
+    contacts_assistant --record session.jsonl
+    python -m contacts_assistant.workload session.jsonl --concurrency 4 --speed 0
+
+Classes:
+    WorkloadEntry: A named tuple for one recorded command line.
+    WorkloadRecorder: A class writing command lines with timestamps to a file.
+    WorkloadReplayer: A class replaying a workload and measuring throughput and latency.
+"""
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import shlex
+import threading
+import time
+from collections import Counter, namedtuple
+
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.metrics import LatencyHistogram, Metrics
+
+WorkloadEntry = namedtuple("WorkloadEntry", ["time", "line", "answers"])
+
+
+class WorkloadRecorder:
+    """
+    A class writing command lines with timestamps to a file.
+
+    Entries are appended and flushed one at a time, so the log survives a crash of the
+    session.
+
+    Attributes:
+        file (TextIO): The log file.
+
+    Methods:
+        command(line): A context manager recording a command line and its prompt answers.
+        close(): Closes the log file.
+    """
+
+    def __init__(self, filepath):
+        """
+        Open the log file for appending.
+
+        Args:
+            filepath (str): The path of the log file.
+        """
+        self.file = open(filepath, "a", encoding="utf-8")
+
+    @contextlib.contextmanager
+    def command(self, line):
+        """
+        Record a command line and the answers to the prompts shown while it runs.
+
+        Args:
+            line (str): The command line.
+        """
+        entry = WorkloadEntry(time.time(), line, [])
+        read = builtins.input
+
+        def input_and_record(prompt=""):
+            answer = read(prompt)
+            entry.answers.append(answer)
+            return answer
+
+        builtins.input = input_and_record
+        try:
+            yield
+        finally:
+            builtins.input = read
+            self.file.write(json.dumps(entry._asdict(), ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def close(self):
+        """
+        Close the log file.
+        """
+        self.file.close()
+
+
+class WorkloadReplayer:
+    """
+    A class replaying a workload and measuring throughput and latency.
+
+    Each session replays the whole workload against its own handler, like several users
+    working on copies of the same data. Exit and close commands are skipped, so replaying
+    never writes the data files. A command raising an exception is counted as an error
+    and the session goes on with the next one.
+
+    Attributes:
+        entries (list): The WorkloadEntry items to replay.
+        handler_factory (callable): The function returning a new Handler for each session.
+        speed (float): 1 to keep the recorded pauses between commands, 2 to halve them,
+            0 to run as fast as possible.
+        concurrency (int): The number of sessions run at the same time.
+
+    Methods:
+        load(filepath): Reads the entries of a log file.
+        run(): Replays the workload and returns the measurements.
+    """
+
+    def __init__(self, entries, handler_factory, speed=0.0, concurrency=1):
+        """
+        Initialize the replayer.
+
+        Args:
+            entries (list): The WorkloadEntry items to replay.
+            handler_factory (callable): The function returning a new Handler for each session.
+            speed (float, optional): The replay speed relative to the recording, 0 for as
+                fast as possible.
+            concurrency (int, optional): The number of sessions run at the same time.
+        """
+        self.entries = entries
+        self.handler_factory = handler_factory
+        self.speed = speed
+        self.concurrency = concurrency
+        self.answers = threading.local()
+
+    @staticmethod
+    def load(filepath):
+        """
+        Read the entries of a log file.
+
+        Args:
+            filepath (str): The path of the log file.
+
+        Returns:
+            list: The WorkloadEntry items in recorded order.
+        """
+        with open(filepath, "r", encoding="utf-8") as file:
+            return [
+                WorkloadEntry(data["time"], data["line"], data.get("answers") or [])
+                for data in map(json.loads, file)
+            ]
+
+    def _input(self, prompt=""):
+        """Answer a prompt with the next recorded answer of the current session."""
+        answers = getattr(self.answers, "pending", None)
+        if not answers:
+            raise EOFError("No recorded answer for the prompt")
+        return answers.pop(0)
+
+    def _session(self, handler, started, metrics, latency, errors):
+        """Replay the workload against a handler, counting the failed commands by name."""
+        parser = Menu.create_parser()
+        first = self.entries[0].time if self.entries else 0
+        for entry in self.entries:
+            if self.speed:
+                delay = (
+                    started + (entry.time - first) / self.speed - time.perf_counter()
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            start = time.perf_counter()
+            words = entry.line.split(maxsplit=1)
+            command = Menu.get_by_name(words[0]) if words else None
+            if command is None or command in (Menu.EXIT, Menu.CLOSE):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(entry.line))
+            except (ValueError, SystemExit):
+                args = None
+            name = command.name.lower()
+            parsed = time.perf_counter()
+            metrics.record(name, "parse", parsed - start)
+            self.answers.pending = list(entry.answers)
+            try:
+                handler.execute(command, args)
+            except Exception:
+                errors[name] += 1
+                continue
+            end = time.perf_counter()
+            metrics.record(name, "dispatch", end - parsed)
+            latency.record(end - start)
+
+    def run(self):
+        """
+        Replay the workload and return the measurements.
+
+        Returns:
+            dict: The number of commands and sessions, the wall time, the throughput in
+                commands per second, the overall latency summary, the number of failed
+                commands in total and by command and the Metrics by command.
+        """
+        handlers = [self.handler_factory() for _ in range(self.concurrency)]
+        sessions = [(Metrics(), LatencyHistogram(), Counter()) for _ in handlers]
+        read = builtins.input
+        builtins.input = self._input
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as devnull:
+                with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(
+                    devnull
+                ):
+                    started = time.perf_counter()
+                    threads = [
+                        threading.Thread(
+                            target=self._session,
+                            args=(handler, started, *session),
+                        )
+                        for handler, session in zip(handlers, sessions)
+                    ]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    seconds = time.perf_counter() - started
+        finally:
+            builtins.input = read
+
+        metrics, latency, errors = Metrics(), LatencyHistogram(), Counter()
+        for session_metrics, session_latency, session_errors in sessions:
+            metrics.merge(session_metrics)
+            latency.merge(session_latency)
+            errors.update(session_errors)
+        return {
+            "sessions": self.concurrency,
+            "commands": latency.count,
+            "seconds": seconds,
+            "throughput": latency.count / seconds if seconds else 0.0,
+            "latency": latency.summary(),
+            "errors": sum(errors.values()),
+            "errors_by_command": dict(errors),
+            "metrics": metrics,
+        }
+
+
+def main():
+    """
+    Replay a recorded workload from the command line and print the measurements.
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded workload")
+    parser.add_argument("log", help="Path of the recorded workload")
+    parser.add_argument(
+        "--data-dir",
+        default=".",
+        help="Directory with the contacts book and notebook to replay against",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="1 for the recorded pace, 2 for twice as fast, 0 for as fast as possible",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--lazy", action="store_true")
+    parser.add_argument("--columnar", action="store_true")
+    parser.add_argument("--partitioned-notes", action="store_true")
+    parser.add_argument("--output", help="Write the measurements to a JSON file")
+    args = parser.parse_args()
+
+    entries = WorkloadReplayer.load(args.log)
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(args.data_dir)
+    replayer = WorkloadReplayer(
+        entries,
+        lambda: Handler(
+            lazy_contacts=args.lazy,
+            partitioned_notes=args.partitioned_notes,
+            columnar_contacts=args.columnar,
+        ),
+        args.speed,
+        args.concurrency,
+    )
+    result = replayer.run()
+    metrics = result.pop("metrics")
+
+    latency = result["latency"]
+    print(
+        f"Replayed {result['commands']} command(s) in {result['sessions']} session(s) "
+        f"in {result['seconds']:.3f} s, {result['throughput']:.1f} commands/s, "
+        f"{result['errors']} error(s)"
+    )
+    for name, count in sorted(result["errors_by_command"].items()):
+        print(f"  {name} failed {count} time(s)")
+    print(
+        f"Latency: p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, "
+        f"p99 {latency['p99_ms']} ms, max {latency['max_ms']} ms\n"
+    )
+    print(metrics.report())
+    if output:
+        result["commands_by_name"] = metrics.to_dict()
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
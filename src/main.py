@@ -1,16 +1,27 @@
 """Main App"""
 
 import shlex
+import sys
+import time
 import argparse
+from contextlib import nullcontext
+from datetime import datetime
 from prompt_toolkit import prompt
+from prompt_toolkit.patch_stdout import patch_stdout
 from prompt_toolkit.styles import Style
 from prompt_toolkit.history import InMemoryHistory
 
 from contacts_assistant.constants import INPUT_STYLE
 from contacts_assistant.handler import Handler
 from contacts_assistant.menu import Menu
-
-handler = Handler()
+from contacts_assistant.metrics import Metrics
+from contacts_assistant.profiling import Profiler
+from contacts_assistant.workload import WorkloadRecorder
+from contacts_assistant.reminders import (
+    ConsoleNotifier,
+    HookNotifier,
+    ReminderScheduler,
+)
 
 
 def handle_user_input(user_input, parser):
@@ -55,33 +66,223 @@ def handle_user_input(user_input, parser):
         return None, None
 
 
+def parse_options(argv=None):
+    """
+    Parse the command-line options of the assistant.
+
+    Args:
+        argv (list, optional): The arguments to parse, sys.argv by default.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    options_parser = argparse.ArgumentParser(description="Contacts assistant bot")
+    options_parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Map the contacts snapshot and decode contacts only when they are used",
+    )
+    options_parser.add_argument(
+        "--partitioned-notes",
+        action="store_true",
+        help="Store notes in monthly partitions that are loaded only when needed",
+    )
+    options_parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Keep contacts in columns for fast searches in very large books",
+    )
+    options_parser.add_argument(
+        "--reminders",
+        action="store_true",
+        help="Print reminders for due notes and birthdays while the assistant is running",
+    )
+    options_parser.add_argument(
+        "--reminder-hook",
+        metavar="SCRIPT",
+        help="Run SCRIPT with the kind, date and title of each reminder",
+    )
+    options_parser.add_argument(
+        "--remind-at",
+        metavar="HH:MM",
+        default="09:00",
+        type=lambda value: datetime.strptime(value, "%H:%M").time(),
+        help="Time of day reminders fire at (default 09:00)",
+    )
+    options_parser.add_argument(
+        "--search-workers",
+        metavar="N",
+        type=int,
+        help="Search notebooks with many notes in N worker processes",
+    )
+    options_parser.add_argument(
+        "--substring-index",
+        action="store_true",
+        help="Answer note searches from a suffix array of the note text, built in the background",
+    )
+    options_parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Measure command latencies, shown by the stats command",
+    )
+    options_parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="Measure command latencies and write their percentiles to PATH as JSON on exit",
+    )
+    options_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run the commands of FILE, one per line, instead of prompting (- for stdin)",
+    )
+    options_parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile the session with cProfile and write the pstats file to PATH on exit",
+    )
+    options_parser.add_argument(
+        "--trace-memory",
+        metavar="PATH",
+        help="Trace allocations with tracemalloc and write the top allocation sites to PATH on exit",
+    )
+    options_parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Append every command line with its time and prompt answers to FILE for replay",
+    )
+    return options_parser.parse_args(argv)
+
+
+def run_command(handler, parser, user_input, metrics=None, recorder=None):
+    """
+    Parse and execute one command line and print its result.
+
+    Args:
+        handler (Handler): The command handler.
+        parser (argparse.ArgumentParser): The argument parser.
+        user_input (str): The command line.
+        metrics (Metrics, optional): The histograms to record the parse and render times in.
+        recorder (WorkloadRecorder, optional): The log to record the command line in.
+
+    Returns:
+        Menu: The executed command, or None if the line is not a command.
+    """
+    if recorder:
+        with recorder.command(user_input):
+            return run_command(handler, parser, user_input, metrics)
+
+    start = time.perf_counter()
+    command, args = handle_user_input(user_input, parser)
+    if command:
+        name = command.name.lower()
+        if metrics:
+            metrics.record(name, "parse", time.perf_counter() - start)
+        result = handler.execute(command, args)
+        start = time.perf_counter()
+        print(result)
+        if metrics:
+            metrics.record(name, "render", time.perf_counter() - start)
+    return command
+
+
+def run_batch(handler, parser, lines, metrics=None, recorder=None):
+    """
+    Execute the commands of a batch, one per line, and save the data.
+
+    Blank lines and lines starting with # are skipped. The batch stops at an exit or
+    close command, which is run at the end of the batch if it has none.
+
+    Args:
+        handler (Handler): The command handler.
+        parser (argparse.ArgumentParser): The argument parser.
+        lines (iterable): The command lines.
+        metrics (Metrics, optional): The histograms to record the parse and render times in.
+        recorder (WorkloadRecorder, optional): The log to record the command lines in.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        command = run_command(handler, parser, line, metrics, recorder)
+        if command in (Menu.EXIT, Menu.CLOSE):
+            return
+    run_command(handler, parser, Menu.EXIT.name.lower(), metrics, recorder)
+
+
 def main():
     """
     Main function to run the assistant bot.
 
-    Continuously prompts the user for commands and executes the appropriate function.
+    Continuously prompts the user for commands and executes the appropriate function,
+    or runs the commands of a batch file.
     """
-    print(handler.greeting())
+    options = parse_options()
+    profiler = Profiler(options.profile, options.trace_memory)
+    if profiler.profile_path or profiler.memory_path:
+        profiler.start()
+    # Reminders are only fired in interactive sessions
+    scheduler = None
+    if options.batch:
+        pass
+    elif options.reminder_hook:
+        scheduler = ReminderScheduler(
+            HookNotifier(options.reminder_hook), options.remind_at
+        )
+    elif options.reminders:
+        scheduler = ReminderScheduler(ConsoleNotifier(), options.remind_at)
+    metrics = Metrics() if options.metrics or options.metrics_file else None
+    handler = Handler(
+        lazy_contacts=options.lazy,
+        partitioned_notes=options.partitioned_notes,
+        columnar_contacts=options.columnar,
+        scheduler=scheduler,
+        metrics=metrics,
+        profiler=profiler,
+        search_workers=options.search_workers,
+        substring_index=options.substring_index,
+    )
     parser = Menu.create_parser()
-    history = InMemoryHistory()
+    recorder = WorkloadRecorder(options.record) if options.record else None
 
-    while True:
-        style = Style.from_dict(INPUT_STYLE)
+    # The reports are written on Ctrl-C and Ctrl-D too
+    try:
+        if options.batch:
+            if options.batch == "-":
+                run_batch(handler, parser, sys.stdin, metrics, recorder)
+            else:
+                with open(options.batch, encoding="utf-8") as lines:
+                    run_batch(handler, parser, lines, metrics, recorder)
+        else:
+            print(handler.greeting())
+            history = InMemoryHistory()
 
-        user_input = prompt(
-            "Enter a command >>> ",
-            completer=handler.completer,
-            style=style,
-            history=history,
-        )
-        if user_input:
-            command, args = handle_user_input(user_input, parser)
-            if command:
-                print(handler.execute(command, args))
-            if command in (Menu.EXIT, Menu.CLOSE):
-                break
-        print()
+            # Reminders are printed from a background thread above the prompt
+            with patch_stdout() if scheduler else nullcontext():
+                if scheduler:
+                    scheduler.start()
+                while True:
+                    style = Style.from_dict(INPUT_STYLE)
 
+                    user_input = prompt(
+                        "Enter a command >>> ",
+                        completer=handler.completer,
+                        style=style,
+                        history=history,
+                    )
+                    if user_input:
+                        command = run_command(
+                            handler, parser, user_input, metrics, recorder
+                        )
+                        if command in (Menu.EXIT, Menu.CLOSE):
+                            break
+                    print()
+    finally:
+        if recorder:
+            recorder.close()
+        if profiler.active:
+            print(profiler.stop())
+        if options.metrics_file:
+            metrics.dump(options.metrics_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+Test cases for the BirthdayEngine class.
+"""
+
+import os
+import random
+import sys
+import unittest
+from array import array
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.birthday_engine import BirthdayEngine
+from contacts_assistant.date_helpers import DateHelper
+
+
+class TestBirthdayEngine(unittest.TestCase):
+    """
+    Test cases comparing the vectorized and the scalar birthday computations.
+    """
+
+    def setUp(self):
+        """
+        Build a birthday column with missing birthdays and February 29 birthdays.
+        """
+        generator = random.Random(7)
+        first, last = date(1940, 1, 1).toordinal(), date(2010, 12, 31).toordinal()
+        self.ordinals = array(
+            "l", (generator.randint(first, last) for _ in range(2000))
+        )
+        for row in range(0, 2000, 37):
+            self.ordinals[row] = 0
+        for row in range(5, 2000, 41):
+            self.ordinals[row] = date(1984, 2, 29).toordinal()
+        self.vectorized = BirthdayEngine.vectorized
+
+    def tearDown(self):
+        BirthdayEngine.vectorized = self.vectorized
+
+    def both(self, compute):
+        """Return the results of the vectorized and the scalar implementation."""
+        if not self.vectorized:
+            self.skipTest("NumPy is not installed")
+        BirthdayEngine.vectorized = True
+        vectorized = compute()
+        BirthdayEngine.vectorized = False
+        return vectorized, compute()
+
+    def test_upcoming(self):
+        """
+        Test upcoming birthdays around year ends, leap days and weekends.
+        """
+        for today in (date(2023, 2, 27), date(2024, 2, 28), date(2023, 12, 29)):
+            for days in (1, 7, 45):
+                vectorized, scalar = self.both(
+                    lambda: BirthdayEngine.upcoming(self.ordinals, today, days)
+                )
+                self.assertEqual(vectorized, scalar)
+                self.assertTrue(all(day.weekday() < 5 for _, day in vectorized))
+
+    def test_reports(self):
+        """
+        Test the month, weekday and age reports.
+        """
+        for compute in (
+            lambda: BirthdayEngine.per_month(self.ordinals),
+            lambda: BirthdayEngine.per_weekday(self.ordinals, 2023),
+            lambda: BirthdayEngine.age_distribution(self.ordinals, date(2024, 2, 28)),
+            lambda: BirthdayEngine.age_distribution(self.ordinals, date(2023, 3, 1), 5),
+        ):
+            vectorized, scalar = self.both(compute)
+            self.assertEqual(vectorized, scalar)
+        self.assertEqual(
+            sum(BirthdayEngine.per_month(self.ordinals)),
+            sum(1 for ordinal in self.ordinals if ordinal),
+        )
+
+    def test_calendar(self):
+        """
+        Test the cached birthday calendar against a day-by-day search.
+        """
+        birthdays = [date(1984, 2, 29), date(1990, 12, 31), date(1975, 1, 1)]
+        for fromdate in (date(2023, 2, 28), date(2023, 3, 1), date(2024, 2, 29)):
+            calendar = DateHelper.calendar(fromdate)
+            self.assertIs(DateHelper.calendar(fromdate), calendar)
+            for birthday in birthdays:
+                expected = fromdate
+                while (expected.month, expected.day) != (birthday.month, birthday.day):
+                    if (birthday.month, birthday.day) == (2, 29) and (
+                        expected.month,
+                        expected.day,
+                    ) == (3, 1):
+                        break
+                    expected += timedelta(1)
+                self.assertEqual(
+                    DateHelper.get_next_birthday(birthday, fromdate), expected
+                )
+                self.assertEqual(
+                    DateHelper.get_congratulation_date(birthday, fromdate),
+                    DateHelper.get_workday(expected),
+                )
+        self.assertIsNot(
+            DateHelper.calendar(date(2023, 3, 1)), DateHelper.calendar(date(2023, 3, 2))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
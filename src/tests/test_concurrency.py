@@ -0,0 +1,197 @@
+"""
+    Test cases for concurrent use of the contacts book and the notebook.
+"""
+
+import builtins
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.note import Note
+from contacts_assistant.rwlock import ReadWriteLock
+
+WORKERS = 8
+OPERATIONS = 600
+SHARED_NAMES = [f"Shared {index}" for index in range(4)]
+
+
+class TestConcurrency(unittest.TestCase):
+    """
+    Test cases for the ReadWriteLock class and the locked stores.
+    """
+
+    def setUp(self):
+        """
+        Run each test in an empty directory.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        """
+        Restore the working directory.
+        """
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_lock_reentrancy(self):
+        """
+        Test that the writer may read and write again and readers cannot upgrade.
+        """
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.read(), lock.write():
+                self.assertEqual(lock.writer_depth, 2)
+        self.assertIsNone(lock.writer)
+        self.assertEqual(lock.readers, {})
+        with lock.read(), lock.read():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+
+    def test_writer_excludes_readers(self):
+        """
+        Test that a waiting writer goes before new readers and excludes them.
+        """
+        lock = ReadWriteLock()
+        events = []
+        release_writer = threading.Event()
+
+        def write():
+            with lock.write():
+                events.append("write")
+                release_writer.wait()
+
+        def read():
+            with lock.read():
+                events.append("read")
+
+        lock.acquire_read()
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not lock.waiting_writers:
+            time.sleep(0.001)
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.02)
+        self.assertEqual(events, [])
+
+        lock.release_read()
+        while not events:
+            time.sleep(0.001)
+        time.sleep(0.02)
+        self.assertEqual(events, ["write"])
+        release_writer.set()
+        writer.join()
+        reader.join()
+        self.assertEqual(events, ["write", "read"])
+
+    def test_mixed_reads_and_writes(self):
+        """
+        Test that concurrent commands keep the stores consistent.
+        """
+        handler = Handler()
+        errors = []
+
+        def check(result, expected):
+            if result not in expected:
+                errors.append(result)
+
+        def worker(number):
+            randomizer = random.Random(number)
+            own_names = []
+            phones = {name: 0 for name in SHARED_NAMES}
+            own_notes = []
+            for step in range(OPERATIONS):
+                action = randomizer.random()
+                if action < 0.25:
+                    # Add-or-update of contacts shared by all workers
+                    name = randomizer.choice(SHARED_NAMES)
+                    phone = f"{number:02d}{step:08d}"
+                    result = handler.execute(
+                        Menu.ADD_CONTACT,
+                        Namespace(name=name, phone=phone, email=None, birthday=None),
+                    )
+                    check(result, ("Contact added.", "Contact updated."))
+                    phones[name] += 1
+                elif action < 0.35:
+                    name = f"Worker {number} {step}"
+                    result = handler.execute(
+                        Menu.ADD_CONTACT,
+                        Namespace(
+                            name=name, phone=None, email=None, birthday="01.01.1990"
+                        ),
+                    )
+                    check(result, ("Contact added.",))
+                    own_names.append(name)
+                elif action < 0.45 and own_names:
+                    name = own_names.pop(randomizer.randrange(len(own_names)))
+                    result = handler.execute(Menu.DELETE_CONTACT, Namespace(name=name))
+                    check(result, ("Contact removed.",))
+                elif action < 0.55:
+                    title = f"Note [{number}:{step}]"
+                    handler.notebook.add(Note(title, f"Written by worker {number}"))
+                    own_notes.append(title)
+                elif action < 0.6 and own_notes:
+                    title = own_notes.pop(randomizer.randrange(len(own_notes)))
+                    result = handler.execute(Menu.DELETE_NOTE, Namespace(title=title))
+                    check(result, ("1 note(s) deleted.",))
+                elif action < 0.75:
+                    handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+                elif action < 0.85:
+                    handler.execute(
+                        Menu.SEARCH_NOTES, Namespace(query=f"worker {number}")
+                    )
+                elif action < 0.95:
+                    handler.execute(Menu.UPCOMING_BIRTHDAYS, Namespace(days="30"))
+                else:
+                    name = randomizer.choice(SHARED_NAMES)
+                    handler.execute(Menu.FIND_CONTACT_BY_NAME, Namespace(name=name))
+            return own_names, phones, own_notes
+
+        switch_interval = sys.getswitchinterval()
+        # Switch threads often, so unsafe interleavings show up
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+        with patch.object(builtins, "input", lambda prompt="": ""), patch(
+            "builtins.print"
+        ):
+            with ThreadPoolExecutor(WORKERS) as pool:
+                results = list(pool.map(worker, range(WORKERS)))
+
+        self.assertEqual(errors, [])
+        book = handler.contact_book
+        expected_names = {name for names, _, _ in results for name in names}
+        shared = {name for name in SHARED_NAMES if any(p[name] for _, p, _ in results)}
+        self.assertEqual(set(book.data), expected_names | shared)
+        for name in shared:
+            # No add-or-update was lost
+            self.assertEqual(
+                len(book.find_by_name(name).phones),
+                sum(phones[name] for _, phones, _ in results),
+            )
+        titles = [note.title for note in handler.notebook.notes]
+        self.assertEqual(len(titles), len(set(titles)))
+        self.assertEqual(
+            set(titles), {title for _, _, notes in results for title in notes}
+        )
+        # Cached results match a fresh rendering
+        self.assertEqual(handler.execute(Menu.SHOW_ALL_CONTACTS, None), str(book))
+        self.assertEqual(
+            handler.execute(Menu.SHOW_ALL_NOTES, None),
+            handler.notebook.print_all_notes(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+    Test cases for the seeded data generator.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.address import AddressType
+from contacts_assistant.datagen import DataGenerator
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.snapshot import Snapshot
+
+
+class TestDataGenerator(unittest.TestCase):
+    """
+    Test cases for the DataGenerator class.
+    """
+
+    def setUp(self):
+        """
+        Create a generator with a fixed seed and day.
+        """
+        self.generator = DataGenerator(3, date(2025, 3, 1), leap_day_share=0.05)
+
+    def test_contacts(self):
+        """
+        Test that contacts are reproducible, unique and cover every field.
+        """
+        records = list(self.generator.records(2000))
+        again = DataGenerator(3, date(2025, 3, 1), leap_day_share=0.05).records(2000)
+        self.assertEqual([str(record) for record in again], list(map(str, records)))
+        self.assertEqual(len({record.name.value for record in records}), 2000)
+
+        phones = Counter(len(record.phones) for record in records)
+        self.assertEqual(set(phones), {1, 2, 3})
+        self.assertGreater(phones[1], phones[2])
+        self.assertGreater(phones[2], phones[3])
+        emails = sum(1 for record in records if record.email)
+        self.assertAlmostEqual(emails / 2000, 0.6, delta=0.05)
+        birthdays = [record.birthday.value for record in records if record.birthday]
+        self.assertAlmostEqual(len(birthdays) / 2000, 0.7, delta=0.05)
+        self.assertTrue(any((day.month, day.day) == (2, 29) for day in birthdays))
+        address_types = {
+            address_type for record in records for address_type in record.addresses
+        }
+        self.assertEqual(address_types, set(AddressType))
+
+        last_names = Counter(record.name.value.split()[1] for record in records)
+        self.assertGreater(last_names.most_common(1)[0][1], 10 * min(last_names.values()))
+
+    def test_notes(self):
+        """
+        Test that note tags are skewed and due dates are spread around the day.
+        """
+        notes = list(self.generator.notes(2000))
+        self.assertEqual(len({note.title for note in notes}), 2000)
+        tags = Counter(tag for note in notes for tag in note.tags)
+        self.assertEqual(tags.most_common(1)[0][0], "work")
+        self.assertGreater(tags["work"], 1.5 * tags["home"])
+        due_dates = [note.due_date.date() for note in notes if note.due_date]
+        self.assertAlmostEqual(len(due_dates) / 2000, 0.5, delta=0.05)
+        self.assertGreaterEqual(min(due_dates), date(2025, 1, 30))
+        self.assertLessEqual(max(due_dates), date(2026, 3, 1))
+        self.assertTrue(any(note.recurrence for note in notes))
+
+    def test_write_files(self):
+        """
+        Test writing a snapshot and a notebook file that load like saved ones.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            contacts_path = os.path.join(directory, "contacts_book.bin")
+            notebook_path = os.path.join(directory, "notebook.json")
+            self.generator.write_contacts(contacts_path, 500)
+            self.generator.write_notes(notebook_path, 300)
+
+            records = Snapshot.load(contacts_path)
+            expected = self.generator.contacts_book(500)
+            self.assertEqual(list(records), list(expected))
+            self.assertEqual(
+                [str(record) for record in records.values()],
+                [str(record) for record in expected.values()],
+            )
+            notebook = Notebook.load_from_file(notebook_path)
+            self.assertEqual(
+                notebook.to_dict(), self.generator.notebook(300).to_dict()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
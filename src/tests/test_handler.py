@@ -7,11 +7,17 @@ import random
 import unittest
 import sys
 import os
+import json
+import tempfile
 from argparse import Namespace
+from unittest.mock import patch
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant import exporter
+from contacts_assistant.address import AddressType
 from contacts_assistant.handler import Handler
 from contacts_assistant.menu import Menu
+from contacts_assistant.note import Note
 from contacts_assistant.constants import DATE_FORMAT
 
 
@@ -169,6 +175,27 @@ class TestHandler(unittest.TestCase):
         result = self.handler.execute(Menu.UPCOMING_BIRTHDAYS, upcoming_args)
         self.assertIn("Stepan Bandera", result)
 
+    def test_get_birthday_stats(self):
+        """
+        Test the birthday statistics reports.
+        """
+        add_args = Namespace(
+            name="Stepan Bandera",
+            phone="1234567890",
+            email="bandera@ukr.net",
+            birthday="01.01.1980",
+        )
+        self.handler.execute(Menu.ADD_CONTACT, add_args)
+
+        result = self.handler.execute(Menu.BIRTHDAY_STATS, Namespace(report=None))
+        self.assertIn("January    1", result)
+        self.assertIn("Birthdays per weekday", result)
+        age = date.today().year - 1980
+        self.assertIn(f"{age // 10 * 10:>3}-", result)
+
+        result = self.handler.execute(Menu.BIRTHDAY_STATS, Namespace(report="month"))
+        self.assertNotIn("Age distribution", result)
+
     def test_update_contact_email(self):
         """
         Test updating the email address of an existing contact.
@@ -325,6 +352,105 @@ class TestHandler(unittest.TestCase):
         result = self.handler.execute(Menu.SHOW_COMMANDS, None)
         self.assertIn("Add a new contact", result)
 
+    def test_get_agenda(self):
+        """
+        Test the agenda merging birthdays and note due dates.
+        """
+        self.handler.notebook.notes = []
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(
+                name="Stepan Bandera",
+                phone="1234567890",
+                email=None,
+                birthday="03.03.1980",
+            ),
+        )
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(
+                name="Ivan Franko", phone="0987654321", email=None, birthday="29.02.1984"
+            ),
+        )
+        self.handler.notebook.add(
+            Note("Invoice", "Pay the invoice", due_date="02.03.2025"),
+            suppress_message=True,
+        )
+
+        args = Namespace(start="01.03.2025", end=None, days="7", limit=None)
+        result = self.handler.execute(Menu.AGENDA, args)
+        self.assertEqual(
+            result.split("\n"),
+            [
+                "01.03.2025 Sat  Birthday: Ivan Franko",
+                "02.03.2025 Sun  Due: Invoice",
+                "03.03.2025 Mon  Birthday: Stepan Bandera",
+            ],
+        )
+
+        args = Namespace(start="02.03.2025", end="31.12.2025", days=None, limit="1")
+        result = self.handler.execute(Menu.AGENDA, args)
+        self.assertEqual(result, "02.03.2025 Sun  Due: Invoice")
+
+        args = Namespace(start="04.03.2025", end="05.03.2025", days=None, limit=None)
+        result = self.handler.execute(Menu.AGENDA, args)
+        self.assertEqual(result, "Nothing planned from 04.03.2025 to 05.03.2025.")
+
+    def test_export_contacts(self):
+        """
+        Test exporting contacts with field selection and a filter.
+        """
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(
+                name="Stepan Bandera",
+                phone="1234567890",
+                email="bandera@ukr.net",
+                birthday="01.01.1980",
+            ),
+        )
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(name="Ivan Franko", phone="0987654321", email=None, birthday=None),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "contacts.jsonl")
+            args = Namespace(
+                file=filepath, format=None, fields="name,phones", filter="email~UKR.NET"
+            )
+            result = self.handler.execute(Menu.EXPORT_CONTACTS, args)
+            self.assertEqual(result, f"Exported 1 contact(s) to {filepath}.")
+            with open(filepath, encoding="utf-8") as file:
+                rows = [json.loads(line) for line in file]
+            self.assertEqual(
+                rows, [{"name": "Stepan Bandera", "phones": ["1234567890"]}]
+            )
+
+            filepath = os.path.join(directory, "contacts.vcf")
+            args = Namespace(file=filepath, format=None, fields=None, filter=None)
+            self.handler.execute(Menu.EXPORT_CONTACTS, args)
+            with open(filepath, encoding="utf-8") as file:
+                vcard = file.read()
+            self.assertEqual(vcard.count("BEGIN:VCARD"), 2)
+            self.assertIn("BDAY:19800101", vcard)
+
+            # Address parts edited by older versions are plain strings
+            record = self.handler.contact_book.find_by_name("Ivan Franko")
+            record.add_address(AddressType.HOME, "Kopernika 1")
+            record.addresses[AddressType.HOME].city = "Lviv"
+            self.handler.execute(Menu.EXPORT_CONTACTS, args)
+            with open(filepath, encoding="utf-8") as file:
+                self.assertIn("ADR;TYPE=home:;;Kopernika 1;Lviv;;;", file.read())
+
+            filepath = os.path.join(directory, "failed.vcf")
+            args = Namespace(file=filepath, format=None, fields=None, filter=None)
+            with patch.object(exporter, "_escape_vcard", side_effect=ValueError):
+                self.handler.execute(Menu.EXPORT_CONTACTS, args)
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["contacts.jsonl", "contacts.vcf"]
+            )
+
     def test_exit(self):
         """
         Test exit command.
@@ -0,0 +1,165 @@
+"""
+    Test cases for the index of contacts mentioned in notes.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant import mentions
+from contacts_assistant.handler import Handler
+from contacts_assistant.mentions import AhoCorasick, MentionIndex
+from contacts_assistant.menu import Menu
+from contacts_assistant.note import Note
+from contacts_assistant.record import Record
+
+
+class TestMentions(unittest.TestCase):
+    """
+    Test cases for the AhoCorasick and MentionIndex classes and the mention commands.
+    """
+
+    def setUp(self):
+        """
+        Run each test in an empty directory with two contacts.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        self.handler = Handler()
+        for name, phone in (("Alice", "0123456789"), ("Al", "0987654321")):
+            self.handler.execute(
+                Menu.ADD_CONTACT,
+                Namespace(name=name, phone=phone, email=None, birthday=None),
+            )
+
+    def tearDown(self):
+        """
+        Restore the working directory.
+        """
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_automaton(self):
+        """
+        Test the automaton against searching for every pattern.
+        """
+        randomizer = random.Random(4)
+        patterns = ["a", "ab", "bab", "bc", "bca", "c", "caa", "abcab"]
+        automaton = AhoCorasick((pattern, pattern) for pattern in patterns)
+        for _ in range(100):
+            text = "".join(randomizer.choices("abc", k=randomizer.randrange(30)))
+            expected = sorted(
+                (start, start + len(pattern), pattern)
+                for pattern in patterns
+                for start in range(len(text))
+                if text.startswith(pattern, start)
+            )
+            self.assertEqual(sorted(automaton.find(text)), expected)
+
+    def test_mention_commands(self):
+        """
+        Test that both directions follow changes of the notes and the contacts.
+        """
+        notebook = self.handler.notebook
+        notebook.add(Note("Call alice", "Also ask about 0987654321"), True)
+        notebook.add(Note("Groceries", "Milk for Al, Alice's cake"), True)
+
+        def mentioning(name):
+            return self.handler.execute(Menu.NOTES_MENTIONING, Namespace(name=name))
+
+        def mentioned(title):
+            return self.handler.execute(Menu.MENTIONED_CONTACTS, Namespace(title=title))
+
+        self.assertIn("Call alice", mentioning("Alice"))
+        self.assertIn("Groceries", mentioning("Al"))
+        self.assertIn("Call alice", mentioning("Al"))
+        self.assertIn("Alice", mentioned("Call alice"))
+        self.assertIn("0987654321", mentioned("Call alice"))
+
+        # A note added after the index was built is scanned on add
+        notebook.add(Note("Party", "Invite nobody"), True)
+        self.assertEqual(mentioned("Party"), "Note Party mentions no contacts.")
+        with patch("builtins.input", return_value=""):
+            notebook.update("Party", Note("Party", "Invite Alice"))
+        self.assertIn("Party", mentioning("Alice"))
+
+        # New and deleted contacts are found in the notes written before
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(name="Milk", phone=None, email=None, birthday=None),
+        )
+        self.assertIn("Groceries", mentioning("Milk"))
+        self.handler.execute(Menu.DELETE_CONTACT, Namespace(name="Al"))
+        self.assertNotIn("0987654321", mentioned("Groceries"))
+        self.assertNotIn("Call alice", mentioning("Milk"))
+
+        with patch("builtins.input", return_value=""):
+            notebook.remove("Party")
+        self.assertNotIn("Party", mentioning("Alice"))
+        self.assertEqual(mentioning("Nobody"), "Contact does not exist, you can add it")
+
+    @patch.object(mentions, "MENTION_INDEX_BATCH", 3)
+    def test_contact_changes(self):
+        """
+        Test that contact changes only reindex the notes they affect and give the same
+        mentions as an index built from scratch.
+        """
+        randomizer = random.Random(7)
+        book, notebook = self.handler.contact_book, self.handler.notebook
+        index = notebook.mention_index
+        names = ["Bo", "Cy", "Di", "Ed", "Flo"]
+        phones = ["0000000001", "0000000002", "0000000003"]
+        for _ in range(30):
+            words = randomizer.choices(names + phones + ["x", "Box", "bo"], k=4)
+            notebook.add(Note(str(randomizer.random()), " ".join(words)), True)
+        # The index is built when it is created and the notebook keeps it current
+        self.assertEqual(len(index.contacts_by_note), len(notebook.notes))
+
+        # Edits that keep the name and phones rescan nothing
+        with patch.object(index, "_scan", side_effect=AssertionError), patch.object(
+            index, "_build_automaton", side_effect=AssertionError
+        ):
+            book.find_for_update("Alice").add_email("alice@example.com")
+            book.touch()
+            self.assertEqual(index.notes_mentioning("Alice"), [])
+
+        # A new contact is searched only in the notes containing its name
+        with patch.object(
+            Note, "folded", autospec=True, side_effect=Note.folded
+        ) as folded:
+            book.add_record(Record("Box"))
+            found = index.notes_mentioning("Box")
+        expected = [note for note in notebook.notes if "Box" in note.content.split()]
+        self.assertTrue(expected)
+        self.assertEqual(found, expected)
+        self.assertEqual(folded.call_count, len(expected))
+
+        for step in range(60):
+            name = randomizer.choice(names)
+            action = randomizer.random()
+            if action < 0.4:
+                book.delete(name)
+            elif book.find_by_name(name) is None:
+                book.add_record(Record(name))
+            elif action < 0.8:
+                book.find_for_update(name).add_phone(randomizer.choice(phones))
+                book.touch()
+            else:
+                notebook.add(Note(str(step), f"{name} and {phones[0]}"), True)
+            expected = MentionIndex(book, notebook)
+            for note in notebook.notes:
+                self.assertEqual(
+                    sorted(index.contacts_mentioned_in(note)),
+                    sorted(expected.contacts_mentioned_in(note)),
+                    step,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+    Test cases for the command latency metrics.
+"""
+
+import random
+import unittest
+import sys
+import os
+from argparse import Namespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.metrics import LatencyHistogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test cases for the LatencyHistogram and Metrics classes.
+    """
+
+    def test_histogram_percentiles(self):
+        """
+        Test that percentiles are within the bucket precision of the exact values.
+        """
+        randomizer = random.Random(7)
+        samples = [randomizer.lognormvariate(-7, 1.5) for _ in range(10000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+
+        values = sorted(int(sample * 1_000_000) for sample in samples)
+        for percent in (50, 95, 99, 100):
+            exact = values[-(-percent * len(values) // 100) - 1]
+            estimate = histogram.percentile(percent) * 1_000_000
+            self.assertGreaterEqual(estimate, exact)
+            self.assertLessEqual(estimate, exact * 1.07 + 1)
+        self.assertEqual(histogram.count, len(samples))
+        self.assertEqual(histogram.max, values[-1])
+
+    def test_buckets(self):
+        """
+        Test that every value falls between the bounds of its bucket.
+        """
+        for value in list(range(5000)) + [10**6, 10**8 + 12345]:
+            index = LatencyHistogram.bucket_index(value)
+            self.assertLessEqual(value, LatencyHistogram.bucket_upper_bound(index))
+            if index:
+                self.assertGreater(
+                    value, LatencyHistogram.bucket_upper_bound(index - 1)
+                )
+
+    def test_handler_stats(self):
+        """
+        Test that executed commands are measured and reported.
+        """
+        handler = Handler()
+        self.assertIn("--metrics", handler.execute(Menu.STATS, None))
+
+        handler = Handler(metrics=Metrics())
+        handler.contact_book.clear()
+        args = Namespace(name="Stepan Bandera")
+        handler.execute(Menu.FIND_CONTACT_BY_NAME, args)
+        handler.execute(Menu.FIND_CONTACT_BY_NAME, args)
+        handler.metrics.record("find_contact_by_name", "parse", 0.002)
+
+        summary = handler.metrics.to_dict()["find_contact_by_name"]
+        self.assertEqual(list(summary), ["parse", "dispatch"])
+        self.assertEqual(summary["dispatch"]["count"], 2)
+        self.assertEqual(summary["parse"]["p99_ms"], 2.0)
+        report = handler.execute(Menu.STATS, None)
+        self.assertIn("find_contact_by_name", report)
+        self.assertIn("p95 ms", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
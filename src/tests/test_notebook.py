@@ -0,0 +1,233 @@
+"""
+Test cases for the Notebook class.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.date_helpers import DateHelper
+from contacts_assistant.note import Note
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.partitioned_notebook import PartitionedNotebook
+from contacts_assistant.recurrence import Recurrence
+
+
+class TestNotebook(unittest.TestCase):
+    """
+    Test cases for the Notebook class.
+    """
+
+    def setUp(self):
+        """
+        Create a temporary directory and a notebook with a few notes.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, "notebook.json")
+        self.notebook = Notebook()
+        self.notebook.add(Note("Invoice", "Pay the invoice", ["work"], "15.03.2030"))
+        self.notebook.add(Note("Groceries", 'Milk, "bread" ]', ["home", "shop"]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_saved_notebook(self):
+        """
+        Test that a saved notebook is streamed back unchanged.
+        """
+        self.notebook.save_to_file(self.filepath)
+        loaded = Notebook.load_from_file(self.filepath)
+        self.assertEqual(loaded.to_dict(), self.notebook.to_dict())
+
+    def test_load_legacy_list(self):
+        """
+        Test loading a notebook stored as a bare list without created_at dates.
+        """
+        with open(self.filepath, "w", encoding="utf-8") as file:
+            json.dump([{"title": "Old", "content": "note"}], file)
+        notes = list(Notebook.iter_file(self.filepath))
+        self.assertEqual([note.title for note in notes], ["Old"])
+        self.assertEqual(notes[0].created_at.date(), datetime.now().date())
+
+    def test_parse_date(self):
+        """
+        Test the fast date decoder against strptime.
+        """
+        self.assertEqual(DateHelper.parse_date("29.02.2024"), datetime(2024, 2, 29))
+        self.assertEqual(DateHelper.parse_date("1.2.2024"), datetime(2024, 2, 1))
+        for value in ("30.02.2024", "+1.02.2024", "01-02-2024", ""):
+            with self.assertRaises(ValueError):
+                DateHelper.parse_date(value)
+
+    def test_partitioned_notebook(self):
+        """
+        Test that filters read and saves rewrite only the partitions they need.
+        """
+        self.notebook.notes[0].created_at = datetime(2024, 1, 10)
+        self.notebook.notes[1].created_at = datetime(2024, 2, 10)
+        self.notebook.save_to_file(self.filepath)
+        dirpath = os.path.join(self.directory.name, "notebook")
+
+        notebook = PartitionedNotebook.open(dirpath, self.filepath)
+        notebook.save_to_file()
+        self.assertEqual(
+            sorted(os.listdir(dirpath)),
+            ["2024-01.json", "2024-02.json", "manifest.json"],
+        )
+
+        notebook = PartitionedNotebook.open(dirpath)
+        self.assertEqual(notebook.partitions, {})
+        self.assertEqual(
+            [note.title for note in notebook.filter_by_tag("shop")], ["Groceries"]
+        )
+        self.assertEqual(list(notebook.partitions), ["2024-02"])
+        self.assertEqual(
+            [note.title for note in notebook.notes_due_in_days(36500)], ["Invoice"]
+        )
+        self.assertEqual(sorted(notebook.partitions), ["2024-01", "2024-02"])
+
+        notebook = PartitionedNotebook.open(dirpath)
+        note = Note("Call", "Call mom", ["home"])
+        note.created_at = datetime(2024, 2, 20)
+        notebook.add(note)
+        self.assertEqual(notebook.dirty, {"2024-02"})
+        mtime = os.path.getmtime(os.path.join(dirpath, "2024-01.json"))
+        notebook.save_to_file()
+        self.assertEqual(mtime, os.path.getmtime(os.path.join(dirpath, "2024-01.json")))
+
+        notebook = PartitionedNotebook.open(dirpath)
+        self.assertEqual(
+            [note.title for note in notebook.notes], ["Invoice", "Groceries", "Call"]
+        )
+        # The notes are read-only, so a change cannot bypass the partitions
+        with self.assertRaises(AttributeError):
+            notebook.notes.append(note)
+        notebook.notes = notebook.notes[1:]
+        self.assertEqual(notebook.dirty, {"2024-01"})
+        notebook.save_to_file()
+        self.assertNotIn("2024-01.json", os.listdir(dirpath))
+        self.assertEqual(len(PartitionedNotebook.open(dirpath).notes), 2)
+
+    def test_recurring_notes(self):
+        """
+        Test that repeating notes are saved once and expanded only for the queried window.
+        """
+        standup = Note(
+            "Report",
+            "Send the weekly report",
+            ["work"],
+            "06.01.2025",
+            "weekly;count=52",
+        )
+        rent = Note(
+            "Rent", "Pay the rent", ["home"], "31.01.2025", "monthly;interval=2"
+        )
+        self.notebook.add(standup)
+        self.notebook.add(rent)
+        self.notebook.save_to_file(self.filepath)
+
+        notebook = Notebook.load_from_file(self.filepath)
+        self.assertEqual(len(notebook.notes), 4)
+        self.assertEqual(str(notebook.notes[2].recurrence), "weekly;count=52")
+        due = notebook.notes_due_between(date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(
+            [(note.title, note.due_date.strftime("%d.%m.%Y")) for note in due],
+            [
+                ("Report", "03.03.2025"),
+                ("Report", "10.03.2025"),
+                ("Report", "17.03.2025"),
+                ("Report", "24.03.2025"),
+                ("Report", "31.03.2025"),
+                ("Rent", "31.03.2025"),
+            ],
+        )
+        self.assertEqual(notebook.notes[2].due_date, datetime(2025, 1, 6))
+        self.assertEqual(notebook.notes[2].next_due_date(date(2026, 1, 1)), None)
+        self.assertEqual(
+            notebook.notes[3].next_due_date(date(2025, 4, 1)), datetime(2025, 5, 31)
+        )
+
+        merged = notebook.occurrences_between(date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(
+            [(note.title, due_date.day) for due_date, note in merged],
+            [("Report", 3), ("Report", 10), ("Report", 17), ("Report", 24)]
+            + [("Report", 31), ("Rent", 31)],
+        )
+        # Only the occurrences taken are computed, however long the window
+        daily = Note("Walk", "Walk the dog", due_date="01.01.2025", recurrence="daily")
+        notebook.add(daily, True)
+        with unittest.mock.patch.object(
+            Recurrence, "occurrence", autospec=True, side_effect=Recurrence.occurrence
+        ) as occurrence:
+            merged = notebook.occurrences_between(date(2025, 1, 1), date(9999, 1, 1))
+            first = [next(merged)[0].day for _ in range(8)]
+        self.assertEqual(first, [1, 2, 3, 4, 5, 6, 6, 7])
+        self.assertLess(occurrence.call_count, 20)
+
+        for rule in ("hourly", "weekly;interval=0", "weekly;until=2025"):
+            with self.assertRaises(ValueError):
+                Note("Bad", "Bad rule", due_date="01.01.2025", recurrence=rule)
+        with self.assertRaises(ValueError):
+            Note("Bad", "No due date", recurrence="daily")
+
+    def test_cached_frames(self):
+        """
+        Test that frames are rendered once and again after the note is updated.
+        """
+        notebook = Notebook()
+        notebook.add(Note("Groceries", "Buy milk", ["home"]))
+        note = notebook.notes[0]
+        frame = note.frame()
+        self.assertIs(note.frame(), frame)
+        self.assertEqual(notebook.print_all_notes(), frame)
+
+        with unittest.mock.patch("builtins.input", return_value=""):
+            notebook.update("Groceries", Note("Groceries", "Buy bread", ["home"]))
+        self.assertIn("Buy bread", notebook.print_all_notes())
+        self.assertNotIn("_frame", note.__getstate__())
+
+    def test_query_syntax(self):
+        """
+        Test scoped, regex and date range terms and the casefolded shadows.
+        """
+        self.notebook.notes[0].created_at = datetime(2024, 5, 10)
+        self.notebook.add(Note("STRASSE", "Call the Straße office", ["Work"]))
+
+        def titles(query):
+            return [note.title for note in self.notebook.query(query)]
+
+        self.assertEqual(titles("pay the"), ["Invoice"])
+        self.assertEqual(titles("pay invoice"), [])
+        self.assertEqual(titles("title:invoice"), ["Invoice"])
+        self.assertEqual(titles("content:invoice"), ["Invoice"])
+        self.assertEqual(titles("content:groceries"), [])
+        self.assertEqual(titles("tag:work"), ["Invoice", "STRASSE"])
+        self.assertEqual(titles('tag:home "milk,"'), ["Groceries"])
+        self.assertEqual(titles("straße"), ["STRASSE"])
+        self.assertEqual(titles("/^(In|Gr)/ tag:shop"), ["Groceries"])
+        self.assertEqual(titles("/strasse/i"), ["STRASSE"])
+        self.assertEqual(titles("title:/^s/"), [])
+        self.assertEqual(titles("created:01.05.2024..31.05.2024"), ["Invoice"])
+        self.assertEqual(titles("created:10.05.2024"), ["Invoice"])
+        self.assertEqual(titles("created:11.05.2024.."), ["Groceries", "STRASSE"])
+        self.assertEqual(titles("note:x"), [])
+        for query in ("/(/", "created:32.01.2024"):
+            with self.assertRaises(ValueError):
+                self.notebook.query(query)
+
+        note = self.notebook.notes[1]
+        shadow = note.folded()
+        self.assertIs(note.folded(), shadow)
+        with unittest.mock.patch("builtins.input", return_value=""):
+            self.notebook.update("Groceries", Note("Groceries", "Eggs", ["home"]))
+        self.assertEqual(titles("eggs"), ["Groceries"])
+        self.assertEqual(titles("milk"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
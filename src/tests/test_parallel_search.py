@@ -0,0 +1,100 @@
+"""
+    Test cases for the parallel scan of large notebooks.
+"""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.note import Note
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.parallel_search import ParallelScanner
+
+WORDS = ["milk", "Bread", "ÄPFEL", "call", "Mom", "report", "ß", "Δelta"]
+
+
+class TestParallelSearch(unittest.TestCase):
+    """
+    Test cases for the ParallelScanner class and Notebook.search.
+    """
+
+    def setUp(self):
+        """
+        Create a notebook with a scanner searching from 50 notes on.
+        """
+        randomizer = random.Random(3)
+        self.notebook = Notebook()
+        for index in range(300):
+            title = " ".join(randomizer.choices(WORDS, k=2))
+            content = " ".join(randomizer.choices(WORDS, k=randomizer.randrange(6)))
+            self.notebook.add(Note(f"{title} {index}", content), True)
+        self.scanner = ParallelScanner(workers=2, threshold=50)
+        self.addCleanup(self.scanner.close)
+
+    def serial_search(self, query):
+        """
+        Search the notebook in the calling thread.
+        """
+        self.notebook.scanner = None
+        try:
+            return self.notebook.search(query)
+        finally:
+            self.notebook.scanner = self.scanner
+
+    def test_matches_serial_search(self):
+        """
+        Test that the parallel search finds the notes of the serial one, in order.
+        """
+        self.notebook.scanner = self.scanner
+        for query in ("milk", "äpfel", "ss", "δELTA", "mom 1", "", "absent"):
+            self.assertEqual(self.notebook.search(query), self.serial_search(query))
+        self.assertIsNotNone(self.scanner.pool)
+
+        # A match across the title and the content does not count
+        self.notebook.add(Note("Split ab", "cd"), True)
+        self.assertEqual(self.notebook.search("abcd"), [])
+        self.assertEqual(self.notebook.search("b cd"), [])
+        self.assertEqual(len(self.notebook.search("split ab")), 1)
+
+    def test_find_pattern(self):
+        """
+        Test that regular expression queries match the original text of each field.
+        """
+        self.notebook.scanner = self.scanner
+        pattern = r"^(Mom|call) \S+ 1\d$"
+        expected = [
+            note
+            for note in self.notebook.notes
+            if re.search(pattern, note.title) or re.search(pattern, note.content)
+        ]
+        self.assertTrue(expected)
+        self.assertEqual(self.notebook.query(f"/{pattern}/"), expected)
+        self.assertEqual(self.notebook.query("/mom/"), [])
+        self.assertEqual(
+            len(self.notebook.query("/mom/i")), len(self.serial_search("mom"))
+        )
+        self.assertIn("regex", self.scanner.blocks)
+        self.assertTrue(self.scanner.should_scan(50))
+        self.assertFalse(ParallelScanner(workers=1, threshold=50).should_scan(500))
+
+    def test_reuses_packed_notes(self):
+        """
+        Test that the scanner shares the text the notebook packed for serial searches.
+        """
+        self.notebook.scanner = self.scanner
+        self.notebook.search("milk")
+        block = self.scanner.blocks["substring"]
+        self.assertIs(block[1], self.notebook._packed[1])
+        self.notebook.search("bread")
+        self.assertIs(self.scanner.blocks["substring"], block)
+
+        self.notebook.add(Note("Milk", "again"), True)
+        self.assertEqual(self.notebook.search("milk"), self.serial_search("milk"))
+        self.assertIs(self.scanner.blocks["substring"][1], self.notebook._packed[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+    Test cases for the persistent map and the contacts book snapshots.
+"""
+
+import os
+import random
+import sys
+import unittest
+from argparse import Namespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.persistent_map import PersistentMap
+from contacts_assistant.record import Record
+
+
+class CollidingKey:
+    """
+    A key with few distinct hashes, to exercise the collision nodes.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return self.value % 7
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.value == self.value
+
+
+class TestPersistentMap(unittest.TestCase):
+    """
+    Test cases for the PersistentMap class and ContactsBook.snapshot().
+    """
+
+    def test_matches_dict(self):
+        """
+        Test that every version of the map matches a dict, order included.
+        """
+        randomizer = random.Random(7)
+        for make_key in (str, CollidingKey):
+            expected = {}
+            persistent = PersistentMap()
+            versions = []
+            for step in range(5000):
+                key = make_key(randomizer.randrange(500))
+                if randomizer.random() < 0.6:
+                    expected[key] = step
+                    persistent = persistent.set(key, step)
+                else:
+                    expected.pop(key, None)
+                    persistent = persistent.delete(key)
+                if step % 500 == 0:
+                    versions.append((dict(expected), persistent))
+            for expected, persistent in versions:
+                self.assertEqual(len(persistent), len(expected))
+                self.assertEqual(list(persistent.items()), list(expected.items()))
+            built = PersistentMap.from_items(expected.items())
+            self.assertEqual(list(built.items()), list(expected.items()))
+            self.assertNotIn(make_key(-1), built)
+
+    def test_snapshot_is_unchanged(self):
+        """
+        Test that a snapshot keeps its contents while the book changes.
+        """
+        book = ContactsBook()
+        for name in ("Alice", "Bob", "Carol"):
+            record = Record(name)
+            record.add_phone("0123456789")
+            book.add_record(record)
+        snapshot = book.snapshot()
+        rendering = str(snapshot)
+        self.assertEqual(rendering, str(book))
+
+        book.find_for_update("Alice").add_phone("0987654321")
+        book.delete("Bob")
+        book.add_record(Record("Dave"))
+        self.assertEqual(str(snapshot), rendering)
+        self.assertEqual(len(snapshot.find_by_name("Alice").phones), 1)
+        self.assertEqual(len(book.find_by_name("Alice").phones), 2)
+        self.assertEqual(list(book.snapshot().data), ["Alice", "Carol", "Dave"])
+        self.assertNotEqual(snapshot.generation, book.generation)
+        with self.assertRaises(TypeError):
+            snapshot.add_record(Record("Eve"))
+
+    def test_commands_copy_shared_records(self):
+        """
+        Test that contact commands do not change records shown by an earlier snapshot.
+        """
+        handler = Handler()
+        handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(name="Alice", phone="0123456789", email=None, birthday=None),
+        )
+        snapshot = handler.contact_book.snapshot()
+        handler.execute(
+            Menu.UPDATE_PHONE,
+            Namespace(name="Alice", oldphone="0123456789", newphone="0987654321"),
+        )
+        handler.execute(
+            Menu.ADD_ADDRESS,
+            Namespace(
+                name="Alice",
+                addresstype="Home",
+                street="Main 1",
+                city="Kyiv",
+                postalcode=None,
+                country=None,
+            ),
+        )
+        self.assertEqual(str(snapshot.find_by_name("Alice").phones[0]), "0123456789")
+        self.assertEqual(snapshot.find_by_name("Alice").addresses, {})
+        self.assertEqual(len(handler.contact_book.find_by_name("Alice").addresses), 1)
+        self.assertIn("0987654321", handler.execute(Menu.SHOW_ALL_CONTACTS, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
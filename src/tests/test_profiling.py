@@ -0,0 +1,108 @@
+"""
+    Test cases for the session profiler and batch runs.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.metrics import Metrics
+from contacts_assistant.profiling import Profiler
+import main
+from main import run_batch
+
+
+class TestProfiling(unittest.TestCase):
+    """
+    Test cases for the Profiler class and the batch mode.
+    """
+
+    def setUp(self):
+        """
+        Run each test in an empty directory.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        """
+        Restore the working directory.
+        """
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_profile_command(self):
+        """
+        Test profiling a few commands and writing the reports.
+        """
+        handler = Handler(profiler=Profiler("session.pstats", "memory.txt"))
+        self.assertEqual(
+            handler.execute(Menu.PROFILE, Namespace(action="stop")), "Profiling is off."
+        )
+        handler.execute(Menu.PROFILE, Namespace(action="start"))
+        self.assertEqual(
+            handler.execute(Menu.PROFILE, Namespace(action="start")),
+            "Profiling is already on.",
+        )
+        handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        summary = handler.execute(Menu.PROFILE, Namespace(action="stop"))
+
+        self.assertIn("Ordered by: cumulative time", summary)
+        self.assertIn("Profile saved to session.pstats", summary)
+        self.assertIn("Allocation report saved to memory.txt", summary)
+        self.assertTrue(os.path.getsize("session.pstats"))
+        with open("memory.txt", encoding="utf-8") as file:
+            self.assertTrue(file.readline().startswith("Traced memory:"))
+        self.assertFalse(handler.profiler.active)
+
+    def test_batch(self):
+        """
+        Test running commands from a batch and saving on exit.
+        """
+        handler = Handler(metrics=Metrics())
+        lines = [
+            "# A comment\n",
+            'add_contact --name "Ann Lee" --phone 1234567890\n',
+            "\n",
+            "show_all_contacts\n",
+        ]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_batch(handler, Menu.create_parser(), lines, handler.metrics)
+
+        self.assertTrue(output.getvalue().startswith("Contact added.\n"))
+        self.assertTrue(output.getvalue().endswith("Good bye!\n"))
+        self.assertTrue(os.path.exists("contacts_book.bin"))
+        self.assertEqual(
+            list(handler.metrics.to_dict()),
+            ["add_contact", "exit", "show_all_contacts"],
+        )
+
+    def test_reports_on_interrupt(self):
+        """
+        Test that the reports are written when the session ends with Ctrl-D.
+        """
+        argv = ["main.py", "--profile", "session.pstats", "--metrics-file", "m.json"]
+        output = io.StringIO()
+        with patch.object(sys, "argv", argv), patch.object(
+            main, "prompt", side_effect=["show_all_contacts", EOFError]
+        ), contextlib.redirect_stdout(output):
+            with self.assertRaises(EOFError):
+                main.main()
+
+        self.assertIn("Profile saved to session.pstats", output.getvalue())
+        self.assertTrue(os.path.getsize("session.pstats"))
+        self.assertTrue(os.path.getsize("m.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+    Test cases for the query result cache.
+"""
+
+import builtins
+import os
+import sys
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.note import Note
+from contacts_assistant.query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    """
+    Test cases for the QueryCache class and the cached handler commands.
+    """
+
+    def setUp(self):
+        """
+        Run each test in an empty directory.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        self.handler = Handler()
+        self.handler.notebook.add(Note("Groceries", "Buy milk", ["home"]))
+        self.handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(name="Alice", phone="0123456789", email=None, birthday=None),
+        )
+
+    def tearDown(self):
+        """
+        Restore the working directory.
+        """
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used result is evicted first.
+        """
+        cache = QueryCache(2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.get_or_compute("a", lambda: 0), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: 4), 4)
+        self.assertEqual(
+            cache.stats(),
+            {"hits": 2, "misses": 4, "hit_rate": 1 / 3, "size": 2, "maxsize": 2},
+        )
+
+    def test_repeated_queries_hit(self):
+        """
+        Test that repeated read commands are answered from the cache.
+        """
+        search = Namespace(query="milk")
+        first = self.handler.execute(Menu.SEARCH_NOTES, search)
+        self.assertIn("Groceries", first)
+        self.assertEqual(self.handler.execute(Menu.SEARCH_NOTES, search), first)
+        self.handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        self.handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        self.assertEqual(self.handler.query_cache.hits, 2)
+        self.assertEqual(self.handler.query_cache.misses, 2)
+        self.assertIn(
+            "2 hit(s), 2 miss(es), hit rate 50.0%",
+            self.handler.execute(Menu.CACHE_STATS, None),
+        )
+
+    def test_mutations_invalidate(self):
+        """
+        Test that every kind of change is visible in the next query.
+        """
+        self.handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        self.handler.execute(
+            Menu.UPDATE_PHONE,
+            Namespace(name="Alice", oldphone="0123456789", newphone="0987654321"),
+        )
+        contacts = self.handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        self.assertIn("0987654321", contacts)
+        self.handler.execute(Menu.DELETE_CONTACT, Namespace(name="Alice"))
+        self.assertNotIn("Alice", self.handler.execute(Menu.SHOW_ALL_CONTACTS, None))
+
+        tag = Namespace(tag="home")
+        self.assertIn("Groceries", self.handler.execute(Menu.FILTER_NOTES_BY_TAG, tag))
+        answers = iter(["Buy bread", "shop", "", "", ""])
+        with patch.object(builtins, "input", lambda prompt="": next(answers)):
+            self.handler.execute(Menu.UPDATE_NOTE, Namespace(title="Groceries"))
+        self.assertIn(
+            "No notes found", self.handler.execute(Menu.FILTER_NOTES_BY_TAG, tag)
+        )
+        self.handler.notebook.notes = []
+        self.assertEqual(
+            self.handler.execute(Menu.SHOW_ALL_NOTES, None), "No notes available."
+        )
+        self.assertEqual(self.handler.query_cache.hits, 0)
+
+    def test_cache_checked_before_snapshot(self):
+        """
+        Test that cached contacts are shown without a snapshot and columnar books never
+        take one.
+        """
+        book = self.handler.contact_book
+        first = self.handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+        with patch.object(book, "snapshot", side_effect=AssertionError):
+            self.assertEqual(self.handler.execute(Menu.SHOW_ALL_CONTACTS, None), first)
+
+        self.handler.close()
+        handler = Handler(columnar_contacts=True)
+        with patch.object(handler.contact_book, "snapshot", side_effect=AssertionError):
+            self.assertIn("Alice", handler.execute(Menu.SHOW_ALL_CONTACTS, None))
+            handler.execute(Menu.SHOW_ALL_CONTACTS, None)
+            handler.execute(
+                Menu.EXPORT_CONTACTS,
+                Namespace(file="contacts.csv", format=None, fields=None, filter=None),
+            )
+        self.assertEqual(handler.query_cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Test cases for the reminder scheduler.
+"""
+
+import os
+import sys
+import unittest
+from argparse import Namespace
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.note import Note
+from contacts_assistant.recurrence import Recurrence
+from contacts_assistant.reminders import ReminderScheduler, TimerWheel
+
+
+class TestReminders(unittest.TestCase):
+    """
+    Test cases for the timer wheel and the reminder scheduler.
+    """
+
+    def setUp(self):
+        """
+        Create a scheduler with a clock controlled by the test.
+        """
+        self.now = datetime(2025, 2, 27, 8, 0)
+        self.fired = []
+        self.scheduler = ReminderScheduler(
+            self.fired.append, clock=lambda: self.now.timestamp()
+        )
+
+    def advance(self, **kwargs):
+        """Move the clock forward and return the titles of the fired reminders."""
+        self.now += timedelta(**kwargs)
+        return [reminder.title for reminder in self.scheduler.run_pending()]
+
+    def test_timer_wheel(self):
+        """
+        Test that timers expire at their tick across every level of the wheel.
+        """
+        wheel = TimerWheel(0, slots=4, levels=3)
+        deadlines = {key: key * 3 + 1 for key in range(40)}
+        for key, deadline in deadlines.items():
+            wheel.insert(key, deadline, None)
+        wheel.cancel(5)
+        del deadlines[5]
+
+        expired = {}
+        for tick in range(1, 130):
+            for key, deadline, _ in wheel.advance(tick):
+                expired[key] = tick
+        self.assertEqual(expired, deadlines)
+        self.assertEqual(len(wheel), 0)
+
+    def test_note_and_birthday_reminders(self):
+        """
+        Test that reminders fire at the reminder time and birthdays repeat yearly.
+        """
+        note = Note("Invoice", "Pay the invoice", due_date="28.02.2025")
+        self.scheduler.schedule_note(note)
+        self.scheduler.schedule_birthday("Ivan Franko", date(1984, 2, 29))
+
+        self.assertEqual(self.advance(hours=24), [])
+        self.assertEqual(self.advance(hours=1, minutes=1), ["Invoice"])
+        self.assertEqual(self.advance(hours=24), ["Ivan Franko"])
+        self.assertEqual(self.advance(days=364), [])
+        self.assertEqual(self.advance(days=1), ["Ivan Franko"])
+
+        note.due_date = datetime(2026, 3, 10)
+        self.scheduler.schedule_note(note)
+        self.scheduler.cancel_note(note)
+        self.assertEqual(self.advance(days=30), [])
+
+        weekly = Note("Report", "Send the report", due_date="01.01.2025")
+        weekly.recurrence = Recurrence("weekly")
+        self.scheduler.schedule_note(weekly)
+        self.assertEqual(self.advance(days=7), ["Report"])
+        self.assertEqual(self.advance(days=7), ["Report"])
+
+    def test_handler_updates(self):
+        """
+        Test that Handler commands keep the scheduler up to date.
+        """
+        handler = Handler(scheduler=self.scheduler)
+        handler.contact_book.clear()
+        handler.notebook.notes = []
+        self.scheduler.wheel = TimerWheel(self.scheduler.wheel.current)
+
+        handler.execute(
+            Menu.ADD_CONTACT,
+            Namespace(
+                name="Stepan Bandera", phone="1234567890", email=None, birthday=None
+            ),
+        )
+        handler.execute(
+            Menu.SET_BIRTHDAY, Namespace(name="Stepan Bandera", birthday="01.03.1980")
+        )
+        self.assertIn(("birthday", "Stepan Bandera"), self.scheduler.wheel)
+        handler.execute(Menu.DELETE_CONTACT, Namespace(name="Stepan Bandera"))
+        self.assertEqual(len(self.scheduler.wheel), 0)
+
+        note = Note("Invoice", "Pay the invoice", due_date="28.02.2025")
+        handler.notebook.add(note, True)
+        self.assertIn(("note", id(note)), self.scheduler.wheel)
+        # Removing a note any way drops its reminder
+        handler.notebook.notes = [Note("Draft", "No due date")]
+        self.assertEqual(len(self.scheduler.wheel), 0)
+        self.assertEqual(self.advance(days=2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+Test cases for the contacts book snapshot format.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import date, timedelta
+
+from contacts_assistant.address import AddressType
+from contacts_assistant.columnar_contacts_book import ColumnarContactsBook
+from contacts_assistant.contacts_book import ContactsBook
+from contacts_assistant.lazy_contacts_book import LazyContactsBook
+from contacts_assistant.record import Record
+from contacts_assistant.snapshot import Snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test cases for the snapshot format.
+    """
+
+    def setUp(self):
+        """
+        Create a temporary directory and a contacts book with every kind of field.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.book = ContactsBook()
+        record = Record("Stepan Bandera")
+        record.add_phone("0123456789")
+        record.add_phone("9876543210")
+        record.add_email("bandera@ukr.net")
+        record.add_birthday("29.02.1980")
+        record.add_address(
+            AddressType.HOME, "Natsionalistiv 3", "Uhryniv", None, "Ukraine"
+        )
+        record.add_address(AddressType.WORK, None, "Lviv", "79000", None)
+        self.book.add_record(record)
+        self.book.add_record(Record("Ivan Franko"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, filename):
+        """Return a path inside the temporary directory."""
+        return os.path.join(self.directory.name, filename)
+
+    def test_round_trip(self):
+        """
+        Test that saving and loading a snapshot keeps every field.
+        """
+        self.book.save_to_file(self.path("book.bin"))
+        self.assertTrue(Snapshot.is_snapshot(self.path("book.bin")))
+
+        loaded = ContactsBook.load_from_file(self.path("book.bin"))
+        self.assertEqual(list(loaded.data), list(self.book.data))
+        for name, record in self.book.data.items():
+            self.assertEqual(str(loaded.data[name]), str(record))
+        self.assertEqual(
+            loaded.find_by_name("Stepan Bandera").phones[0].value, "0123456789"
+        )
+
+    def test_convert_legacy_pickle(self):
+        """
+        Test loading and converting a pickled contacts book.
+        """
+        with open(self.path("book.pkl"), "wb") as file:
+            pickle.dump(self.book, file)
+
+        loaded = ContactsBook.load_from_file(
+            self.path("missing.bin"), self.path("book.pkl")
+        )
+        self.assertEqual(str(loaded), str(self.book))
+
+        self.assertEqual(
+            Snapshot.convert_pickle(self.path("book.pkl"), self.path("book.bin")), 2
+        )
+        converted = ContactsBook.load_from_file(self.path("book.bin"))
+        self.assertEqual(str(converted), str(self.book))
+
+    def test_edited_address(self):
+        """
+        Test saving an edited address and that a failed save leaves no temporary file.
+        """
+        record = self.book.find_by_name("Stepan Bandera")
+        record.edit_address(AddressType.HOME, city="Staryi Uhryniv")
+        record.add_address(AddressType.OTHER, "Shevchenka 1")
+        record.addresses[AddressType.OTHER].city = "Kalush"
+        self.book.save_to_file(self.path("book.bin"))
+
+        loaded = ContactsBook.load_from_file(self.path("book.bin"))
+        addresses = loaded.find_by_name("Stepan Bandera").addresses
+        self.assertEqual(
+            str(addresses[AddressType.HOME]), "Natsionalistiv 3, Staryi Uhryniv, Ukraine"
+        )
+        self.assertEqual(str(addresses[AddressType.OTHER]), "Shevchenka 1, Kalush")
+
+        for number in range(256):
+            record.add_phone(f"{number:010d}")
+        with self.assertRaises(Exception):
+            self.book.save_to_file(self.path("book.bin"))
+        self.assertFalse(os.path.exists(self.path("book.bin.tmp")))
+
+    def test_lazy_book(self):
+        """
+        Test lookups and changes on a memory-mapped snapshot.
+        """
+        filepath = self.path("book.bin")
+        self.book.save_to_file(filepath)
+        book = LazyContactsBook.open(filepath)
+        self.assertIsInstance(book, LazyContactsBook)
+        self.assertEqual(len(book), 2)
+        self.assertEqual(book.data.loaded, {})
+
+        record = book.find_by_name("Stepan Bandera")
+        self.assertEqual(str(record), str(self.book.find_by_name("Stepan Bandera")))
+        self.assertIsNone(book.find_by_name("Taras Shevchenko"))
+        self.assertEqual(list(book.data.loaded), ["Stepan Bandera"])
+        self.assertFalse(book.data.is_modified())
+
+        record.add_phone("5555555555")
+        book.delete("Ivan Franko")
+        book.add_record(Record("Lesya Ukrainka"))
+        self.assertTrue(book.data.is_modified())
+        self.assertEqual(sorted(book.data), ["Lesya Ukrainka", "Stepan Bandera"])
+        book.save_to_file(filepath)
+
+        loaded = ContactsBook.load_from_file(filepath)
+        self.assertEqual(sorted(loaded.data), ["Lesya Ukrainka", "Stepan Bandera"])
+        self.assertIsNotNone(loaded.find_by_phone("5555555555"))
+
+        # The saved file is mapped again and the records in memory are kept
+        with patch.object(Snapshot, "decode_record", side_effect=AssertionError):
+            self.assertFalse(book.data.is_modified())
+            self.assertIs(book.find_by_name("Stepan Bandera"), record)
+        self.assertEqual(sorted(book.data), ["Lesya Ukrainka", "Stepan Bandera"])
+        self.assertEqual(book.data.header.record_count, 2)
+
+        # A failed save leaves no temporary file and the book mapped
+        record.add_phone("6666666666")
+        with patch.object(os, "replace", side_effect=OSError):
+            with self.assertRaises(Exception):
+                book.save_to_file(filepath)
+        self.assertFalse(os.path.exists(f"{filepath}.tmp"))
+        self.assertTrue(book.data.is_modified())
+        book.save_to_file(filepath)
+        loaded = ContactsBook.load_from_file(filepath)
+        self.assertIsNotNone(loaded.find_by_phone("6666666666"))
+
+    def test_lazy_book_legacy_pickle(self):
+        """
+        Test that a lazy book falls back to the legacy pickle and saves its contacts.
+        """
+        with open(self.path("book.pkl"), "wb") as file:
+            pickle.dump(self.book, file)
+
+        book = LazyContactsBook.open(self.path("book.bin"), self.path("book.pkl"))
+        self.assertEqual(str(book), str(self.book))
+        book.save_to_file(self.path("book.bin"))
+
+        converted = ContactsBook.load_from_file(
+            self.path("book.bin"), self.path("book.pkl")
+        )
+        self.assertEqual(str(converted), str(self.book))
+
+    def test_slotted_pickle_state(self):
+        """
+        Test that records pickle with a plain attribute dictionary, as before __slots__.
+        """
+        record = self.book.find_by_name("Stepan Bandera")
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(
+            set(record.__getstate__()),
+            {"name", "phones", "birthday", "email", "addresses"},
+        )
+
+        restored = Record.__new__(Record)
+        restored.__setstate__((None, record.__getstate__()))
+        self.assertEqual(str(restored), str(record))
+        self.assertEqual(str(pickle.loads(pickle.dumps(record))), str(record))
+
+    def test_cached_rendering(self):
+        """
+        Test that records are rendered once per version and edits are shown.
+        """
+        record = self.book.find_by_name("Stepan Bandera")
+        text = str(record)
+        self.assertIs(str(record), text)
+        table = str(self.book)
+
+        record.add_phone("0987654321")
+        self.assertIn("0987654321", str(record))
+        self.assertNotEqual(str(self.book), table)
+        self.assertIn("0987654321", str(self.book))
+
+
+    def test_columnar_book(self):
+        """
+        Test that the columnar book matches the regular book and answers column scans.
+        """
+        self.book.save_to_file(self.path("book.bin"))
+        columnar = ColumnarContactsBook.load_from_file(self.path("book.bin"))
+        for name, record in self.book.data.items():
+            self.assertEqual(str(columnar.find_by_name(name)), str(record))
+
+        record = columnar.find_by_name("Ivan Franko")
+        record.add_phone("0501234567")
+        record.add_email("franko@ukr.net")
+        next_week = date.today() + timedelta(days=3)
+        record.add_birthday(next_week.replace(year=1992).strftime("%d.%m.%Y"))
+        record.edit_phone("0501234567", "0509999999")
+
+        self.assertEqual(columnar.find_by_phone("0509999999").name.value, "Ivan Franko")
+        self.assertIsNone(columnar.find_by_phone("0501234567"))
+        self.assertEqual(
+            [r.name.value for r in columnar.find_by_phone_prefix("0")],
+            ["Stepan Bandera", "Ivan Franko"],
+        )
+        self.assertEqual(
+            [r.name.value for r in columnar.find_by_email_domain("ukr.net")],
+            ["Stepan Bandera", "Ivan Franko"],
+        )
+        self.assertEqual(
+            [line.split(",")[0] for line in columnar.get_upcoming_birthdays(7)],
+            ["Contact name: Ivan Franko"],
+        )
+
+        columnar.delete("Stepan Bandera")
+        self.assertIsNone(columnar.find_by_email("bandera@ukr.net"))
+        columnar.save_to_file(self.path("columnar.bin"))
+        loaded = ContactsBook.load_from_file(self.path("columnar.bin"))
+        self.assertEqual(list(loaded.data), ["Ivan Franko"])
+        self.assertEqual(str(loaded.data["Ivan Franko"]), str(record))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+    Test cases for the suffix array index of note text.
+"""
+
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant import suffix_index
+from contacts_assistant.note import Note
+from contacts_assistant.notebook import Notebook
+from contacts_assistant.suffix_index import SubstringIndex, suffix_array
+
+WORDS = ["Invoice", "oice", "ab", "Straße", "x y", "ba"]
+QUERIES = WORDS + ["o", "e a", "b i", "strasse", "zz", ""]
+
+
+class TestSuffixIndex(unittest.TestCase):
+    """
+    Test cases for suffix_array and the SubstringIndex class.
+    """
+
+    def test_suffix_array(self):
+        """
+        Test the suffix arrays against sorting the suffixes.
+        """
+        randomizer = random.Random(2)
+        for _ in range(200):
+            text = "".join(
+                randomizer.choice("ab\x00cé") for _ in range(randomizer.randrange(40))
+            )
+            expected = sorted(range(len(text)), key=lambda start: text[start:])
+            self.assertEqual(list(suffix_array(text)), expected)
+            self.assertEqual(list(suffix_index._suffix_array_python(text)), expected)
+
+    @patch.object(suffix_index, "SUBSTRING_INDEX_BATCH", 20)
+    def test_matches_linear_search(self):
+        """
+        Test that indexed searches match linear ones while notes change.
+        """
+        randomizer = random.Random(5)
+        notebook = Notebook()
+        notebook.substring_index = SubstringIndex()
+        expected = Notebook()
+
+        def random_text(count):
+            return " ".join(randomizer.choices(WORDS, k=count))
+
+        for step in range(1500):
+            action = randomizer.random()
+            if action < 0.4:
+                note = Note(random_text(2), random_text(3))
+                notebook.add(note, True)
+                expected.add(note, True)
+            elif action < 0.5 and notebook.notes:
+                title = randomizer.choice(notebook.notes).title
+                with patch("builtins.input", return_value=""):
+                    notebook.update(title, Note(title, random_text(3)))
+                expected.touch()
+            elif action < 0.55:
+                kept = [note for note in notebook.notes if randomizer.random() < 0.9]
+                notebook.notes = kept
+                expected.notes = list(kept)
+            else:
+                query = randomizer.choice(QUERIES)
+                self.assertEqual(
+                    notebook.search(query), expected.search(query), (step, query)
+                )
+        notebook.substring_index.wait()
+        self.assertTrue(notebook.substring_index.built)
+        for query in QUERIES:
+            self.assertEqual(notebook.search(query), expected.search(query), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+    Test cases for the workload recorder and replayer.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from contacts_assistant.handler import Handler
+from contacts_assistant.menu import Menu
+from contacts_assistant.workload import (
+    WorkloadEntry,
+    WorkloadRecorder,
+    WorkloadReplayer,
+)
+from main import run_command
+
+
+class TestWorkload(unittest.TestCase):
+    """
+    Test cases for the WorkloadRecorder and WorkloadReplayer classes.
+    """
+
+    def setUp(self):
+        """
+        Run each test in an empty directory.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        """
+        Restore the working directory.
+        """
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_record_and_replay(self):
+        """
+        Test recording commands with prompt answers and replaying them in sessions.
+        """
+        handler = Handler()
+        parser = Menu.create_parser()
+        recorder = WorkloadRecorder("session.jsonl")
+        answers = iter(["Invoice", "Pay the invoice", "work", "", ""])
+        with patch("builtins.print"), patch("builtins.input", lambda _: next(answers)):
+            for line in [
+                'add_contact --name "Ann Lee" --phone 1234567890',
+                "add_note",
+                "search_notes --query invoice",
+                "unknown_command",
+                "exit",
+            ]:
+                run_command(handler, parser, line, recorder=recorder)
+        recorder.close()
+
+        entries = WorkloadReplayer.load("session.jsonl")
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(
+            entries[1].answers, ["Invoice", "Pay the invoice", "work", "", ""]
+        )
+        self.assertLessEqual(entries[0].time, entries[-1].time)
+
+        os.remove("contacts_book.bin")
+        os.remove("notebook.json")
+        handlers = []
+
+        def handler_factory():
+            handlers.append(Handler())
+            return handlers[-1]
+
+        result = WorkloadReplayer(entries, handler_factory, concurrency=3).run()
+        self.assertEqual(result["sessions"], 3)
+        self.assertEqual(result["commands"], 9)
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(result["metrics"].to_dict()["add_note"]["dispatch"]["count"], 3)
+        for session in handlers:
+            self.assertIsNotNone(session.contact_book.find_by_name("Ann Lee"))
+            self.assertEqual([note.title for note in session.notebook.notes], ["Invoice"])
+        self.assertFalse(os.path.exists("contacts_book.bin"))
+
+    def test_replay_errors(self):
+        """
+        Test that failing commands are counted and the sessions go on.
+        """
+        entries = [
+            WorkloadEntry(0, "show_all_notes", []),
+            WorkloadEntry(0, "show_all_contacts", []),
+        ]
+
+        class BrokenHandler(Handler):
+            def execute(self, command, args):
+                if command is Menu.SHOW_ALL_NOTES:
+                    raise RuntimeError("broken")
+                return super().execute(command, args)
+
+        result = WorkloadReplayer(entries, BrokenHandler, concurrency=2).run()
+        self.assertEqual(result["commands"], 2)
+        self.assertEqual(result["errors"], 2)
+        self.assertEqual(result["errors_by_command"], {"show_all_notes": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()